@@ -0,0 +1,278 @@
+"""Parse throughput of the input adapters (DNG JSON, ReqIF, CSV) on the same modules.
+
+The DNG modules of --source (default: IBM_JSON) are converted in memory to
+ReqIF and to CSV (hierarchy from "structure", links as relations / a
+linked_artifacts column). For every adapter it prints MB/s and artifacts/s
+of parsing alone and of parse + transform_json (best of --repeat over
+--scale copies), plus how many of the lazily decoded fields the transform
+decoded. --drop adds artifact fields to the mapping's drop list, e.g.
+--drop comments,wrapped_resource, to see fields that are never decoded.
+The CSV copies must transform to the same artifacts as the DNG modules
+(checked with ✅ / ❌); json.loads is the baseline for the DNG adapter.
+
+    python benchmarks/bench_adapters.py [--scale 5] [--repeat 5] [--drop comments]
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from polarion_transform import transform  # noqa: E402
+from polarion_transform.adapters import LIST_FIELDS, get_adapter  # noqa: E402
+from polarion_transform.link_index import module_artifacts  # noqa: E402
+from polarion_transform.mappings import DEFAULT_CONFIG, load_config  # noqa: E402
+
+REQIF_NS = "http://www.omg.org/spec/ReqIF/20110401/reqif.xsd"
+XHTML_NS = "http://www.w3.org/1999/xhtml"
+
+# DNG field -> ReqIF standard attribute
+REQIF_NAMES = {"identifier": "ReqIF.ForeignID", "title": "ReqIF.Name", "primary_text_html": "ReqIF.Text"}
+
+# DNG module fields written to the CSV module_* columns
+MODULE_COLUMNS = ("module_identifier", "module_title", "module_description", "module_status", "module_type")
+
+
+def sample_modules(folder):
+    modules = []
+    for filename in sorted(os.listdir(folder)):
+        if filename.endswith(".json"):
+            with open(os.path.join(folder, filename), "rb") as f:
+                modules.append((filename, f.read()))
+    return modules
+
+
+def hierarchy(data):
+    """(artifact, parent identifier) pairs, each artifact once, children listed after their parent."""
+    seen, entries = set(), []
+    for artifact, parent in module_artifacts(data):
+        identifier = str(artifact["identifier"])
+        if identifier not in seen:
+            seen.add(identifier)
+            entries.append(({key: value for key, value in artifact.items() if key != "children"}, parent))
+    known = set()
+    ordered = []
+    for artifact, parent in entries:
+        ordered.append((artifact, parent if parent in known else None))
+        known.add(str(artifact["identifier"]))
+    return ordered
+
+
+# ======================
+# CONVERTERS
+# ======================
+def to_csv(data):
+    entries = hierarchy(data)
+    fields = []
+    for artifact, _ in entries:
+        fields.extend(key for key in artifact if key not in fields)
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow([*MODULE_COLUMNS, "parent", *fields])
+    module = [str(data.get(key) or "") for key in MODULE_COLUMNS]
+    for artifact, parent in entries:
+        row = [json.dumps(value, ensure_ascii=False) if key in LIST_FIELDS else str(value)
+               for key, value in ((key, artifact.get(key, [] if key in LIST_FIELDS else "")) for key in fields)]
+        writer.writerow([*module, parent or "", *row])
+        module = [""] * len(MODULE_COLUMNS)
+    return out.getvalue().encode("utf-8")
+
+
+def _xhtml(html):
+    """THE-VALUE content for a DNG primary text: its markup in the XHTML namespace, or its text in a div."""
+    markup = html.replace("html:", "").replace("ns0:", "").replace("rdf:", "")
+    try:
+        element = ET.fromstring(f"<div>{markup}</div>")
+    except ET.ParseError:
+        element = ET.Element("div")
+        element.text = html
+    for node in element.iter():
+        node.tag = f"{{{XHTML_NS}}}{node.tag}"
+        node.attrib.pop("parsetype", None)
+    return element
+
+
+def to_reqif(data):
+    def sub(parent, tag, **attrib):
+        return ET.SubElement(parent, f"{{{REQIF_NS}}}{tag}", attrib)
+
+    def ref(parent, tag, kind, target):
+        sub(sub(parent, tag), kind).text = target
+
+    entries = hierarchy(data)
+    root = ET.Element(f"{{{REQIF_NS}}}REQ-IF")
+    sub(sub(sub(root, "THE-HEADER"), "REQ-IF-HEADER", IDENTIFIER="header"), "TITLE").text = data.get("module_title")
+    content = sub(sub(root, "CORE-CONTENT"), "REQ-IF-CONTENT")
+    datatypes = sub(content, "DATATYPES")
+    sub(datatypes, "DATATYPE-DEFINITION-STRING", IDENTIFIER="DT-STRING", **{"MAX-LENGTH": "100000"})
+    sub(datatypes, "DATATYPE-DEFINITION-XHTML", IDENTIFIER="DT-XHTML")
+    statuses = sorted({artifact.get("artifact_status") or "" for artifact, _ in entries} - {""})
+    values = sub(sub(datatypes, "DATATYPE-DEFINITION-ENUMERATION", IDENTIFIER="DT-STATUS"), "SPECIFIED-VALUES")
+    for i, status in enumerate(statuses):
+        sub(values, "ENUM-VALUE", IDENTIFIER=f"EV-{i}", **{"LONG-NAME": status})
+    status_refs = {status: f"EV-{i}" for i, status in enumerate(statuses)}
+
+    fields = []
+    for artifact, _ in entries:
+        fields.extend(key for key in artifact if key not in fields and key not in LIST_FIELDS)
+    spec_types = sub(content, "SPEC-TYPES")
+    attributes = sub(sub(spec_types, "SPEC-OBJECT-TYPE", IDENTIFIER="T-ARTIFACT", **{"LONG-NAME": "Artifact"}),
+                     "SPEC-ATTRIBUTES")
+    kinds = {}
+    for field in fields:
+        kind = "XHTML" if field == "primary_text_html" else "ENUMERATION" if field == "artifact_status" else "STRING"
+        kinds[field] = kind
+        definition = sub(attributes, f"ATTRIBUTE-DEFINITION-{kind}", IDENTIFIER=f"A-{field}",
+                         **{"LONG-NAME": REQIF_NAMES.get(field, field)})
+        datatype = {"XHTML": "DT-XHTML", "ENUMERATION": "DT-STATUS", "STRING": "DT-STRING"}[kind]
+        ref(definition, "TYPE", f"DATATYPE-DEFINITION-{kind}-REF", datatype)
+    sub(spec_types, "SPEC-RELATION-TYPE", IDENTIFIER="T-LINK", **{"LONG-NAME": "Link"})
+    sub(spec_types, "SPECIFICATION-TYPE", IDENTIFIER="T-MODULE", **{"LONG-NAME": data.get("module_type") or ""})
+
+    spec_objects = sub(content, "SPEC-OBJECTS")
+    relations = sub(content, "SPEC-RELATIONS")
+    object_ids = {str(artifact["identifier"]): f"O-{artifact['identifier']}" for artifact, _ in entries}
+    for artifact, _ in entries:
+        object_id = object_ids[str(artifact["identifier"])]
+        spec_object = sub(spec_objects, "SPEC-OBJECT", IDENTIFIER=object_id,
+                          **{"LAST-CHANGE": artifact.get("modified_on") or ""})
+        ref(spec_object, "TYPE", "SPEC-OBJECT-TYPE-REF", "T-ARTIFACT")
+        values = sub(spec_object, "VALUES")
+        for field, value in artifact.items():
+            kind = kinds.get(field)
+            if kind is None or value in ("", None):
+                continue
+            if kind == "STRING":
+                value_element = sub(values, "ATTRIBUTE-VALUE-STRING", **{"THE-VALUE": str(value)})
+            else:
+                value_element = sub(values, f"ATTRIBUTE-VALUE-{kind}")
+            ref(value_element, "DEFINITION", f"ATTRIBUTE-DEFINITION-{kind}-REF", f"A-{field}")
+            if kind == "XHTML":
+                sub(value_element, "THE-VALUE").append(_xhtml(value))
+            elif kind == "ENUMERATION":
+                ref(value_element, "VALUES", "ENUM-VALUE-REF", status_refs[value])
+        for link in artifact.get("linked_artifacts") or ():
+            target = object_ids.get(str(link.get("identifier")))
+            if target is not None:
+                relation = sub(relations, "SPEC-RELATION", IDENTIFIER=f"R-{len(relations)}")
+                ref(relation, "TYPE", "SPEC-RELATION-TYPE-REF", "T-LINK")
+                ref(relation, "SOURCE", "SPEC-OBJECT-REF", object_id)
+                ref(relation, "TARGET", "SPEC-OBJECT-REF", target)
+
+    specification = sub(sub(content, "SPECIFICATIONS"), "SPECIFICATION", IDENTIFIER="S-MODULE",
+                        **{"LONG-NAME": data.get("module_title") or ""})
+    ref(specification, "TYPE", "SPECIFICATION-TYPE-REF", "T-MODULE")
+    children = {None: sub(specification, "CHILDREN")}
+    for artifact, parent in entries:
+        identifier = str(artifact["identifier"])
+        node = sub(children[parent], "SPEC-HIERARCHY", IDENTIFIER=f"H-{identifier}")
+        ref(node, "OBJECT", "SPEC-OBJECT-REF", object_ids[identifier])
+        children[identifier] = sub(node, "CHILDREN")
+    return ET.tostring(root, encoding="utf-8", xml_declaration=True)
+
+
+# ======================
+# MEASUREMENT
+# ======================
+def best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def lazy_counts(artifacts):
+    """(fields with a decoder, of them decoded) over LazyRecord artifact trees."""
+    lazy = decoded = 0
+    stack = list(artifacts)
+    while stack:
+        artifact = stack.pop()
+        if hasattr(artifact, "decode_counts"):
+            fields, done = artifact.decode_counts()
+            lazy += fields
+            decoded += done
+        stack.extend(artifact.get("children") or ())
+    return lazy, decoded
+
+
+def flat_artifacts(artifacts):
+    """legacyID -> transformed artifact without children, over transformed trees."""
+    flat = {}
+    stack = list(artifacts)
+    while stack:
+        artifact = stack.pop()
+        stack.extend(artifact.get("children") or ())
+        flat[artifact.get("legacyID")] = {key: value for key, value in artifact.items() if key != "children"}
+    return flat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=os.path.join(ROOT, "IBM_JSON"),
+                        help="folder of DNG module JSON files (default: IBM_JSON)")
+    parser.add_argument("--scale", type=int, default=5, help="copies of every module per measurement")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (best is kept)")
+    parser.add_argument("--drop", default="", help="comma-separated artifact fields the mapping drops as well")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mappings = DEFAULT_CONFIG
+        if args.drop:
+            config = load_config()
+            config["artifact"]["drop"] = [*config["artifact"].get("drop", ()), *args.drop.split(",")]
+            mappings = os.path.join(tmp, "mappings.json")
+            with open(mappings, "w", encoding="utf-8") as f:
+                json.dump(config, f)
+        transform.use_mappings(mappings)
+
+        modules = sample_modules(args.source)
+        stems = [os.path.splitext(filename)[0] for filename, _ in modules]
+        inputs = {
+            "dng": modules,
+            "reqif": [(f"{stem}.reqif", to_reqif(json.loads(raw))) for stem, (_, raw) in zip(stems, modules)],
+            "csv": [(f"{stem}.csv", to_csv(json.loads(raw))) for stem, (_, raw) in zip(stems, modules)],
+        }
+
+        json_files = inputs["dng"] * args.scale
+        seconds = best_time(lambda: [json.loads(raw) for _, raw in json_files], args.repeat)
+        size = sum(len(raw) for _, raw in json_files)
+        print(f"📊 {'json.loads':10s} | {size / 1e6 / seconds:7.1f} MB/s parse (baseline)")
+
+        expected = {}
+        for name, files in inputs.items():
+            adapter = get_adapter(name)
+            files = files * args.scale
+            size = sum(len(raw) for _, raw in files)
+            parsed = [adapter.parse(raw, filename) for filename, raw in files[:len(modules)]]
+            artifacts = sum(module.get("artifact_count") or len(module["artifacts"]) for module in parsed) * args.scale
+            parse_sec = best_time(lambda: [adapter.parse(raw, filename) for filename, raw in files], args.repeat)
+            total_sec = best_time(lambda: [transform.transform_json(adapter.parse(raw, filename))
+                                           for filename, raw in files], args.repeat)
+            transformed = [transform.transform_json(module) for module in parsed]
+            lazy, decoded = lazy_counts(artifact for module in parsed for artifact in module["artifacts"])
+            print(f"📊 {name:10s} | {size / 1e6 / parse_sec:7.1f} MB/s parse | {artifacts / parse_sec:9.0f} artifacts/sec"
+                  f" parse | {artifacts / total_sec:8.0f} artifacts/sec parse + transform"
+                  f" | {decoded}/{lazy} lazy fields decoded | {size / args.scale / 1e6:.2f} MB")
+            flat = {}
+            for module in transformed:
+                flat.update(flat_artifacts(module["artifacts"]))
+            if name == "dng":
+                expected = flat
+            elif name == "csv":
+                same = flat == expected
+                print(f"{'✅' if same else '❌'} csv artifacts {'match' if same else 'differ from'} the DNG transform"
+                      f" ({len(flat)} artifacts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Micro-benchmark for clean_primary_html.
+
+Runs the compiled cleaner against the original chain of re.sub calls on every
+primary_text_html / primary_text_html_local string in IBM_JSON, checks that
+both produce identical output and prints the timings.
+
+    python benchmarks/bench_clean_html.py [--repeat 20]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from polarion_transform.html_cleaner import clean_primary_html  # noqa: E402
+
+
+def legacy_clean_primary_html(html_text: str) -> str:
+    """The original regex chain, kept as the reference implementation."""
+    if not html_text:
+        return ""
+
+    cleaned = html_text
+    cleaned = re.sub(r"</?ns0:primarytext[^>]*>", "", cleaned)
+    cleaned = re.sub(r"<html:([a-zA-Z0-9]+)", r"<\1", cleaned)
+    cleaned = re.sub(r"</html:([a-zA-Z0-9]+)>", r"</\1>", cleaned)
+    cleaned = re.sub(r'\s*dir="[^"]*"', "", cleaned)
+    cleaned = re.sub(r'\s*id="[^"]*"', "", cleaned)
+    cleaned = re.sub(r"<img[^>]*>", "", cleaned)
+    cleaned = re.sub(r"\n+", " ", cleaned)
+    cleaned = re.sub(r"\s{2,}", " ", cleaned)
+    cleaned = re.sub(r"<p>\s*(?:&nbsp;)?\s*</p>", "", cleaned, flags=re.IGNORECASE)
+    cleaned = re.sub(r"<div>\s*(?:&nbsp;)?\s*</div>", "", cleaned, flags=re.IGNORECASE)
+    cleaned = re.sub(r"<(i|u|b|sub|sup)><\1>", r"<\1>", cleaned)
+    cleaned = re.sub(r"</(i|u|b|sub|sup)></\1>", r"</\1>", cleaned)
+
+    def add_table_styles(match):
+        attrs = match.group(1) or ""
+        attrs = re.sub(r'width\s*:\s*[^;"]+;?', "", attrs, flags=re.IGNORECASE)
+        if "style=" in attrs:
+            return f"<table{attrs[:-1]}; width: 70%; border-collapse: collapse; border: 1px solid #696969;\">"
+        else:
+            return f"<table{attrs} style=\"width: 70%; border-collapse: collapse; border: 1px solid #696969;\">"
+
+    def add_td_styles(match):
+        attrs = match.group(1) or ""
+        attrs = re.sub(r'width\s*:\s*[^;"]+;?', "", attrs, flags=re.IGNORECASE)
+        if "style=" in attrs:
+            return f"<td{attrs[:-1]}; border: 1px solid #696969; padding: 4px;\">"
+        else:
+            return f"<td{attrs} style=\"border: 1px solid #696969; padding: 4px;\">"
+
+    cleaned = re.sub(r"<table([^>]*)>", add_table_styles, cleaned)
+    cleaned = re.sub(r"<td([^>]*)>", add_td_styles, cleaned)
+
+    if not cleaned.startswith("<div>"):
+        cleaned = f"<div>{cleaned}</div>"
+
+    return cleaned.strip()
+
+
+def collect_html(folder):
+    """All rich-text strings of every artifact (including children) in folder."""
+    texts = []
+
+    def walk(artifacts):
+        for artifact in artifacts:
+            for key in ("primary_text_html", "primary_text_html_local"):
+                if artifact.get(key):
+                    texts.append(artifact[key])
+            walk(artifact.get("children") or [])
+
+    for filename in sorted(os.listdir(folder)):
+        if filename.endswith(".json"):
+            with open(os.path.join(folder, filename), "r", encoding="utf-8") as infile:
+                walk(json.load(infile).get("artifacts", []))
+    return texts
+
+
+def time_cleaner(cleaner, texts, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            cleaner(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", default=os.path.join(ROOT, "IBM_JSON"), help="folder with module JSON files")
+    parser.add_argument("--repeat", type=int, default=20, help="timing repetitions, best run is reported")
+    args = parser.parse_args()
+
+    texts = collect_html(args.input)
+    mismatches = [t for t in texts if clean_primary_html(t) != legacy_clean_primary_html(t)]
+    if mismatches:
+        print(f"❌ {len(mismatches)} of {len(texts)} strings differ from the legacy cleaner")
+        sys.exit(1)
+
+    total_mb = sum(len(t.encode("utf-8")) for t in texts) / 1e6
+    legacy = time_cleaner(legacy_clean_primary_html, texts, args.repeat)
+    compiled = time_cleaner(clean_primary_html, texts, args.repeat)
+    print(f"✅ Output identical for {len(texts)} strings ({total_mb:.2f} MB)")
+    print(f"   legacy   : {legacy * 1000:8.2f} ms  ({total_mb / legacy:6.1f} MB/sec)")
+    print(f"   compiled : {compiled * 1000:8.2f} ms  ({total_mb / compiled:6.1f} MB/sec)")
+    print(f"   speedup  : {legacy / compiled:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
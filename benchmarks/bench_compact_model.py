@@ -0,0 +1,87 @@
+"""Memory held by a module as dicts and as compact records (--compact-model).
+
+For each module file (default: the SPEC and REQ exports in IBM_JSON) the
+text is parsed --scale times and transformed, once with plain dicts and
+once with compact records. Prints the memory still allocated (tracemalloc)
+after parsing and after transforming, and checks that both models
+serialize to the same bytes.
+
+    python benchmarks/bench_compact_model.py [--scale 20] [FILE ...]
+"""
+import argparse
+import gc
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from polarion_transform.cache import diagram_cache, html_cache  # noqa: E402
+from polarion_transform.compact import compact, compact_pairs  # noqa: E402
+from polarion_transform.output import get_serializer  # noqa: E402
+from polarion_transform.transform import transform_artifact, transform_json  # noqa: E402
+
+DEFAULT_FILES = ("SPEC SYS*.json", "REQ SYS*.json")
+
+
+def measure(text, scale, compact_model):
+    """(parsed bytes, parsed + transformed bytes, seconds, transformed modules) still allocated."""
+    html_cache.clear()
+    diagram_cache.clear()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        hook = compact_pairs if compact_model else None
+        modules = [json.loads(text, object_pairs_hook=hook) for _ in range(scale)]
+        parsed = tracemalloc.get_traced_memory()[0]
+        if compact_model:
+            transformed = [transform_json(module, compact_transform) for module in modules]
+        else:
+            transformed = [transform_json(module) for module in modules]
+        seconds = time.perf_counter() - start
+        gc.collect()
+        held = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return parsed, held, seconds, transformed
+
+
+def compact_transform(artifact):
+    return compact(transform_artifact(artifact))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help="module JSON files (default: the SPEC / REQ samples)")
+    parser.add_argument("--scale", type=int, default=20, help="copies of each module held at once")
+    args = parser.parse_args()
+
+    files = args.files or sorted(path for pattern in DEFAULT_FILES
+                                 for path in glob.glob(os.path.join(ROOT, "IBM_JSON", pattern)))
+    dumps = get_serializer("json").dumps
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        dict_parsed, dict_held, dict_sec, dict_modules = measure(text, args.scale, False)
+        dict_output = dumps(dict_modules[0], 2)
+        del dict_modules
+        compact_parsed, compact_held, compact_sec, compact_modules = measure(text, args.scale, True)
+        if dumps(compact_modules[0], 2) != dict_output:
+            print(f"❌ {os.path.basename(path)}: compact records serialize differently")
+            sys.exit(1)
+        del compact_modules
+        print(f"📊 {os.path.basename(path)} ({len(text) / 1e6:.2f} MB x {args.scale})")
+        print(f"   parsed      : dict {dict_parsed / 1e6:8.2f} MB | compact {compact_parsed / 1e6:8.2f} MB"
+              f" | saved {1 - compact_parsed / dict_parsed:6.1%}")
+        print(f"   transformed : dict {dict_held / 1e6:8.2f} MB | compact {compact_held / 1e6:8.2f} MB"
+              f" | saved {1 - compact_held / dict_held:6.1%}")
+        print(f"   time        : dict {dict_sec * 1000:8.1f} ms | compact {compact_sec * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
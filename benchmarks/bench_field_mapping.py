@@ -0,0 +1,123 @@
+"""Micro-benchmark for the compiled field mapping.
+
+Maps the fields of every artifact (including children) in IBM_JSON with the
+compiled dispatch table of FieldMapping and with the original per-key
+if-chain of transform_artifact, checks that both give identical output and
+prints the timings.
+
+    python benchmarks/bench_field_mapping.py [--repeat 20] [--mappings PATH]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from polarion_transform.mappings import FieldMapping  # noqa: E402
+
+
+def legacy_field_mapper(config):
+    """The original copy-mapped-keys loop over the config's tables, kept as the reference."""
+    artifact = config["artifact"]
+    artifact_mapping = artifact["rename"]
+    values = artifact["values"]
+    artifact_type_mapping = values["artifact_type"]
+    artifact_status_mapping = values["artifact_status"]
+    key_requirement_mapping = values["key_requirement"]
+    reviewStatus_mapping = values["review_status"]
+    oemStatus_mapping = values["oem_status"]
+    variant_mapping = values["variant"]
+    supplierStatus_mapping = values["supplier_status"]
+    responsible_group_mapping = artifact["list_values"]["responsible_group"]
+
+    def map_fields(artifact):
+        new_artifact = {}
+        for key, value in artifact.items():
+            if key in artifact_mapping:
+                new_key = artifact_mapping[key]
+                new_value = value
+                if new_key == "status" and value in artifact_status_mapping:
+                    new_value = artifact_status_mapping[value]
+                if new_key == "keyRequirement" and value in key_requirement_mapping:
+                    new_value = key_requirement_mapping[value]
+                if new_key == "reviewStatus" and value in reviewStatus_mapping:
+                    new_value = reviewStatus_mapping[value]
+                if new_key == "oemStatus" and value in oemStatus_mapping:
+                    new_value = oemStatus_mapping[value]
+                if new_key == "variant" and value in variant_mapping:
+                    new_value = variant_mapping[value]
+                if new_key == "supplierStatus" and value in supplierStatus_mapping:
+                    new_value = supplierStatus_mapping[value]
+                if new_key == "responsibleGroup":
+                    mapped = responsible_group_mapping.get(value)
+                    new_value = mapped if isinstance(mapped, list) else ([value] if value else [])
+                new_artifact[new_key] = new_value
+
+            elif key == "artifact_type":
+                new_artifact[key] = artifact_type_mapping.get(value, value)
+            elif key in ("primary_text_html", "primary_text_html_local", "description", "diagram_image"):
+                pass  # merged into the description
+            else:
+                new_artifact[key] = value
+        return new_artifact
+
+    return map_fields
+
+
+def collect_artifacts(folder):
+    """Every artifact (including children) of every module in folder."""
+    artifacts = []
+
+    def walk(items):
+        for artifact in items:
+            artifacts.append(artifact)
+            walk(artifact.get("children") or [])
+
+    for filename in sorted(os.listdir(folder)):
+        if filename.endswith(".json"):
+            with open(os.path.join(folder, filename), "r", encoding="utf-8") as infile:
+                walk(json.load(infile).get("artifacts", []))
+    return artifacts
+
+
+def time_mapper(mapper, artifacts, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for artifact in artifacts:
+            mapper(artifact)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", default=os.path.join(ROOT, "IBM_JSON"), help="folder with module JSON files")
+    parser.add_argument("--mappings", help="mapping config (default: the packaged mappings.json)")
+    parser.add_argument("--repeat", type=int, default=20, help="timing repetitions, best run is reported")
+    parser.add_argument("--scale", type=int, default=10, help="times the sample artifacts are repeated")
+    args = parser.parse_args()
+
+    field_mapping = FieldMapping.load(args.mappings)
+    legacy = legacy_field_mapper(field_mapping.config)
+    artifacts = collect_artifacts(args.input)
+    mismatches = [a for a in artifacts if field_mapping.map_artifact(a) != legacy(a)]
+    if mismatches:
+        print(f"❌ {len(mismatches)} of {len(artifacts)} artifacts map differently from the legacy if-chain")
+        sys.exit(1)
+
+    artifacts = artifacts * args.scale
+    fields = sum(len(a) for a in artifacts)
+    legacy_time = time_mapper(legacy, artifacts, args.repeat)
+    compiled_time = time_mapper(field_mapping.map_artifact, artifacts, args.repeat)
+    print(f"✅ Output identical for {len(artifacts)} artifacts ({fields} fields)")
+    print(f"   legacy   : {legacy_time * 1000:8.2f} ms  ({len(artifacts) / legacy_time:9.0f} artifacts/sec)")
+    print(f"   compiled : {compiled_time * 1000:8.2f} ms  ({len(artifacts) / compiled_time:9.0f} artifacts/sec)")
+    print(f"   speedup  : {legacy_time / compiled_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
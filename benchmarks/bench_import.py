@@ -0,0 +1,103 @@
+"""Throughput of the bulk import client against the local mock Polarion server.
+
+The transformed modules (default: POLARION_JSON) are copied --scale times
+into a temporary folder, with the legacyIDs of each copy made unique, and
+imported into a fresh MockPolarion for every combination of --concurrency
+and --batch-size. --latency delays every response like a remote server.
+Prints work items per second, requests, connections and wall time per
+combination, best of --repeat runs.
+
+    python benchmarks/bench_import.py [--scale 10] [--latency 0.005] [--concurrency 1,4,16] [--batch-size 1,50]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from polarion_transform.polarion_import import import_output, module_files  # noqa: E402
+from polarion_transform.output import read_output_artifacts  # noqa: E402
+from mock_polarion import MockPolarion  # noqa: E402
+
+
+def scaled_copies(source_dir, target_dir, scale):
+    """Write scale copies of every module of source_dir, suffixing legacyIDs; returns the work item count.
+
+    Artifacts shared by several modules stay one work item per copy.
+    """
+    legacy_ids = set()
+    for filename in module_files(source_dir):
+        artifacts = read_output_artifacts(os.path.join(source_dir, filename)) or []
+        for copy_index in range(scale):
+            module = json.loads(json.dumps({"artifacts": artifacts}))
+            stack = list(module["artifacts"])
+            while stack:
+                artifact = stack.pop()
+                stack.extend(artifact.get("children") or ())
+                if artifact.get("legacyID") is not None:
+                    artifact["legacyID"] = f"{artifact['legacyID']}-{copy_index}"
+                    legacy_ids.add(artifact["legacyID"])
+                for link in artifact.get("linked_artifacts") or ():
+                    if isinstance(link, dict) and link.get("legacyID") is not None:
+                        link["legacyID"] = f"{link['legacyID']}-{copy_index}"
+            stem = os.path.splitext(filename)[0]
+            with open(os.path.join(target_dir, f"{stem}-{copy_index}.json"), "w", encoding="utf-8") as f:
+                json.dump(module, f)
+    return len(legacy_ids)
+
+
+async def time_import(output_dir, latency, concurrency, batch_size):
+    mock = MockPolarion(latency_sec=latency)
+    port = await mock.start()
+    checkpoint = os.path.join(os.path.dirname(output_dir), f"bench-{concurrency}-{batch_size}.import.jsonl")
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    try:
+        start = time.perf_counter()
+        summary = await import_output(output_dir, f"http://127.0.0.1:{port}/polarion/rest/v1", "BENCH",
+                                      checkpoint=checkpoint, concurrency=concurrency, batch_size=batch_size)
+        seconds = time.perf_counter() - start
+    finally:
+        await mock.close()
+    return seconds, summary, mock.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=os.path.join(ROOT, "POLARION_JSON"),
+                        help="folder of transformed modules (default: POLARION_JSON)")
+    parser.add_argument("--scale", type=int, default=10, help="copies of every module")
+    parser.add_argument("--latency", type=float, default=0.005, help="mock server delay per response, seconds")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated pool sizes")
+    parser.add_argument("--batch-size", default="1,50", help="comma-separated work items per create request")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per combination (best is kept)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = os.path.join(tmp, "output")
+        os.makedirs(output_dir)
+        work_items = scaled_copies(args.source, output_dir, args.scale)
+        print(f"📦 {work_items} work items in {len(module_files(output_dir))} modules | latency {args.latency * 1000:.1f} ms")
+        for batch_size in (int(value) for value in args.batch_size.split(",")):
+            for concurrency in (int(value) for value in args.concurrency.split(",")):
+                best = None
+                for _ in range(args.repeat):
+                    result = asyncio.run(time_import(output_dir, args.latency, concurrency, batch_size))
+                    if best is None or result[0] < best[0]:
+                        best = result
+                seconds, summary, served = best
+                if served["work_items"] != work_items or served["duplicate_legacy_ids"]:
+                    print(f"❌ batch {batch_size}, concurrency {concurrency}: server has {served['work_items']}"
+                          f" work items ({served['duplicate_legacy_ids']} duplicates), expected {work_items}")
+                print(f"📊 batch {batch_size:4d} | concurrency {concurrency:3d} | {work_items / seconds:9.1f} work items/sec"
+                      f" | {summary['requests']:6d} requests | {summary['connections']:3d} connections"
+                      f" | {summary['links']} links | {seconds:7.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Bytes written and write time per output format, compression and serializer.
+
+Transforms every module in IBM_JSON once, then writes all of them in each
+format x compression x serializer combination (repeated --scale times)
+to a temporary folder, checks that every output reads back to the same
+artifacts and prints size, ratio to indented json, best-of --repeat write
+time and throughput in uncompressed MB/s.
+
+    python benchmarks/bench_output_formats.py [--repeat 5] [--scale 10]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from polarion_transform.output import (  # noqa: E402
+    COMPRESSIONS, OUTPUT_FORMATS, check_output_options, module_writer, open_output, output_filename,
+    read_output_artifacts, write_module,
+)
+from polarion_transform.transform import transform_json  # noqa: E402
+
+
+def load_modules(folder, scale):
+    modules = []
+    for filename in sorted(os.listdir(folder)):
+        if filename.endswith(".json"):
+            with open(os.path.join(folder, filename), "r", encoding="utf-8") as infile:
+                modules.append(transform_json(json.load(infile)))
+    return modules * scale
+
+
+def available(compression, serializer):
+    try:
+        check_output_options("json", compression, serializer)
+    except ImportError:
+        return False
+    return True
+
+
+def write_all(modules, folder, output_format, compression, serializer):
+    """Write every module; returns (total bytes, paths)."""
+    paths = []
+    for i, module in enumerate(modules):
+        path = os.path.join(folder, output_filename(f"module_{i}.json", output_format, compression))
+        with open_output(path, compression) as outfile:
+            write_module(module, module_writer(outfile, output_format, serializer))
+        paths.append(path)
+    return sum(os.path.getsize(path) for path in paths), paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", default=os.path.join(ROOT, "IBM_JSON"), help="folder with module JSON files")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions, best run is reported")
+    parser.add_argument("--scale", type=int, default=10, help="times the sample modules are repeated")
+    args = parser.parse_args()
+
+    modules = load_modules(args.input, args.scale)
+    print(f"📊 {len(modules)} modules")
+    print(f"   {'format':<9} {'compress':<8} {'serializer':<10} {'MB':>8} {'ratio':>6} {'ms':>9} {'MB/s':>8}")
+    baseline_bytes = None
+    uncompressed = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for output_format in OUTPUT_FORMATS:
+            for compression in COMPRESSIONS:
+                for serializer in ("json", "orjson"):
+                    if not available(compression, serializer):
+                        print(f"⏭️  {output_format:<9} {compression:<8} {serializer:<10} not installed")
+                        continue
+                    best = float("inf")
+                    for _ in range(args.repeat):
+                        start = time.perf_counter()
+                        size, paths = write_all(modules, folder, output_format, compression, serializer)
+                        best = min(best, time.perf_counter() - start)
+                    if any(read_output_artifacts(path) != module.get("artifacts")
+                           for path, module in zip(paths, modules)):
+                        print(f"❌ {output_format} {compression} {serializer} does not read back the same artifacts")
+                        sys.exit(1)
+                    for path in paths:
+                        os.remove(path)
+                    baseline_bytes = baseline_bytes or size
+                    uncompressed.setdefault(output_format, size)
+                    throughput = uncompressed[output_format] / 1e6 / best
+                    print(f"   {output_format:<9} {compression:<8} {serializer:<10} {size / 1e6:8.2f}"
+                          f" {size / baseline_bytes:6.2f} {best * 1000:9.1f} {throughput:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark for the iterative artifact tree transform.
+
+Builds deep (a single chain of children) and wide (one parent with every
+other artifact as a child) synthetic trees, transforms them with
+transform_artifact (explicit stack, counting in the same pass) and with the
+original recursive transform followed by a count_artifacts walk, checks the
+output is identical and prints the timings. The recursive reference runs
+only where the tree fits the recursion limit; --very-deep checks that the
+iterative transform handles a chain far below it.
+
+    python benchmarks/bench_tree_transform.py [--artifacts 2000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(ROOT))
+
+from polarion_transform import transform  # noqa: E402
+from generate_modules import generate_module, load_sample_shapes  # noqa: E402
+
+
+def recursive_transform(artifact):
+    """The original recursive transform_artifact, kept as the reference."""
+    new_artifact = transform.transform_artifact_fields(artifact)
+    if "children" in new_artifact and isinstance(new_artifact["children"], list):
+        new_artifact["children"] = [recursive_transform(c) for c in new_artifact["children"]]
+    return new_artifact
+
+
+def recursive_count(artifacts):
+    count = 0
+    for artifact in artifacts:
+        count += 1
+        if "children" in artifact and isinstance(artifact["children"], list):
+            count += recursive_count(artifact["children"])
+    return count
+
+
+def deep_tree(artifacts):
+    """Chain the artifacts so each one is the only child of the previous one."""
+    for parent, child in zip(artifacts, artifacts[1:]):
+        parent["children"] = [child]
+    return artifacts[0]
+
+
+def wide_tree(artifacts):
+    artifacts[0]["children"] = artifacts[1:]
+    return artifacts[0]
+
+
+def flat_artifacts(count, shapes):
+    return generate_module(count, html_size=200, links=2, shapes=shapes)["artifacts"]
+
+
+def time_best(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def iterative_run(root):
+    transform.artifact_stats = stats = transform.new_artifact_stats()
+    try:
+        return transform.transform_artifact(root), stats
+    finally:
+        transform.artifact_stats = None
+
+
+def recursive_run(root):
+    transformed = recursive_transform(root)
+    return transformed, recursive_count([transformed])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--artifacts", type=int, default=2000, help="artifacts per tree")
+    parser.add_argument("--very-deep", type=int, default=20000, help="length of the chain beyond the recursion limit")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions, best run is reported")
+    args = parser.parse_args()
+
+    shapes = load_sample_shapes()
+    # The recursive reference needs two frames per level
+    deep_count = min(args.artifacts, sys.getrecursionlimit() // 2 - 50)
+    trees = {
+        f"deep ({deep_count} levels)": deep_tree(flat_artifacts(deep_count, shapes)),
+        f"wide (1 x {args.artifacts - 1})": wide_tree(flat_artifacts(args.artifacts, shapes)),
+    }
+    for name, root in trees.items():
+        transformed, stats = iterative_run(root)
+        reference, reference_count = recursive_run(root)
+        if transformed != reference or stats.count != reference_count:
+            print(f"❌ {name}: iterative and recursive transforms differ")
+            sys.exit(1)
+        iterative_time = time_best(lambda: iterative_run(root), args.repeat)
+        recursive_time = time_best(lambda: recursive_run(root), args.repeat)
+        print(f"✅ {name}: identical output, {stats.count} work items, max depth {stats.max_depth}")
+        print(f"   recursive + count : {recursive_time * 1000:8.2f} ms")
+        print(f"   iterative + stats : {iterative_time * 1000:8.2f} ms  ({recursive_time / iterative_time:.2f}x)")
+
+    if args.very_deep:
+        # Reuse a few artifacts as templates; only the nesting matters here
+        templates = flat_artifacts(10, shapes)
+        chain = [dict(templates[i % len(templates)]) for i in range(args.very_deep)]
+        start = time.perf_counter()
+        _, stats = iterative_run(deep_tree(chain))
+        print(f"✅ very deep ({args.very_deep} levels): {stats.count} work items, max depth {stats.max_depth}"
+              f" in {(time.perf_counter() - start) * 1000:.1f} ms (recursion limit {sys.getrecursionlimit()})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Overhead of the validate stage on the transform.
+
+For each module file (default: every export in IBM_JSON) the parsed module
+is copied --scale times and transformed with and without a Validator
+against the packaged schema, best of --repeat runs. The HTML and diagram
+caches are cleared before each copy, as every module of a real export has
+its own text. Prints both times, the validation overhead as a share of the
+transform time and the violations found.
+
+    python benchmarks/bench_validation.py [--scale 20] [--repeat 5] [FILE ...]
+"""
+import argparse
+import copy
+import glob
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from polarion_transform import transform  # noqa: E402
+from polarion_transform.cache import diagram_cache, html_cache  # noqa: E402
+from polarion_transform.validation import Validator, get_schema  # noqa: E402
+
+
+def time_transform(module, scale, repeat, validate):
+    """(best seconds, violations) for transforming scale copies of module."""
+    schema = get_schema(None, transform.field_mapping)
+    best, violations = None, 0
+    for _ in range(repeat):
+        copies = [copy.deepcopy(module) for _ in range(scale)]
+        validator = Validator(schema) if validate else None
+        transform.validator = validator
+        try:
+            start = time.perf_counter()
+            for data in copies:
+                html_cache.clear()
+                diagram_cache.clear()
+                transform.transform_json(data)
+            seconds = time.perf_counter() - start
+        finally:
+            transform.validator = None
+        best = seconds if best is None else min(best, seconds)
+        if validator is not None:
+            violations = validator.report()["violations"] // scale
+    return best, violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help="module JSON files (default: IBM_JSON/*.json)")
+    parser.add_argument("--scale", type=int, default=20, help="copies of each module per run")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per variant (best is kept)")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join(ROOT, "IBM_JSON", "*.json")))
+    total_plain = total_validated = 0.0
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            module = json.load(f)
+        plain, _ = time_transform(module, args.scale, args.repeat, False)
+        validated, violations = time_transform(module, args.scale, args.repeat, True)
+        total_plain += plain
+        total_validated += validated
+        print(f"📊 {os.path.basename(path)}: transform {plain * 1000:8.1f} ms | with validate"
+              f" {validated * 1000:8.1f} ms | overhead {validated / plain - 1:6.1%} | {violations} violation(s)")
+    if total_plain:
+        print(f"\n Total: transform {total_plain * 1000:.1f} ms | with validate {total_validated * 1000:.1f} ms"
+              f" | overhead {total_validated / total_plain - 1:.1%}")
+
+
+if __name__ == "__main__":
+    main()
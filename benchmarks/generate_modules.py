@@ -0,0 +1,177 @@
+"""Synthetic IBM DOORS Next module generator.
+
+Builds modules in the exporter's JSON layout from the artifacts in
+IBM_JSON/Sample*.json, scaled along the dimensions that drive transform cost:
+artifact count, nesting depth of children, rich-text size, diagram complexity
+and linked_artifacts fan-out.
+
+    python benchmarks/generate_modules.py OUTPUT_DIR --artifacts 50000 --depth 3 --fanout 4
+"""
+import argparse
+import copy
+import glob
+import json
+import os
+import random
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES_GLOB = os.path.join(ROOT, "IBM_JSON", "Sample*.json")
+
+_HTML_WRAPPER = '<ns0:primarytext rdf:parsetype="Literal"><html:div>\n{}\n</html:div></ns0:primarytext>'
+_HTML_BLOCKS = (
+    '<html:p dir="ltr" id="_{n}">The system shall {words}.</html:p>',
+    '<html:p id="_{n}"><html:b>{words}</html:b> <html:i><html:i>{words}</html:i></html:i></html:p>',
+    '<html:ul><html:li id="_{n}">{words}</html:li><html:li>{words}</html:li></html:ul>',
+    '<html:p id="_{n}">&nbsp;</html:p>',
+    '<html:table border="1" style="width: 100%;"><html:tbody><html:tr>'
+    '<html:td style="width: 50%;">{words}</html:td><html:td>{words}</html:td>'
+    '</html:tr></html:tbody></html:table>',
+    '<html:p id="_{n}"><html:img src="https://example.invalid/rm/wrappedResources/{n}" alt="x"/>{words}</html:p>',
+)
+_WORDS = ("measure", "torque", "battery", "housing", "motor", "display", "within", "seconds",
+          "operator", "signal", "temperature", "limit", "tool", "shall", "report", "status")
+
+
+def load_sample_shapes(pattern=SAMPLES_GLOB):
+    """Module header and artifact templates taken from the sample exports."""
+    header, artifacts = None, []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "r", encoding="utf-8") as f:
+            module = json.load(f)
+        if header is None:
+            header = {k: v for k, v in module.items() if k != "artifacts"}
+        artifacts.extend(module.get("artifacts", []))
+    if header is None or not artifacts:
+        raise FileNotFoundError(f"No sample modules found for {pattern}")
+    return header, artifacts
+
+
+def synthetic_html(rng, size, serial):
+    """DNG-style primary text of roughly size characters."""
+    blocks, length = [], 0
+    while length < size:
+        words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(4, 16)))
+        block = rng.choice(_HTML_BLOCKS).format(n=serial * 1000 + len(blocks), words=words)
+        blocks.append(block)
+        length += len(block) + 1
+    return _HTML_WRAPPER.format("\n".join(blocks))
+
+
+def synthetic_diagram(rng, shapes):
+    """diagram_image XML with the given number of rect/ellipse/path shapes."""
+    parts = ['<output><diagramAttributes><width size="{0}"/><height size="{0}"/>'
+             '<background color="#ffffff"/></diagramAttributes>'.format(200 + shapes * 20),
+             '<translate dx="-10" dy="-10"/>']
+    style = ('<dashpattern pattern="1"/><fillcolor color="#FFFFFF"/><strokecolor color="#58585b"/>'
+             '<strokewidth width="2"/>')
+    for i in range(shapes):
+        x, y = rng.randint(0, 40 * shapes), rng.randint(0, 40 * shapes)
+        parts.append("<save/>" + style)
+        kind = i % 3
+        if kind == 0:
+            parts.append(f'<rect x="{x}" y="{y}" w="120" h="80"/>')
+        elif kind == 1:
+            parts.append(f'<ellipse x="{x}" y="{y}" w="80" h="80"/>')
+        else:
+            parts.append(f'<translate dx="{x}" dy="{y}"/><begin/><move x="25" y="0"/><line x="75" y="0"/>'
+                         '<line x="100" y="44"/><line x="75" y="88"/><line x="25" y="88"/>'
+                         '<line x="0" y="44"/><close/>')
+        parts.append("<fillstroke/><restore/>")
+    parts.append("</output>")
+    return "".join(parts)
+
+
+def generate_module(artifacts=1000, depth=0, fanout=3, html_size=400, diagram_shapes=0,
+                    diagram_ratio=0.1, links=0, seed=0, title="Synthetic Module", shapes=None):
+    """Return one synthetic module dict.
+
+    artifacts is the total number of work items including children. Each
+    top-level artifact gets a subtree of up to depth levels with fanout
+    children per node. diagram_ratio of the artifacts carry a diagram of
+    diagram_shapes shapes; every artifact links to links others.
+    """
+    rng = random.Random(seed)
+    header, templates = shapes or load_sample_shapes()
+    module = copy.deepcopy(header)
+    module["module_title"] = title
+    module["module_identifier"] = str(900000 + seed)
+    module["structure"] = {}
+    module["artifact_uris_in_module_order"] = []
+    identifiers = [str(1000000 + seed * 10000000 + i) for i in range(artifacts)]
+    serial = iter(range(artifacts))
+
+    def make_artifact(level):
+        n = next(serial, None)
+        if n is None:
+            return None
+        artifact = copy.deepcopy(rng.choice(templates))
+        identifier = identifiers[n]
+        artifact["identifier"] = identifier
+        artifact["artifact_uri"] = f"https://example.invalid/rm/resources/SYN_{identifier}"
+        artifact["title"] = f"Synthetic artifact {identifier}"
+        html = synthetic_html(rng, html_size, n) if html_size else ""
+        artifact["primary_text_html"] = html
+        artifact["primary_text_html_local"] = html
+        if diagram_shapes and rng.random() < diagram_ratio:
+            artifact["diagram_image"] = synthetic_diagram(rng, diagram_shapes)
+        artifact["linked_artifacts"] = [
+            {
+                "uri": f"https://example.invalid/rm/resources/SYN_{target}",
+                "title": target,
+                "identifier": target,
+                "link_role_uri": "https://example.invalid/link_types#satisfies",
+                "link_role_label": "Satisfies",
+                "link_role": rng.choice(("satisfies", "derived", "verifies", "reference")),
+                "direction": "outgoing",
+            }
+            for target in rng.sample(identifiers, min(links, len(identifiers)))
+        ]
+        if level < depth:
+            children = []
+            for _ in range(fanout):
+                child = make_artifact(level + 1)
+                if child is None:
+                    break
+                children.append(child)
+            if children:
+                artifact["children"] = children
+        return artifact
+
+    top_level = []
+    while True:
+        artifact = make_artifact(0)
+        if artifact is None:
+            break
+        top_level.append(artifact)
+    module["artifacts"] = top_level
+    module["artifact_count"] = artifacts
+    return module
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", help="folder to write the generated module JSON files to")
+    parser.add_argument("--modules", type=int, default=1, help="number of modules to generate")
+    parser.add_argument("--artifacts", type=int, default=1000, help="work items per module, children included")
+    parser.add_argument("--depth", type=int, default=0, help="levels of nested children below each top-level artifact")
+    parser.add_argument("--fanout", type=int, default=3, help="children per artifact when --depth > 0")
+    parser.add_argument("--html-size", type=int, default=400, help="approximate characters of primary text per artifact")
+    parser.add_argument("--diagram-shapes", type=int, default=0, help="shapes per diagram (0 = no diagrams)")
+    parser.add_argument("--diagram-ratio", type=float, default=0.1, help="fraction of artifacts with a diagram")
+    parser.add_argument("--links", type=int, default=0, help="linked_artifacts per artifact")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    shapes = load_sample_shapes()
+    for i in range(args.modules):
+        module = generate_module(args.artifacts, args.depth, args.fanout, args.html_size, args.diagram_shapes,
+                                 args.diagram_ratio, args.links, args.seed + i, f"Synthetic Module {i + 1}", shapes)
+        path = os.path.join(args.output, f"Synthetic Module {i + 1}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(module, f, indent=2, ensure_ascii=False)
+        print(f"✅ Generated: {path}   | Work items: {args.artifacts}   | Size: {os.path.getsize(path) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
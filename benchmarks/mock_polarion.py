@@ -0,0 +1,259 @@
+"""Local stand-in for the Polarion REST endpoints polarion_import.py uses, for tests and benchmarks.
+
+    python benchmarks/mock_polarion.py --port 8787 [--latency 0.02] [--fail-rate 0.05]
+
+Everything is kept in memory: the work items of each project, their
+attachments (file name, size, content hash) and their links. latency_sec
+delays every response like a loaded server; fail_rate answers that share
+of the requests with 503 and Retry-After: 0, so the client's retries get
+exercised, and lose_rate handles that share but answers 503 all the same,
+like a response lost on its way back; max_batch rejects work item create requests with more items
+(413). If token is set, requests need it as their bearer token. Responses
+are JSON:API documents like Polarion's, over keep-alive HTTP/1.1; the
+path prefix before /projects is ignored. GET of the work items (with a
+legacyID:("..." OR ...) query), attachments and links of a work item
+answers the client's lookups.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import urllib.parse
+
+_ROUTE = re.compile(r"^.*?/projects/([^/]+)/workitems(?:/([^/]+)(?:/(attachments|linkedworkitems))?)?/?$")
+
+_REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+            405: "Method Not Allowed", 413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+class MockPolarion:
+    """In-memory Polarion work item, attachment and link endpoints; see the module docstring."""
+
+    def __init__(self, latency_sec=0.0, fail_rate=0.0, max_batch=None, token=None, seed=0, lose_rate=0.0):
+        self.latency_sec = latency_sec
+        self.fail_rate = fail_rate
+        self.lose_rate = lose_rate
+        self.max_batch = max_batch
+        self.token = token
+        self.random = random.Random(seed)
+        self.server = None
+        self.writers = set()  # open connections, closed with the server
+        self.work_items = {}  # project -> {work item id: attributes}
+        self.attachments = {}  # (project, work item id) -> [attachment]
+        self.links = {}  # (project, work item id) -> [(role, target id)]
+        self.requests = self.failed = self.lost = self.connections = self.in_flight = self.peak_in_flight = 0
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Start listening; returns the port (a free one with port=0)."""
+        self.server = await asyncio.start_server(self._serve, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            for writer in list(self.writers):
+                writer.close()
+            while self.writers:  # let the handlers see their connection closed
+                await asyncio.sleep(0.01)
+            await self.server.wait_closed()
+            self.server = None
+
+    def report(self):
+        legacy_ids = [attributes.get("legacyID") for items in self.work_items.values()
+                      for attributes in items.values()]
+        return {
+            "requests": self.requests,
+            "failed_on_purpose": self.failed,
+            "lost_on_purpose": self.lost,
+            "connections": self.connections,
+            "peak_in_flight": self.peak_in_flight,
+            "work_items": len(legacy_ids),
+            "duplicate_legacy_ids": len(legacy_ids) - len(set(legacy_ids)),
+            "attachments": sum(len(entries) for entries in self.attachments.values()),
+            "attachment_bytes": sum(entry["size"] for entries in self.attachments.values() for entry in entries),
+            "links": sum(len(links) for links in self.links.values()),
+            "duplicate_links": sum(len(links) - len(set(links)) for links in self.links.values()),
+        }
+
+    async def _serve(self, reader, writer):
+        self.connections += 1
+        self.writers.add(writer)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = lines[0].split(" ", 2)
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests += 1
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                try:
+                    if self.latency_sec:
+                        await asyncio.sleep(self.latency_sec)
+                    status, document, extra = self._handle(method, path, headers, body)
+                finally:
+                    self.in_flight -= 1
+                data = json.dumps(document).encode("utf-8") if document is not None else b""
+                response = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}", f"Content-Length: {len(data)}"]
+                if data:
+                    response.append("Content-Type: application/json")
+                response.extend(f"{key}: {value}" for key, value in extra.items())
+                writer.write(("\r\n".join(response) + "\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+        finally:
+            self.writers.discard(writer)
+            writer.close()
+
+    def _handle(self, method, path, headers, body):
+        """(status, JSON document or None, extra headers) of one request."""
+        if self.token and headers.get("authorization") != f"Bearer {self.token}":
+            return 401, _errors(401, "Missing or wrong bearer token"), {}
+        if self.fail_rate and self.random.random() < self.fail_rate:
+            self.failed += 1
+            return 503, _errors(503, "Failed on purpose"), {"Retry-After": "0"}
+        response = self._route(method, path, headers, body)
+        if self.lose_rate and method == "POST" and response[0] < 300 and self.random.random() < self.lose_rate:
+            self.lost += 1
+            return 503, _errors(503, "Handled, but failed on purpose"), {"Retry-After": "0"}
+        return response
+
+    def _route(self, method, path, headers, body):
+        match = _ROUTE.match(path.split("?", 1)[0])
+        if match is None:
+            return 404, _errors(404, f"No route for {path}"), {}
+        project, work_item, relation = match.groups()
+        items = self.work_items.setdefault(project, {})
+        if work_item is None:
+            if method == "GET":
+                return self._find_work_items(project, items, path)
+            if method != "POST":
+                return 405, _errors(405, f"{method} not allowed"), {}
+            return self._create_work_items(project, items, body)
+        if work_item not in items:
+            return 404, _errors(404, f"Work item {project}/{work_item} not found"), {}
+        if relation is None:
+            if method != "GET":
+                return 405, _errors(405, f"{method} not allowed"), {}
+            return 200, {"data": {"type": "workitems", "id": f"{project}/{work_item}",
+                                  "attributes": items[work_item]}}, {}
+        if method == "GET":
+            if relation == "attachments":
+                return 200, {"data": [{"type": "workitem_attachments", "id": f"{project}/{work_item}/{i}",
+                                       "attributes": {"fileName": entry["fileName"], "title": entry["title"]}}
+                                      for i, entry in enumerate(self.attachments.get((project, work_item), ()), 1)]}, {}
+            return 200, {"data": [{"type": "linkedworkitems", "id": f"{project}/{work_item}/{role}/{project}/{target}",
+                                   "attributes": {"role": role},
+                                   "relationships": {"workItem": {"data": {"type": "workitems",
+                                                                           "id": f"{project}/{target}"}}}}
+                                  for role, target in self.links.get((project, work_item), ())]}, {}
+        if method != "POST":
+            return 405, _errors(405, f"{method} not allowed"), {}
+        if relation == "attachments":
+            return self._add_attachment(project, work_item, headers, body)
+        return self._add_links(project, items, work_item, body)
+
+    def _find_work_items(self, project, items, path):
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(path).query).get("query", [""])[0]
+        legacy_ids = {re.sub(r"\\(.)", r"\1", term) for term in re.findall(r'"((?:[^"\\]|\\.)*)"', query)}
+        return 200, {"data": [{"type": "workitems", "id": f"{project}/{work_item}",
+                               "attributes": {"legacyID": attributes.get("legacyID")}}
+                              for work_item, attributes in items.items()
+                              if str(attributes.get("legacyID")) in legacy_ids]}, {}
+
+    def _create_work_items(self, project, items, body):
+        try:
+            resources = json.loads(body)["data"]
+            titles = [resource["attributes"]["title"] for resource in resources]
+        except (ValueError, KeyError, TypeError):
+            return 400, _errors(400, "Expected {\"data\": [work item resources with a title]}"), {}
+        if self.max_batch and len(titles) > self.max_batch:
+            return 413, _errors(413, f"At most {self.max_batch} work items per request"), {}
+        created = []
+        for resource in resources:
+            work_item = f"WI-{len(items) + 1}"
+            items[work_item] = resource["attributes"]
+            created.append({"type": "workitems", "id": f"{project}/{work_item}"})
+        return 201, {"data": created}, {}
+
+    def _add_attachment(self, project, work_item, headers, body):
+        boundary = re.search(r"boundary=([^;]+)", headers.get("content-type", ""))
+        if boundary is None:
+            return 400, _errors(400, "Expected multipart/form-data"), {}
+        parts = {}
+        for part in body.split(b"--" + boundary.group(1).encode("latin-1"))[1:-1]:
+            head, _, content = part[2:].partition(b"\r\n\r\n")
+            name = re.search(rb'name="([^"]+)"', head)
+            if name is not None:
+                parts[name.group(1).decode("latin-1")] = content[:-2]  # strip the CRLF before the boundary
+        try:
+            attributes = json.loads(parts["resource"])["data"][0]["attributes"]
+            content = parts["files"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            return 400, _errors(400, "Expected a resource and a files part"), {}
+        entries = self.attachments.setdefault((project, work_item), [])
+        entries.append({"fileName": attributes.get("fileName"), "title": attributes.get("title"),
+                        "size": len(content), "hash": hashlib.blake2b(content, digest_size=16).hexdigest()})
+        return 201, {"data": [{"type": "workitem_attachments",
+                               "id": f"{project}/{work_item}/{len(entries)}"}]}, {}
+
+    def _add_links(self, project, items, work_item, body):
+        try:
+            links = [(resource["attributes"]["role"],
+                      resource["relationships"]["workItem"]["data"]["id"].rsplit("/", 1)[-1])
+                     for resource in json.loads(body)["data"]]
+        except (ValueError, KeyError, TypeError):
+            return 400, _errors(400, "Expected {\"data\": [linked work item resources]}"), {}
+        missing = [target for _, target in links if target not in items]
+        if missing:
+            return 404, _errors(404, f"Link targets not found: {', '.join(missing)}"), {}
+        self.links.setdefault((project, work_item), []).extend(links)
+        return 201, {"data": [{"type": "linkedworkitems", "id": f"{project}/{work_item}/{role}/{project}/{target}"}
+                              for role, target in links]}, {}
+
+
+def _errors(status, detail):
+    return {"errors": [{"status": str(status), "detail": detail}]}
+
+
+async def _serve_forever(mock, host, port):
+    port = await mock.start(host, port)
+    print(f"🧪 Mock Polarion listening on http://{host}:{port}/polarion/rest/v1 (Ctrl+C stops)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await mock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the Polarion REST import endpoints.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8787, help="port to listen on (default: 8787)")
+    parser.add_argument("--latency", type=float, default=0.0, metavar="SEC", help="delay of every response")
+    parser.add_argument("--fail-rate", type=float, default=0.0, metavar="SHARE",
+                        help="share of requests answered with 503 (default: 0)")
+    parser.add_argument("--lose-rate", type=float, default=0.0, metavar="SHARE",
+                        help="share of create requests handled but answered with 503 (default: 0)")
+    parser.add_argument("--max-batch", type=int, metavar="N", help="reject creating more than N work items at once")
+    parser.add_argument("--token", help="bearer token requests must carry")
+    args = parser.parse_args(argv)
+    mock = MockPolarion(args.latency, args.fail_rate, args.max_batch, args.token, lose_rate=args.lose_rate)
+    try:
+        asyncio.run(_serve_forever(mock, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    print(f"\n Served: {json.dumps(mock.report())}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,204 @@
+"""Benchmark harness for the transform pipeline.
+
+Times each stage (JSON parse, transform_json, clean_primary_html,
+diagram_image_to_description, serialization, streaming transform) on the
+IBM_JSON samples and on synthetic modules from generate_modules.py, reports
+throughput and peak memory, and compares against a stored baseline.
+
+    python benchmarks/run_benchmarks.py                    # run and compare
+    python benchmarks/run_benchmarks.py --save-baseline    # store as new baseline
+    python benchmarks/run_benchmarks.py --scenario deep --artifacts 20000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from polarion_transform.cache import diagram_cache, html_cache  # noqa: E402
+from polarion_transform.diagram import diagram_image_to_description  # noqa: E402
+from polarion_transform.html_cleaner import clean_primary_html  # noqa: E402
+from polarion_transform.output import module_writer  # noqa: E402
+from polarion_transform.streaming import transform_json_stream  # noqa: E402
+from polarion_transform.transform import count_artifacts, transform_json  # noqa: E402
+from generate_modules import generate_module, load_sample_shapes  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Synthetic scenarios; artifact counts are scaled by --artifacts
+SCENARIOS = {
+    "flat": {"depth": 0},
+    "deep": {"depth": 6, "fanout": 2},
+    "wide": {"depth": 1, "fanout": 50},
+    "rich_html": {"html_size": 4000},
+    "diagrams": {"diagram_shapes": 40, "diagram_ratio": 0.5},
+    "links": {"links": 20},
+}
+
+
+def sample_modules():
+    folder = os.path.join(ROOT, "IBM_JSON")
+    texts = []
+    for filename in sorted(os.listdir(folder)):
+        if filename.endswith(".json"):
+            with open(os.path.join(folder, filename), "r", encoding="utf-8") as f:
+                texts.append(f.read())
+    return texts
+
+
+def collect_fields(artifacts, html, diagrams):
+    for artifact in artifacts:
+        for key in ("primary_text_html", "primary_text_html_local"):
+            if artifact.get(key):
+                html.append(artifact[key])
+        if artifact.get("diagram_image"):
+            diagrams.append(artifact["diagram_image"])
+        collect_fields(artifact.get("children") or [], html, diagrams)
+
+
+def clear_caches():
+    html_cache.clear()
+    diagram_cache.clear()
+
+
+def best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        clear_caches()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(func):
+    clear_caches()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_scenario(module_texts, repeat):
+    """Per-stage timings for a list of module JSON texts."""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i, text in enumerate(module_texts):
+            paths.append(os.path.join(tmp, f"module_{i}.json"))
+            with open(paths[-1], "w", encoding="utf-8") as f:
+                f.write(text)
+        return _run_stages(module_texts, paths, repeat)
+
+
+def _run_stages(module_texts, paths, repeat):
+    modules = [json.loads(text) for text in module_texts]
+    transformed = [transform_json(m) for m in modules]
+    html, diagrams = [], []
+    for module in modules:
+        collect_fields(module.get("artifacts", []), html, diagrams)
+    artifacts = sum(count_artifacts(m.get("artifacts", [])) for m in transformed)
+    input_mb = sum(len(t.encode("utf-8")) for t in module_texts) / 1e6
+    output_mb = sum(len(json.dumps(m, indent=2, ensure_ascii=False).encode("utf-8")) for m in transformed) / 1e6
+    html_mb = sum(len(h.encode("utf-8")) for h in html) / 1e6
+    diagram_mb = sum(len(d.encode("utf-8")) for d in diagrams) / 1e6
+
+    def stream_all():
+        with open(os.devnull, "wb") as devnull:
+            for path in paths:
+                with open(path, "r", encoding="utf-8") as infile:
+                    # json module serializer, so the stage stays comparable with the baseline
+                    transform_json_stream(infile, module_writer(devnull, "json", "json"))
+
+    def end_to_end():
+        for text in module_texts:
+            json.dumps(transform_json(json.loads(text)), indent=2, ensure_ascii=False)
+
+    stages = {
+        "parse": (lambda: [json.loads(t) for t in module_texts], input_mb, artifacts),
+        "transform_json": (lambda: [transform_json(m) for m in modules], input_mb, artifacts),
+        "clean_primary_html": (lambda: [clean_primary_html(h) for h in html], html_mb, len(html)),
+        "diagram_image_to_description": (lambda: [diagram_image_to_description(d) for d in diagrams],
+                                         diagram_mb, len(diagrams)),
+        "serialize": (lambda: [json.dumps(m, indent=2, ensure_ascii=False) for m in transformed],
+                      output_mb, artifacts),
+        "stream": (stream_all, input_mb, artifacts),
+        "end_to_end": (end_to_end, input_mb, artifacts),
+    }
+    results = {}
+    for name, (func, mb, items) in stages.items():
+        if not items:
+            continue
+        seconds = best_time(func, repeat)
+        results[name] = {
+            "seconds": round(seconds, 6),
+            "items_per_sec": round(items / seconds, 1),
+            "mb_per_sec": round(mb / seconds, 2),
+        }
+    results["end_to_end"]["peak_memory_mb"] = round(peak_memory(end_to_end) / 1e6, 2)
+    results["stream"]["peak_memory_mb"] = round(peak_memory(stream_all) / 1e6, 2)
+    return {"artifacts": artifacts, "input_mb": round(input_mb, 3), "stages": results}
+
+
+def print_report(results, baseline):
+    for scenario, result in results.items():
+        print(f"\n📊 {scenario}: {result['artifacts']} artifacts | {result['input_mb']} MB input")
+        base_stages = baseline.get(scenario, {}).get("stages", {})
+        for stage, metrics in result["stages"].items():
+            line = (f"   {stage:<30} {metrics['seconds'] * 1000:10.2f} ms"
+                    f" {metrics['items_per_sec']:12.1f} items/sec {metrics['mb_per_sec']:9.2f} MB/sec")
+            if "peak_memory_mb" in metrics:
+                line += f" | peak {metrics['peak_memory_mb']} MB"
+            base = base_stages.get(stage)
+            if base:
+                change = (metrics["seconds"] - base["seconds"]) / base["seconds"] * 100
+                marker = "⚠️ " if change > 10 else ""
+                line += f" | {marker}{change:+.1f}% vs baseline"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=["samples", *SCENARIOS],
+                        help="scenario to run, may be repeated (default: all)")
+    parser.add_argument("--artifacts", type=int, default=2000, help="work items per synthetic module")
+    parser.add_argument("--repeat", type=int, default=3, help="timing repetitions, best run is reported")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    scenarios = args.scenario or ["samples", *SCENARIOS]
+    shapes = load_sample_shapes()
+    results = {}
+    for scenario in scenarios:
+        if scenario == "samples":
+            texts = sample_modules()
+        else:
+            module = generate_module(artifacts=args.artifacts, shapes=shapes, title=scenario, **SCENARIOS[scenario])
+            texts = [json.dumps(module, indent=2, ensure_ascii=False)]
+        results[scenario] = run_scenario(texts, args.repeat)
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
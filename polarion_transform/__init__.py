@@ -0,0 +1,50 @@
+"""DOORS Next (DNG) module export -> Polarion import JSON transform.
+
+    import polarion_transform as pt
+
+    polarion = pt.transform_module(dng_module_dict)
+    pt.transform_file("IBM_JSON/REQ.json", "POLARION_JSON/REQ.json")
+    pt.transform_directory("IBM_JSON", "POLARION_JSON", workers=4)
+    pt.transform_directory("REQIF", "POLARION_JSON", input_format="reqif")  # or csv, or auto
+    pt.watch_directory("IBM_JSON", "POLARION_JSON", workers=4)  # as the exporter writes
+    pt.transform_delta("IBM_JSON", "POLARION_DELTA")  # only what changed since the last delta run
+    pt.import_directory("POLARION_JSON", "https://host/polarion/rest/v1", "PROJ", token=...)
+
+Importing the package does no work: the submodules (and their compiled
+patterns and caches) are loaded on first use of a name below.
+"""
+
+# public name -> submodule that defines it
+_EXPORTS = {
+    "transform_module": "api",
+    "transform_file": "api",
+    "transform_directory": "api",
+    "watch_directory": "api",
+    "transform_delta": "api",
+    "TransformError": "api",
+    "read_module": "adapters",
+    "import_directory": "polarion_import",
+    "PolarionError": "polarion_import",
+    "transform_json": "transform",
+    "transform_artifact": "transform",
+    "clean_primary_html": "html_cleaner",
+    "diagram_image_to_description": "diagram",
+    "main": "cli",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,610 @@
+"""Input adapters: DNG JSON, ReqIF and CSV exports read into the module layout the transform works on.
+
+transform_json and every stage after it (cleaning, field mapping, links,
+attachments) read a module as the DNG exporter writes it: a dict of module
+fields and "artifacts", each artifact a mapping of identifier, title,
+primary_text_html, ... with its "children". An adapter turns one source
+file into that layout; which one is picked by the file's extension:
+
+    dng     *.json             modules of the DNG exporter
+    reqif   *.reqif, *.reqifz  ReqIF 1.x documents (.reqifz: zipped)
+    csv     *.csv              one artifact per row
+
+ReqIF: every SPEC-OBJECT in the SPECIFICATION's hierarchy becomes an
+artifact and its SPEC-RELATIONs its linked_artifacts. The standard ReqIF.*
+attributes give the DNG fields (REQIF_FIELDS); other attributes are named
+after their long name (lower case, "_" for spaces) unless that already is a
+plain key. The first SPECIFICATION's own attributes give the module fields;
+the trees of further specifications are appended to its artifacts.
+
+CSV: the header names the fields (with CSV_FIELDS for common export
+headers such as "ID" or "Primary Text"). module_* columns are module fields,
+taken from the first row (module_title defaults to the file name), and a
+parent column holds the identifier of the artifact's parent, which must
+come before it. List fields (LIST_FIELDS) are JSON arrays or ";"-separated.
+
+ReqIF and CSV artifacts are LazyRecords: they keep the source values (XHTML
+elements, enumeration value refs, cell text) and decode each field on first
+access. FieldMapping.apply does not read the fields it drops, so the fields
+a project's mapping drops (say comments or wrapped_resource) are never
+decoded. The DNG adapter parses with orjson when it is installed and leaves
+out the module fields the mapping drops (structure,
+artifact_uris_in_module_order, ...) as it reads them, so they are not held
+while the module is transformed. They are still decoded, not skipped
+unparsed: the C JSON decoders get through them several times faster than a
+Python scanner could skip them.
+"""
+import copy
+import csv
+import io
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from collections.abc import Mapping
+
+from . import transform
+from .compact import compact_pairs
+from .streaming import iter_module_json
+
+INPUT_FORMATS = ("auto", "dng", "reqif", "csv")
+
+# ReqIF standard attribute long name -> DNG export field
+REQIF_FIELDS = {
+    "ReqIF.ForeignID": "identifier",
+    "ReqIF.Name": "title",
+    "ReqIF.ChapterName": "title",
+    "ReqIF.Text": "primary_text_html",
+    "ReqIF.Description": "description",
+    "ReqIF.ForeignCreatedOn": "created_on",
+    "ReqIF.ForeignCreatedBy": "created_by",
+    "ReqIF.ForeignModifiedOn": "modified_on",
+    "ReqIF.ForeignModifiedBy": "modified_by",
+}
+
+# Normalized CSV header -> DNG export field
+CSV_FIELDS = {
+    "id": "identifier",
+    "name": "title",
+    "primary_text": "primary_text_html",
+    "type": "artifact_type",
+    "status": "artifact_status",
+    "format": "artifact_format",
+    "parent_id": "parent",
+    "parent_identifier": "parent",
+}
+
+# Artifact fields that hold lists in the DNG export
+LIST_FIELDS = ("linked_artifacts", "embedded_wrapped_resources_saved", "comments", "attachments")
+
+# Specification / module attributes that get the module_ prefix of the DNG module fields
+_MODULE_PREFIXED = ("identifier", "title", "description", "primary_text_html", "status", "type")
+
+_PLAIN_KEY = re.compile(r"^[a-z][a-z0-9_\-]*$")
+_NOT_KEY_CHARS = re.compile(r"[^0-9a-z]+")
+
+_REQIF = {"r": "http://www.omg.org/spec/ReqIF/20110401/reqif.xsd"}
+_R = "{http://www.omg.org/spec/ReqIF/20110401/reqif.xsd}"
+_XHTML_TAG = "{http://www.w3.org/1999/xhtml}"
+
+# Source values manifest.artifact_hash can hash as they are
+_PLAIN_TYPES = (str, list, dict, int, float, bool, type(None))
+
+
+# ======================
+# LAZY RECORDS
+# ======================
+class Layout:
+    """Field names and per-field decoders (None: the source value is the value) shared by LazyRecords."""
+
+    __slots__ = ("fields", "index", "decoders")
+
+    def __init__(self, fields, decoders):
+        self.fields = tuple(fields)
+        self.index = {key: i for i, key in enumerate(self.fields)}
+        self.decoders = tuple(decoders)
+
+
+class LazyRecord(Mapping):
+    """Mapping over undecoded source values; each field is decoded on first access and then kept.
+
+    Existing fields can be replaced (clean_source_fields does); new ones cannot be added.
+    """
+
+    __slots__ = ("_layout", "_raw", "_values")
+
+    def __init__(self, layout, raw, values=None):
+        self._layout = layout
+        self._raw = raw
+        self._values = values  # key -> decoded or replaced value
+
+    def __getitem__(self, key):
+        values = self._values
+        if values is not None and key in values:
+            return values[key]
+        i = self._layout.index[key]
+        decode = self._layout.decoders[i]
+        if decode is None:
+            return self._raw[i]
+        value = decode(self._raw[i])
+        if values is None:
+            values = self._values = {}
+        values[key] = value
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self._layout.index else default
+
+    def __setitem__(self, key, value):
+        if key not in self._layout.index:
+            raise KeyError(key)
+        if self._values is None:
+            self._values = {}
+        self._values[key] = value
+
+    def __contains__(self, key):
+        return key in self._layout.index
+
+    def __iter__(self):
+        return iter(self._layout.fields)
+
+    def __len__(self):
+        return len(self._layout.fields)
+
+    def items(self):
+        return ((key, self[key]) for key in self._layout.fields)
+
+    def kept_items(self, rules):
+        """items() without the keys a mapping dispatch table drops; their values are not decoded."""
+        for key in self._layout.fields:
+            rule = rules.get(key)
+            if rule is None or rule[0] is not None:
+                yield key, self[key]
+
+    def decode_counts(self):
+        """(fields with a decoder, fields decoded or replaced so far), for benchmarks."""
+        return sum(decoder is not None for decoder in self._layout.decoders), len(self._values or ())
+
+    def copy(self):
+        return LazyRecord(self._layout, self._raw, None if self._values is None else dict(self._values))
+
+    def to_dict(self):
+        """Shallow dict of the record, every field decoded; children stay LazyRecords."""
+        return dict(self.items())
+
+    def source_dict(self):
+        """The record with its source values instead of the decoded ones where those are plain JSON.
+
+        manifest.artifact_hash hashes this, so recording artifact hashes decodes nothing.
+        """
+        fields, raw = self._layout.fields, self._raw
+        return {key: raw[i] if raw[i].__class__ in _PLAIN_TYPES else self[key] for i, key in enumerate(fields)}
+
+    def __repr__(self):
+        return f"LazyRecord({self.to_dict()!r})"
+
+
+def _field_name(name, aliases=None):
+    """Field name for a source attribute or column name: kept if it is a plain key, else normalized."""
+    name = name.strip()
+    key = name if _PLAIN_KEY.match(name) else _NOT_KEY_CHARS.sub("_", name.lower()).strip("_")
+    return aliases.get(key, key) if aliases else key
+
+
+def dropped_module_fields():
+    """Module fields the current mapping drops (none while the map_fields stage is off).
+
+    module_type is kept even when dropped: the transform still derives space_id from it.
+    """
+    if "map_fields" not in transform.stages:
+        return ()
+    return [key for key, (new_key, _) in transform.field_mapping.module_rules.items()
+            if new_key is None and key != "module_type"]
+
+
+# ======================
+# ADAPTERS
+# ======================
+class InputAdapter:
+    """Reads one source file into a DNG-layout module; subclasses implement parse()."""
+
+    name = None
+    extensions = ()
+
+    def parse(self, raw, filename, compact_model=False, skip_dropped=True):
+        """The module in a file's bytes; raises ValueError if it is not a module of this format."""
+        raise NotImplementedError
+
+    def read(self, path, compact_model=False, skip_dropped=True):
+        with open(path, "rb") as f:
+            raw = f.read()
+        return self.parse(raw, os.path.basename(path), compact_model, skip_dropped)
+
+    def iter_fields(self, path, skip_dropped=True):
+        """(key, value) per module field like streaming.iter_module_json; artifacts come as a generator."""
+        for key, value in self.read(path, skip_dropped=skip_dropped).items():
+            if key == "artifacts" and isinstance(value, list):
+                value = (artifact for artifact in value)
+            yield key, value
+
+
+class DngJsonAdapter(InputAdapter):
+    """Modules of the DNG exporter."""
+
+    name = "dng"
+    extensions = (".json",)
+
+    def __init__(self):
+        try:
+            import orjson
+
+            self._loads = orjson.loads
+        except ImportError:
+            self._loads = json.loads
+
+    def parse(self, raw, filename, compact_model=False, skip_dropped=True):
+        if compact_model:
+            return json.loads(raw, object_pairs_hook=compact_pairs)
+        try:
+            data = self._loads(raw)
+        except ValueError:
+            # orjson rejects NaN and Infinity, which json reads
+            data = json.loads(raw)
+        if skip_dropped and isinstance(data, dict):
+            for key in dropped_module_fields():
+                data.pop(key, None)
+        return data
+
+    def iter_fields(self, path, skip_dropped=True):
+        dropped = set(dropped_module_fields()) if skip_dropped else ()
+        with open(path, "r", encoding="utf-8") as infile:
+            for key, value in iter_module_json(infile):
+                if key not in dropped:
+                    yield key, value
+
+
+class ReqIfAdapter(InputAdapter):
+    """ReqIF documents; see the module docstring for how they map to DNG fields."""
+
+    name = "reqif"
+    extensions = (".reqif", ".reqifz")
+
+    def parse(self, raw, filename, compact_model=False, skip_dropped=True):
+        if raw[:2] == b"PK":
+            raw = _reqifz_document(raw, filename)
+        try:
+            root = ET.fromstring(raw)
+        except ET.ParseError as e:
+            raise ValueError(f"{filename} is not a ReqIF document: {e}") from None
+        content = root.find("r:CORE-CONTENT/r:REQ-IF-CONTENT", _REQIF)
+        if content is None:
+            raise ValueError(f"{filename} is not a ReqIF document: no REQ-IF-CONTENT")
+        return _ReqIfContent(content).module(root.findtext("r:THE-HEADER/r:REQ-IF-HEADER/r:TITLE", "", _REQIF))
+
+
+def _reqifz_document(raw, filename):
+    try:
+        with zipfile.ZipFile(io.BytesIO(raw)) as archive:
+            names = [name for name in archive.namelist() if name.lower().endswith(".reqif")]
+            if not names:
+                raise ValueError(f"{filename} has no .reqif document")
+            return archive.read(names[0])
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"{filename} is not a ReqIF archive: {e}") from None
+
+
+def _child(element, tag):
+    """First child with a ReqIF tag; per spec object, this is much faster than an ElementPath find."""
+    for child in element:
+        if child.tag == tag:
+            return child
+    return None
+
+
+def _ref(element, tag):
+    """Text of the ...-REF element in element's child tag (e.g. TYPE), or None."""
+    for child in element:
+        if child.tag == tag:
+            for ref in child:
+                return ref.text
+    return None
+
+
+def _children(element, tag, child_tag):
+    """Children with child_tag of element's child tag (e.g. the SPEC-HIERARCHYs in CHILDREN)."""
+    for child in element:
+        if child.tag == tag:
+            return [item for item in child if item.tag == child_tag]
+    return []
+
+
+def _xhtml_html(the_value):
+    """HTML of an XHTML attribute value (its THE-VALUE element), without the xhtml namespace."""
+    parts = []
+    for element in the_value:
+        element = copy.deepcopy(element)
+        for node in element.iter():
+            if node.tag.startswith(_XHTML_TAG):
+                node.tag = node.tag[len(_XHTML_TAG):]
+        parts.append(ET.tostring(element, encoding="unicode"))
+    return "".join(parts).strip()
+
+
+class _ReqIfContent:
+    """Definitions of one REQ-IF-CONTENT, resolved once, and the records built from them."""
+
+    def __init__(self, content):
+        self.content = content
+        self.enum_names = {value.get("IDENTIFIER"): value.get("LONG-NAME") or value.get("IDENTIFIER")
+                           for value in content.iterfind(
+                               "r:DATATYPES/r:DATATYPE-DEFINITION-ENUMERATION/r:SPECIFIED-VALUES/r:ENUM-VALUE",
+                               _REQIF)}
+        self.type_names = {spec_type.get("IDENTIFIER"): spec_type.get("LONG-NAME") or ""
+                           for spec_type in content.iterfind("r:SPEC-TYPES/*", _REQIF)}
+        self.attributes = {}  # attribute definition id -> (field, kind, decoder)
+        for definition in content.iterfind("r:SPEC-TYPES/*/r:SPEC-ATTRIBUTES/*", _REQIF):
+            kind = definition.tag.rsplit("ATTRIBUTE-DEFINITION-", 1)[-1]
+            long_name = definition.get("LONG-NAME") or definition.get("IDENTIFIER")
+            decoder = None
+            if kind == "XHTML":
+                decoder = _xhtml_html
+            elif kind == "ENUMERATION":
+                decoder = self._enum_list if definition.get("MULTI-VALUED") == "true" else self._enum_value
+            self.attributes[definition.get("IDENTIFIER")] = (
+                REQIF_FIELDS.get(long_name) or _field_name(long_name), kind, decoder)
+        self.identifiers = {}  # SPEC-OBJECT id -> artifact identifier
+        self.layouts = {}
+
+    def _enum_value(self, refs):
+        return self.enum_names.get(refs[0], refs[0]) if refs else ""
+
+    def _enum_list(self, refs):
+        return [self.enum_names.get(ref, ref) for ref in refs]
+
+    def _links(self, relations):
+        return [{"identifier": self.identifiers.get(target, target), "link_role": role} for target, role in relations]
+
+    def _values(self, element):
+        """(field, source value, decoder) of the attribute values of a spec object or specification."""
+        values = _child(element, _R + "VALUES")
+        for value in () if values is None else values:
+            attribute = self.attributes.get(_ref(value, _R + "DEFINITION"))
+            if attribute is None:
+                continue
+            field, kind, decoder = attribute
+            if kind == "XHTML":
+                source = _child(value, _R + "THE-VALUE")
+                if source is None:
+                    continue
+            elif kind == "ENUMERATION":
+                source = [ref.text for ref in _children(value, _R + "VALUES", _R + "ENUM-VALUE-REF")]
+            else:
+                source = value.get("THE-VALUE", "")
+            yield field, source, decoder
+
+    def _layout(self, fields, decoders):
+        key = (fields, decoders)
+        layout = self.layouts.get(key)
+        if layout is None:
+            layout = self.layouts[key] = Layout(fields, decoders)
+        return layout
+
+    def _objects(self):
+        """SPEC-OBJECT id -> (fields, source values, decoders) of every spec object."""
+        relations = {}
+        for relation in self.content.iterfind("r:SPEC-RELATIONS/r:SPEC-RELATION", _REQIF):
+            source = _ref(relation, _R + "SOURCE")
+            target = _ref(relation, _R + "TARGET")
+            if source and target:
+                role = self.type_names.get(_ref(relation, _R + "TYPE"), "")
+                relations.setdefault(source, []).append([target, role])
+        objects = {}
+        for spec_object in self.content.iterfind("r:SPEC-OBJECTS/r:SPEC-OBJECT", _REQIF):
+            object_id = spec_object.get("IDENTIFIER")
+            entries = {"identifier": (object_id, None)}
+            if spec_object.get("LONG-NAME"):
+                entries["title"] = (spec_object.get("LONG-NAME"), None)
+            entries["artifact_type"] = (
+                self.type_names.get(_ref(spec_object, _R + "TYPE"), ""), None)
+            for field, source, decoder in self._values(spec_object):
+                entries[field] = (source, decoder)
+            entries.setdefault("modified_on", (spec_object.get("LAST-CHANGE") or "", None))
+            if object_id in relations:
+                entries["linked_artifacts"] = (relations[object_id], self._links)
+            self.identifiers[object_id] = entries["identifier"][0]
+            objects[object_id] = (tuple(entries), tuple(source for source, _ in entries.values()),
+                                  tuple(decoder for _, decoder in entries.values()))
+        return objects
+
+    def module(self, header_title=""):
+        objects = self._objects()
+        specifications = self.content.findall("r:SPECIFICATIONS/r:SPECIFICATION", _REQIF)
+        module = {}
+        if specifications:
+            specification = specifications[0]
+            module["module_identifier"] = specification.get("IDENTIFIER")
+            module["module_title"] = specification.get("LONG-NAME") or header_title
+            module["module_type"] = self.type_names.get(
+                specification.findtext("r:TYPE/r:SPECIFICATION-TYPE-REF", "", _REQIF), "")
+            for field, source, decoder in self._values(specification):
+                key = f"module_{field}" if field in _MODULE_PREFIXED else field
+                module[key] = source if decoder is None else decoder(source)
+            module.setdefault("modified_on", specification.get("LAST-CHANGE") or "")
+        else:
+            module["module_title"] = header_title
+        module["module_format"] = "ReqIF"
+
+        # The hierarchy is walked with an explicit stack, like transform_artifact
+        artifacts, count = [], 0
+        stack = [(node, artifacts) for specification in reversed(specifications)
+                 for node in reversed(specification.findall("r:CHILDREN/r:SPEC-HIERARCHY", _REQIF))]
+        while stack:
+            node, siblings = stack.pop()
+            child_nodes = _children(node, _R + "CHILDREN", _R + "SPEC-HIERARCHY")
+            entry = objects.get(_ref(node, _R + "OBJECT"))
+            if entry is None:
+                # Dangling object ref: its children take its place
+                stack.extend((child, siblings) for child in reversed(child_nodes))
+                continue
+            fields, sources, decoders = entry
+            children = None
+            if child_nodes:
+                children = []
+                fields, sources, decoders = (*fields, "children"), (*sources, children), (*decoders, None)
+            siblings.append(LazyRecord(self._layout(fields, decoders), sources))
+            count += 1
+            if children is not None:
+                stack.extend((child, children) for child in reversed(child_nodes))
+        module["artifact_count"] = count
+        module["artifacts"] = artifacts
+        return module
+
+
+class CsvAdapter(InputAdapter):
+    """One artifact per row; see the module docstring for the columns."""
+
+    name = "csv"
+    extensions = (".csv",)
+
+    def parse(self, raw, filename, compact_model=False, skip_dropped=True):
+        try:
+            rows = csv.reader(io.StringIO(raw.decode("utf-8-sig"), newline=""))
+            header = next(rows, None)
+            if not header:
+                raise ValueError(f"{filename} has no header row")
+            module_columns, columns, fields, decoders = [], [], [], []
+            parent_column = None
+            for i, name in enumerate(header):
+                field = _field_name(name, CSV_FIELDS)
+                if field == "parent":
+                    parent_column = i
+                elif field.startswith("module_"):
+                    module_columns.append((i, field))
+                elif field and field not in fields:
+                    columns.append(i)
+                    fields.append(field)
+                    decoders.append(_links_cell if field == "linked_artifacts"
+                                    else _list_cell if field in LIST_FIELDS else None)
+            if "identifier" not in fields:
+                raise ValueError(f"{filename} has no identifier (ID) column")
+            identifier_column = columns[fields.index("identifier")]
+            width = len(header)
+
+            entries, seen, parents = [], set(), set()
+            module = {"module_title": os.path.splitext(filename)[0]}
+            for row in rows:
+                if not any(row):
+                    continue
+                if len(row) < width:
+                    row = row + [""] * (width - len(row))
+                if not entries:
+                    module.update((field, row[i]) for i, field in module_columns)
+                identifier = row[identifier_column]
+                parent = row[parent_column] if parent_column is not None else ""
+                if parent not in seen:
+                    parent = ""  # parents come first; anything else is top level
+                if parent:
+                    parents.add(parent)
+                seen.add(identifier)
+                entries.append((tuple(row[i] for i in columns), identifier, parent))
+        except (csv.Error, UnicodeDecodeError) as e:
+            raise ValueError(f"{filename} is not a readable CSV file: {e}") from None
+
+        layout = Layout(fields, decoders)
+        with_children = Layout((*fields, "children"), (*decoders, None))
+        artifacts, children_of = [], {}
+        for sources, identifier, parent in entries:
+            if identifier in parents:
+                children = children_of[identifier] = []
+                record = LazyRecord(with_children, (*sources, children))
+            else:
+                record = LazyRecord(layout, sources)
+            (children_of[parent] if parent else artifacts).append(record)
+        module["module_format"] = "CSV"
+        module["artifact_count"] = len(entries)
+        module["artifacts"] = artifacts
+        return module
+
+
+def _list_cell(text):
+    """A list field's cell: a JSON array, or ";"-separated values."""
+    if text.startswith("["):
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+    return [part.strip() for part in text.split(";") if part.strip()]
+
+
+def _links_cell(text):
+    """linked_artifacts cell: a JSON array of links, or ";"-separated target identifiers."""
+    return [link if isinstance(link, dict) else {"identifier": link} for link in _list_cell(text)]
+
+
+# ======================
+# REGISTRY
+# ======================
+ADAPTERS = {adapter.name: adapter for adapter in (DngJsonAdapter, ReqIfAdapter, CsvAdapter)}
+
+_adapters = {}
+
+
+def get_adapter(name="dng"):
+    """Adapter instance by name, created once per process."""
+    adapter = _adapters.get(name)
+    if adapter is None:
+        if name not in ADAPTERS:
+            raise ValueError(f"Unknown input format {name!r}; expected one of {INPUT_FORMATS}")
+        adapter = _adapters[name] = ADAPTERS[name]()
+    return adapter
+
+
+def adapter_for(path):
+    """Adapter for a file by its extension; anything unknown is read as DNG JSON."""
+    extension = os.path.splitext(path)[1].lower()
+    for name, adapter in ADAPTERS.items():
+        if extension in adapter.extensions:
+            return get_adapter(name)
+    return get_adapter("dng")
+
+
+def input_extensions(input_format="dng"):
+    """File extensions an input format reads ("auto": those of every adapter)."""
+    if input_format == "auto":
+        return tuple(extension for adapter in ADAPTERS.values() for extension in adapter.extensions)
+    if input_format not in ADAPTERS:
+        raise ValueError(f"Unknown input format {input_format!r}; expected one of {INPUT_FORMATS}")
+    return ADAPTERS[input_format].extensions
+
+
+def input_files(input_dir, input_format="dng"):
+    """Module files of input_dir in an input format; raises ValueError if two would get the same output name."""
+    extensions = input_extensions(input_format)
+    filenames = [filename for filename in os.listdir(input_dir) if filename.endswith(extensions)]
+    stems = {}
+    for filename in filenames:
+        other = stems.setdefault(os.path.splitext(filename)[0], filename)
+        if other != filename:
+            raise ValueError(f"{other} and {filename} in {input_dir} would both be written to the same output")
+    return filenames
+
+
+def read_module(path, compact_model=False, skip_dropped=True):
+    """Parse a module file with the adapter for its extension.
+
+    compact_model reads DNG JSON as compact records (see compact.py); ReqIF
+    and CSV artifacts are LazyRecords either way. skip_dropped leaves out
+    the DNG module fields the current mapping drops.
+    """
+    return adapter_for(path).read(path, compact_model, skip_dropped)
+
+
+def parse_module(raw, filename, skip_dropped=True):
+    """read_module for the bytes of a file already read."""
+    return adapter_for(filename).parse(raw, filename, skip_dropped=skip_dropped)
+
+
+def iter_module(path, skip_dropped=True):
+    """(key, value) per module field of a module file, artifacts as a generator (streaming mode)."""
+    return adapter_for(path).iter_fields(path, skip_dropped)
@@ -0,0 +1,654 @@
+"""Library entry points: transform a module dict, one file or a whole export folder, watch a folder or write deltas."""
+import json
+import os
+import shutil
+import time
+from collections import Counter
+
+from . import transform
+from .adapters import input_extensions, input_files
+from .attachments import MANIFEST_NAME, close_stagers, merge_reports
+from .diagram_files import RESOURCES_FOLDER
+from .cache import cache_stats
+from .delta import (DELTA_MANIFEST_NAME, affected_links, delta_file, delta_filename, load_snapshot,
+                    removed_module_delta, save_snapshot, snapshot_path, write_delta)
+from .link_index import build_link_index, link_index_path
+from .manifest import content_hash, file_hash, load_manifest, manifest_path, mapping_hash, save_manifest
+from .mappings import DEFAULT_CONFIG, get_field_mapping
+from .output import check_output_options, output_filename
+from .pipeline import resolve_stages
+from .runner import process_file, run_modules, summarize_metrics, write_metrics_report
+from .validation import DEFAULT_SCHEMA, get_schema
+from .watch import InputWatcher, WatchStatus, ignore_interrupts
+
+
+class TransformError(Exception):
+    """A module file could not be read, transformed or written."""
+
+
+def _check_stages(stages, stage_attachments):
+    stages = resolve_stages(stages)
+    if stage_attachments and not {"map_fields", "stage_attachments"} <= set(stages):
+        raise ValueError("Staging attachments needs the map_fields and stage_attachments pipeline stages")
+    return stages
+
+
+def _check_limits(shard_items, shard_bytes, inline_diagram_max):
+    for name, limit, minimum in (("shard_items", shard_items, 1), ("shard_bytes", shard_bytes, 1),
+                                 ("inline_diagram_max", inline_diagram_max, 0)):
+        if limit is not None and (not isinstance(limit, int) or limit < minimum):
+            raise ValueError(f"{name} must be an integer of at least {minimum}, not {limit!r}")
+
+
+def _run_key(field_mapping, output_format, compression, compression_level, serializer_name, stages, schema,
+             shard_items, shard_bytes, diagram_attachments, inline_diagram_max, compact_diagrams):
+    """The parts of the run key every run has, and the schema path (None without the validate stage)."""
+    run_key = [mapping_hash(field_mapping),
+               f"{output_format}|{compression}|{compression_level}|{serializer_name}", ",".join(stages)]
+    if shard_items or shard_bytes:
+        run_key.append(f"shards|{shard_items}|{shard_bytes}")
+    if diagram_attachments:
+        run_key.append(f"diagrams|{inline_diagram_max}")
+    if compact_diagrams:
+        # Changes the SVG of every rendered diagram
+        run_key.append("compact_diagrams")
+    if not {"map_fields", "validate"} <= set(stages):
+        return run_key, None
+    schema = schema or DEFAULT_SCHEMA
+    try:
+        get_schema(schema, field_mapping)  # fail early on a bad schema
+    except OSError as e:
+        raise ValueError(f"Cannot read schema {schema}: {e}") from e
+    run_key.append(file_hash(schema))
+    return run_key, schema
+
+
+def _check_previous_output(entry, input_path, output_path, output_dir):
+    """(output intact, input unchanged) of a module against its manifest entry."""
+    if not os.path.exists(output_path):
+        return False, False
+    try:
+        output_intact = file_hash(output_path) == entry["output_hash"] and all(
+            file_hash(os.path.join(output_dir, shard["file"])) == shard["hash"]
+            for shard in entry.get("shards", ())) and all(
+            os.path.exists(os.path.join(output_dir, RESOURCES_FOLDER, diagram_file))
+            for diagram_file in entry.get("diagrams", {}).get("files", ()))
+        return output_intact, file_hash(input_path) == entry["input_hash"]
+    except OSError:
+        return False, False
+
+
+def _run_reports(manifest, output_dir, sharded, diagram_attachments, resolve_links, schema, stage_attachments):
+    """Run summary entries from the module manifest entries, writing the run's report files next to output_dir."""
+    summary = {}
+    if sharded:
+        summary["shards"] = sum(len(entry.get("shards", ())) for entry in manifest["modules"].values())
+    if diagram_attachments:
+        reports = [entry["diagrams"] for entry in manifest["modules"].values() if "diagrams" in entry]
+        files = {}
+        for report in reports:
+            files.update(report["files"])
+        summary["diagrams"] = {
+            "attached": sum(report["attached"] for report in reports),
+            "inline": sum(report["inline"] for report in reports),
+            "files": len(files),
+            "bytes_written": sum(files.values()),
+            "bytes_saved": sum(report["bytes_saved"] for report in reports),
+        }
+    if resolve_links:
+        dangling = {filename: entry["links"]["dangling"] for filename, entry in sorted(manifest["modules"].items())
+                    if entry.get("links", {}).get("dangling")}
+        links_report = os.path.normpath(output_dir) + ".links.json"
+        summary["links"] = {
+            "resolved": sum(entry.get("links", {}).get("resolved", 0) for entry in manifest["modules"].values()),
+            "dangling": sum(len(links) for links in dangling.values()),
+            "report": links_report,
+        }
+        with open(links_report, "w", encoding="utf-8") as f:
+            json.dump({"resolved": summary["links"]["resolved"], "dangling": summary["links"]["dangling"],
+                       "modules": dangling}, f, indent=2, ensure_ascii=False)
+    if schema:
+        reports = {filename: entry["validation"] for filename, entry in sorted(manifest["modules"].items())
+                   if entry.get("validation", {}).get("violations")}
+        by_rule = Counter()
+        for report in reports.values():
+            by_rule.update(report["by_rule"])
+        validation_report = os.path.normpath(output_dir) + ".validation.json"
+        summary["validation"] = {
+            "violations": sum(report["violations"] for report in reports.values()),
+            "modules": len(reports),
+            "report": validation_report,
+        }
+        with open(validation_report, "w", encoding="utf-8") as f:
+            json.dump({"violations": summary["validation"]["violations"], "by_rule": dict(by_rule.most_common()),
+                       "modules": reports}, f, indent=2, ensure_ascii=False)
+    if stage_attachments:
+        staged = merge_reports(entry["attachments"] for entry in manifest["modules"].values()
+                               if "attachments" in entry)
+        staging_manifest = os.path.join(stage_attachments, MANIFEST_NAME)
+        os.makedirs(stage_attachments, exist_ok=True)
+        save_manifest(staging_manifest, staged)
+        summary["attachments"] = {key: staged[key] for key in ("references", "unique_files", "unique_blobs",
+                                                               "bytes_in_sources", "bytes_stored")}
+        summary["attachments"]["missing"] = len(staged["missing"])
+        summary["attachments"]["manifest"] = staging_manifest
+    return summary
+
+
+def transform_module(data, mappings=None, stages=None):
+    """Transform one parsed DNG module export into the Polarion import dict.
+
+    mappings is the path of a mapping config and stages a pipeline stage
+    selection to use for this call; by default the ones in use apply (the
+    packaged mappings.json and the full transform unless changed).
+    """
+    with transform.configured(mappings=mappings, stages=stages):
+        return transform.transform_json(data)
+
+
+def transform_file(input_path, output_path, stream=False, output_format="json", compact_diagrams=None,
+                   collect_metrics=False, mappings=None, link_index=None, stage_attachments=None,
+                   attachments_root=None, compression="none", compression_level=None, serializer="auto",
+                   compact_model=False, stages=None, schema=None, shard_items=None, shard_bytes=None,
+                   diagram_attachments=False, inline_diagram_max=None):
+    """Transform one module file into output_path and return its result (counts, timings, hashes).
+
+    input_path is read by the input adapter for its extension: DNG JSON,
+    ReqIF or CSV (see adapters.py).
+    output_format is json, minified or ndjson, compression none, gzip or zstd
+    (output_path is used as given; see output.output_filename) and serializer
+    auto, json or orjson. compact_model holds the module's artifacts as compact
+    records (see compact.py) while it is transformed. stages selects the
+    pipeline stages to run (see pipeline.py; default: the full transform);
+    with the validate stage the result has a "validation" report against
+    schema (default: the packaged schema.json). shard_items / shard_bytes
+    write the artifacts to shards of at most that many work items / bytes
+    next to output_path, which becomes the module header (see sharding.py).
+    diagram_attachments writes rendered diagrams over inline_diagram_max
+    bytes as SVG attachments into wrapped_resources next to output_path
+    (see diagram_files.py).
+
+    link_index is the path of an index from link_index.build_link_index to
+    resolve links against; the result then has a "links" report.
+    stage_attachments is a folder to stage the attachment files into (read
+    from attachments_root, default: the input file's folder); the result then
+    has an "attachments" report. Raises TransformError if the module could
+    not be processed.
+    """
+    check_output_options(output_format, compression, serializer)
+    stages = _check_stages(stages, stage_attachments)
+    _check_limits(shard_items, shard_bytes, inline_diagram_max)
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    try:
+        result = process_file(input_path, output_path, stream=stream, collect_metrics=collect_metrics,
+                              compact_svg=compact_diagrams, output_format=output_format, mappings=mappings,
+                              link_index=link_index, stage_attachments=stage_attachments,
+                              attachments_root=attachments_root, compression=compression,
+                              compression_level=compression_level, serializer=serializer,
+                              compact_model=compact_model, stages=stages, schema=schema, shard_items=shard_items,
+                              shard_bytes=shard_bytes, diagram_attachments=diagram_attachments,
+                              inline_diagram_max=inline_diagram_max)
+    finally:
+        close_stagers()
+    if "error" in result:
+        raise TransformError(result["error"])
+    return result
+
+
+def transform_directory(input_dir, output_dir, workers=1, force=False, stream=False, output_format="json",
+                        compact_diagrams=False, metrics_report=None, profile_dir=None, mappings=None,
+                        resolve_links=False, stage_attachments=None, attachments_root=None, on_result=None,
+                        compression="none", compression_level=None, serializer="auto", compact_model=False,
+                        stages=None, schema=None, shard_items=None, shard_bytes=None, diagram_attachments=False,
+                        inline_diagram_max=None, input_format="dng"):
+    """Transform every module file in input_dir into output_dir and return the run summary.
+
+    input_format picks the module files: dng (*.json), reqif (*.reqif,
+    *.reqifz), csv (*.csv) or auto (all of them); each file is read by the
+    adapter for its extension (see adapters.py).
+
+    Modules whose input and output are unchanged since the last run (per the
+    manifest next to output_dir) are skipped unless force is set. workers=0
+    uses one process per CPU. on_result, if given, is called with each module
+    result as it completes: skipped modules first (with "unchanged": True),
+    then processed ones, and failed ones carrying an "error" message.
+    mappings is the mapping config path (default: the packaged mappings.json).
+
+    Outputs are named by output.output_filename: <module>.json or .ndjson, plus
+    .gz / .zst when compressed. Changing format, compression, serializer,
+    compact_diagrams or the pipeline stages reruns every module.
+
+    resolve_links first indexes every artifact of every input module (into
+    <output_dir>.index), adds each link's resolved "target" and writes the
+    dangling links of all modules to <output_dir>.links.json.
+
+    With the validate stage every module is checked against schema (default:
+    the packaged schema.json) and the violations of all modules are written
+    to <output_dir>.validation.json.
+
+    shard_items / shard_bytes split every module's artifacts into shards of
+    at most that many work items / bytes for a parallel import; each
+    module's output file is then the header listing its shards (see
+    sharding.py).
+
+    diagram_attachments writes each rendered diagram over inline_diagram_max
+    bytes once, as an SVG file in <output_dir>/wrapped_resources, and
+    attaches it instead of inlining it (see diagram_files.py).
+
+    stage_attachments stores each attachment file once per content hash in
+    that folder (see attachments.py), reading them from attachments_root
+    (default: input_dir), and writes the run's blob manifest there.
+    """
+    serializer_name = check_output_options(output_format, compression, serializer).name
+    stages = _check_stages(stages, stage_attachments)
+    _check_limits(shard_items, shard_bytes, inline_diagram_max)
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    on_result = on_result or (lambda result: None)
+
+    # Ensure output folder exists
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_file = manifest_path(output_dir)
+    previous_manifest = load_manifest(manifest_file)
+    mappings = mappings or DEFAULT_CONFIG
+    filenames = input_files(input_dir, input_format)
+    # Everything besides the input files that decides the output bytes; any change reruns every module
+    run_key, schema = _run_key(get_field_mapping(mappings), output_format, compression, compression_level,
+                               serializer_name, stages, schema, shard_items, shard_bytes, diagram_attachments,
+                               inline_diagram_max, compact_diagrams)
+    link_index = None
+    if resolve_links:
+        link_index = link_index_path(output_dir)
+        # Link targets come from other modules, so any change to the index counts
+        run_key.append(build_link_index([os.path.join(input_dir, f) for f in filenames], link_index, workers,
+                                        mappings))
+    if stage_attachments:
+        attachments_root = attachments_root or input_dir
+        run_key.append(f"{os.path.abspath(stage_attachments)}|{os.path.abspath(attachments_root)}")
+    current_mapping_hash = content_hash("|".join(run_key).encode("utf-8"))
+    mappings_unchanged = previous_manifest.get("mapping_hash") == current_mapping_hash
+    manifest = {"mapping_hash": current_mapping_hash, "modules": {}}
+
+    jobs = []
+    skipped = []
+    for filename in filenames:
+        input_path = os.path.join(input_dir, filename)
+        output_path = os.path.join(output_dir, output_filename(filename, output_format, compression))
+        entry = previous_manifest["modules"].get(filename)
+        reuse_hashes = None
+        if entry and mappings_unchanged and not force:
+            output_intact, input_unchanged = _check_previous_output(entry, input_path, output_path, output_dir)
+            if output_intact and input_unchanged:
+                manifest["modules"][filename] = entry
+                skipped.append(entry)
+                continue
+            # Reused artifacts would be missing from the link, attachment and diagram reports
+            if output_intact and not resolve_links and not stage_attachments and not diagram_attachments:
+                reuse_hashes = entry.get("artifact_hashes") or []
+        jobs.append((input_path, output_path, reuse_hashes))
+
+    for filename, entry in manifest["modules"].items():
+        on_result({"filename": filename, "module_title": entry["module_title"],
+                   "artifacts_count": entry["artifacts_count"], "unchanged": True})
+
+    total_files = 0
+    total_failed = 0
+    total_reused = 0
+    total_artifacts = 0
+    total_time = 0
+    total_cache = {name: {"hits": 0, "misses": 0} for name in cache_stats()}
+    total_by_type, total_by_status = Counter(), Counter()
+    max_depth = 0
+    wall_start = time.time()
+    modules_with_metrics = []
+    options = {
+        "stream": stream,
+        "collect_metrics": bool(metrics_report),
+        "profile_dir": profile_dir,
+        "compact_svg": compact_diagrams,
+        "output_format": output_format,
+        "mappings": mappings,
+        "link_index": link_index,
+        "stage_attachments": stage_attachments,
+        "attachments_root": attachments_root,
+        "compression": compression,
+        "compression_level": compression_level,
+        "serializer": serializer,
+        "compact_model": compact_model,
+        "stages": stages,
+        "schema": schema,
+        "shard_items": shard_items,
+        "shard_bytes": shard_bytes,
+        "diagram_attachments": diagram_attachments,
+        "inline_diagram_max": inline_diagram_max,
+    }
+    try:
+        for result in run_modules(jobs, workers, **options):
+            on_result(result)
+            if "error" in result:
+                total_failed += 1
+                continue
+            total_files += 1
+            total_artifacts += result["artifacts_count"]
+            total_time += result["elapsed_time"]
+            total_reused += result["reused"]
+            total_by_type.update(result["stats"]["by_type"])
+            total_by_status.update(result["stats"]["by_status"])
+            max_depth = max(max_depth, result["stats"]["max_depth"])
+            manifest["modules"][result["filename"]] = result["manifest"]
+            for name, counts in result["cache"].items():
+                for k, v in counts.items():
+                    total_cache[name][k] += v
+            if "metrics" in result:
+                modules_with_metrics.append(result)
+    finally:
+        close_stagers()
+
+    save_manifest(manifest_file, manifest)
+
+    wall_time = round(time.time() - wall_start, 2)
+    summary = {
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(wall_start)),
+        "wall_sec": wall_time,
+        "module_sec": round(total_time, 2),
+        "workers": workers,
+        "files": total_files,
+        "failed": total_failed,
+        "unchanged": len(skipped),
+        "work_items": total_artifacts,
+        "reused": total_reused,
+        "max_depth": max_depth,
+        "by_type": dict(total_by_type.most_common()),
+        "by_status": dict(total_by_status.most_common()),
+        "cache": total_cache,
+    }
+    summary.update(_run_reports(manifest, output_dir, shard_items or shard_bytes, diagram_attachments,
+                                resolve_links, schema, stage_attachments))
+    if metrics_report:
+        run = {key: summary[key] for key in ("started", "wall_sec", "workers", "files", "failed", "unchanged",
+                                             "work_items", "max_depth", "cache")}
+        write_metrics_report(metrics_report, {**run, **summarize_metrics(modules_with_metrics)},
+                             modules_with_metrics)
+    return summary
+
+
+def watch_directory(input_dir, output_dir, workers=1, poll_sec=1.0, settle_sec=2.0, idle_sec=None, force=False,
+                    stream=False, output_format="json", compact_diagrams=False, mappings=None,
+                    stage_attachments=None, attachments_root=None, on_result=None, compression="none",
+                    compression_level=None, serializer="auto", compact_model=False, stages=None, schema=None,
+                    shard_items=None, shard_bytes=None, diagram_attachments=False, inline_diagram_max=None,
+                    input_format="dng"):
+    """Transform modules as they land in input_dir until interrupted (or idle for idle_sec); returns the summary.
+
+    Every poll_sec the folder is scanned for module files (of input_format,
+    as for transform_directory) that are complete
+    (unchanged for settle_sec; 0 for exporters that rename finished files
+    into place, see watch.py). Each one is transformed like
+    transform_directory would (same options, output names and manifest, so
+    unchanged modules are skipped unless force is set) by one of workers
+    long-lived processes, or in this process with workers=1; a module that
+    changes again while its job runs is requeued once that job is done. on_result gets
+    each module result with its "latency_sec" from complete on disk to
+    output written. Queue depth and latency are kept up to date in
+    <output_dir>.watch.json; the run reports (validation, attachments, ...)
+    are written when the watch ends. Links cannot be resolved in watch mode,
+    since they need every module first.
+    """
+    serializer_name = check_output_options(output_format, compression, serializer).name
+    stages = _check_stages(stages, stage_attachments)
+    _check_limits(shard_items, shard_bytes, inline_diagram_max)
+    extensions = input_extensions(input_format)
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    on_result = on_result or (lambda result: None)
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_file = manifest_path(output_dir)
+    manifest = load_manifest(manifest_file)
+    mappings = mappings or DEFAULT_CONFIG
+    run_key, schema = _run_key(get_field_mapping(mappings), output_format, compression, compression_level,
+                               serializer_name, stages, schema, shard_items, shard_bytes, diagram_attachments,
+                               inline_diagram_max, compact_diagrams)
+    if stage_attachments:
+        attachments_root = attachments_root or input_dir
+        run_key.append(f"{os.path.abspath(stage_attachments)}|{os.path.abspath(attachments_root)}")
+    current_mapping_hash = content_hash("|".join(run_key).encode("utf-8"))
+    if manifest.get("mapping_hash") != current_mapping_hash:
+        manifest = {"mapping_hash": current_mapping_hash, "modules": {}}
+    options = {
+        "stream": stream,
+        "compact_svg": compact_diagrams,
+        "output_format": output_format,
+        "mappings": mappings,
+        "stage_attachments": stage_attachments,
+        "attachments_root": attachments_root,
+        "compression": compression,
+        "compression_level": compression_level,
+        "serializer": serializer,
+        "compact_model": compact_model,
+        "stages": stages,
+        "schema": schema,
+        "shard_items": shard_items,
+        "shard_bytes": shard_bytes,
+        "diagram_attachments": diagram_attachments,
+        "inline_diagram_max": inline_diagram_max,
+    }
+
+    watcher = InputWatcher(input_dir, settle_sec, extensions)
+    status = WatchStatus(os.path.normpath(output_dir) + ".watch.json", workers)
+    total_artifacts = 0
+
+    def finish(result, completed):
+        nonlocal total_artifacts
+        latency = time.time() - completed
+        status.record(result, latency)
+        if "error" not in result and not result.get("unchanged"):
+            result["latency_sec"] = round(latency, 3)
+            total_artifacts += result["artifacts_count"]
+            manifest["modules"][result["filename"]] = result["manifest"]
+            save_manifest(manifest_file, manifest)
+        on_result(result)
+
+    executor = None
+    if workers > 1:
+        # Only the parent of a pool needs these; keeps worker and library imports light
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=ignore_interrupts)
+    pending = {}  # future -> (filename, time its file completed)
+    in_flight = set()  # filenames with a job in the pool
+    dirty = {}  # filename -> time it completed again while its job was running
+
+    def submit(filename, completed):
+        input_path = os.path.join(input_dir, filename)
+        output_path = os.path.join(output_dir, output_filename(filename, output_format, compression))
+        entry = manifest["modules"].get(filename)
+        reuse_hashes = None
+        if entry and not force:
+            output_intact, input_unchanged = _check_previous_output(entry, input_path, output_path, output_dir)
+            if output_intact and input_unchanged:
+                finish({"filename": filename, "module_title": entry["module_title"],
+                        "artifacts_count": entry["artifacts_count"], "unchanged": True}, completed)
+                return
+            # Reused artifacts would be missing from the attachment and diagram reports
+            if output_intact and not stage_attachments and not diagram_attachments:
+                reuse_hashes = entry.get("artifact_hashes") or []
+        if executor is None:
+            status.write(1, len(watcher.settling))
+            finish(process_file(input_path, output_path, reuse_hashes, **options), completed)
+        else:
+            future = executor.submit(process_file, input_path, output_path, reuse_hashes, **options)
+            pending[future] = (filename, completed)
+            in_flight.add(filename)
+
+    idle_since = time.time()
+    try:
+        while True:
+            for filename, completed in watcher.poll():
+                idle_since = time.time()
+                if filename in in_flight:
+                    # Two jobs would write the same output and finish() could record the older one last
+                    dirty[filename] = completed
+                    continue
+                submit(filename, completed)
+            status.write(len(pending), len(watcher.settling))
+            if pending:
+                done, _ = wait(pending, timeout=poll_sec, return_when=FIRST_COMPLETED)
+                for future in done:
+                    filename, completed = pending.pop(future)
+                    in_flight.discard(filename)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # Worker died (e.g. killed or out of memory) before returning a result
+                        result = {"filename": filename, "error": f"Error processing {filename}: {e}"}
+                    finish(result, completed)
+                    if filename in dirty:
+                        submit(filename, dirty.pop(filename))
+                idle_since = time.time()
+                continue
+            if watcher.settling:
+                idle_since = time.time()
+            elif idle_sec is not None and time.time() - idle_since >= idle_sec:
+                break
+            time.sleep(poll_sec)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if executor is not None:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+        close_stagers()
+
+    report = status.write(0, 0)
+    summary = {
+        "started": report["started"],
+        "wall_sec": round(time.time() - status.started, 2),
+        "workers": workers,
+        "files": report["processed"],
+        "failed": report["failed"],
+        "unchanged": report["unchanged"],
+        "work_items": total_artifacts,
+        "latency_sec": report["latency_sec"],
+        "status": status.path,
+    }
+    summary.update(_run_reports(manifest, output_dir, shard_items or shard_bytes, diagram_attachments, False,
+                                schema, stage_attachments))
+    return summary
+
+
+def _swap_deltas(staging_dir, delta_dir):
+    """Replace the delta files and manifest in delta_dir with the ones in staging_dir (the manifest last)."""
+    new = set(os.listdir(staging_dir))
+    for filename in sorted(new - {DELTA_MANIFEST_NAME}):
+        os.replace(os.path.join(staging_dir, filename), os.path.join(delta_dir, filename))
+    for filename in os.listdir(delta_dir):
+        if filename.endswith(".delta.json") and filename not in new:
+            os.remove(os.path.join(delta_dir, filename))
+    os.replace(os.path.join(staging_dir, DELTA_MANIFEST_NAME), os.path.join(delta_dir, DELTA_MANIFEST_NAME))
+    os.rmdir(staging_dir)
+
+
+def transform_delta(input_dir, delta_dir, workers=1, full=False, compact_diagrams=False, mappings=None, stages=None,
+                    serializer="auto", on_result=None, input_format="dng"):
+    """Write only what changed in input_dir since the last delta run into delta_dir; returns the run summary.
+
+    Each module is compared with the snapshot of the last run
+    (<delta_dir>.snapshot.json, see delta.py); modules with added, changed,
+    moved or deleted artifacts get a <module>.delta.json with those
+    artifacts, transformed as transform_directory would (inline diagrams,
+    no staging or validation). A module file gone from input_dir has all
+    its artifacts deleted. delta_dir/delta.manifest.json lists the counts
+    per module and the links of unchanged artifacts to added or deleted
+    ones; an artifact moved between modules is deleted in one and added in
+    the other, so importers apply the deletions first. The first run, a
+    run with full set or one after the mappings, stages or compact_diagrams
+    changed emits every artifact. The deltas are written to
+    <delta_dir>.tmp and only replace the previous run's deltas, manifest
+    and snapshot once every module succeeded; if any module fails, the
+    previous run's files stay as they were (summary "applied" is False)
+    and the next run compares against the same snapshot. on_result gets each module
+    result (with its "changes" by kind, "delta_file" None if nothing
+    changed, or an "error"). input_format picks the module files as for
+    transform_directory.
+    """
+    stages = _check_stages(stages, None)
+    serializer_name = check_output_options("json", "none", serializer).name
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    on_result = on_result or (lambda result: None)
+    filenames = sorted(input_files(input_dir, input_format))
+
+    os.makedirs(delta_dir, exist_ok=True)
+    # New deltas are staged next to delta_dir and moved in only once every module succeeded
+    staging_dir = os.path.normpath(delta_dir) + ".tmp"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+    snapshot_file = snapshot_path(delta_dir)
+    previous = load_snapshot(snapshot_file)
+    mappings = mappings or DEFAULT_CONFIG
+    # Everything besides the input that decides the transformed artifacts; any change emits every artifact
+    run_key = content_hash("|".join([mapping_hash(get_field_mapping(mappings)), ",".join(stages),
+                                     f"delta|{compact_diagrams}|{serializer_name}"]).encode("utf-8"))
+    full = full or (bool(previous["modules"]) and previous["run_key"] != run_key)
+    jobs = [(os.path.join(input_dir, filename), os.path.join(staging_dir, delta_filename(filename)),
+             previous["modules"].get(filename)) for filename in filenames]
+
+    wall_start = time.time()
+    taken = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(wall_start))
+    modules, report = {}, {}
+    changes = {"added": set(), "changed": set(), "moved": set(), "deleted": set()}
+    failed = 0
+    options = {"full": full, "mappings": mappings, "stages": stages, "compact_svg": compact_diagrams,
+               "serializer": serializer}
+    for result in run_modules(jobs, workers, task=delta_file, **options):
+        on_result(result)
+        filename = result["filename"]
+        if "error" in result:
+            failed += 1
+            continue
+        modules[filename] = result["snapshot"]
+        for kind, identifiers in result["changes"].items():
+            changes[kind].update(identifiers)
+        if result["delta_file"]:
+            report[filename] = {"module_title": result["module_title"], "delta_file": result["delta_file"],
+                                "counts": {kind: len(ids) for kind, ids in result["changes"].items()}}
+    for filename in sorted(set(previous["modules"]) - set(filenames)):
+        document = removed_module_delta(previous["modules"][filename])
+        write_delta(os.path.join(staging_dir, delta_filename(filename)), document, serializer)
+        changes["deleted"].update(entry["legacyID"] for entry in document["deleted"])
+        report[filename] = {"module_title": None, "delta_file": delta_filename(filename), "removed": True,
+                            "counts": {kind: document["counts"][kind] for kind in changes}}
+
+    counts = {kind: len(identifiers) for kind, identifiers in changes.items()}
+    # An artifact shared by several modules only appears or disappears as a link target with its first / last one
+    present = set().union(*(module["artifacts"] for module in modules.values()))
+    previously = set().union(*(module["artifacts"] for module in previous["modules"].values()))
+    links = affected_links(modules, changes["added"] - previously, changes["deleted"] - present,
+                           changes["added"] | changes["changed"])
+    delta_manifest = os.path.join(delta_dir, DELTA_MANIFEST_NAME)
+    if failed:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    else:
+        save_manifest(os.path.join(staging_dir, DELTA_MANIFEST_NAME),
+                      {"since": previous["taken"], "taken": taken, "full": full, "counts": counts,
+                       "modules": dict(sorted(report.items())), "affected_links": links})
+        _swap_deltas(staging_dir, delta_dir)
+        save_snapshot(snapshot_file, run_key, modules, taken)
+
+    summary = {
+        "started": taken,
+        "wall_sec": round(time.time() - wall_start, 2),
+        "workers": workers,
+        "files": len(filenames) - failed,
+        "failed": failed,
+        "applied": not failed,
+        "modules_changed": len(report),
+        "full": full,
+        "since": previous["taken"],
+        "affected_links": len(links),
+        "manifest": delta_manifest,
+        "snapshot": snapshot_file,
+    }
+    summary.update(counts)
+    return summary
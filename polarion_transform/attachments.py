@@ -0,0 +1,191 @@
+"""Content-addressed staging of the files referenced by artifact attachments.
+
+Every referenced file (wrapped_resource_saved_as / embedded_wrapped_resources_saved)
+is hashed and stored once under <staging_dir>/blobs/<hash[:2]>/<hash><ext>,
+reflinked where possible (Linux FICLONE), else copied. Blobs are never
+hardlinked: a hardlink shares its inode with the export, so the staged
+file would change whenever the source is edited in place.
+Attachment entries then point at the blob and carry its hash, size and MIME
+type, so uploads and disk use follow unique content, not reference count.
+
+Hashing and copying run in a thread pool per process, which close_stagers()
+stops at the end of a run; an artifact's entries are completed when the
+module (or, in streaming mode, the top-level artifact) is flushed. Blob paths
+depend only on content, so processes staging the same file concurrently end
+up with the same single blob.
+"""
+import hashlib
+import mimetypes
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Threads hashing and copying files in each process
+staging_threads = 8
+
+# Name of the run manifest written into the staging folder
+MANIFEST_NAME = "attachments.manifest.json"
+
+_FICLONE = 0x40049409
+
+
+def source_path(source_root, file_path):
+    """Local path of an attachment's file_path (exported with Windows separators)."""
+    return os.path.join(source_root, *file_path.replace("\\", "/").split("/"))
+
+
+def _reflink(src, dst):
+    import fcntl
+
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+
+
+def _reflink_or_copy(src, dst):
+    """Place src at dst as a reflink or copy; returns the method used."""
+    tmp = f"{dst}.{os.getpid()}.{threading.get_ident()}.tmp"
+    method = "reflink"
+    try:
+        _reflink(src, tmp)
+    except (ImportError, OSError):
+        method = "copy"
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+    return method
+
+
+def stage_file(path, staging_dir):
+    """Hash path and store it as a blob; returns the attachment fields for it."""
+    digest = hashlib.blake2b(digest_size=16)
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    content_hash = digest.hexdigest()
+    blob = f"blobs/{content_hash[:2]}/{content_hash}{os.path.splitext(path)[1].lower()}"
+    target = os.path.join(staging_dir, *blob.split("/"))
+    method = "existing"
+    if not os.path.exists(target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        method = _reflink_or_copy(path, target)
+    return {
+        "file_path": blob,
+        "content_hash": content_hash,
+        "size": size,
+        "mime_type": mimetypes.guess_type(path)[0] or "application/octet-stream",
+        "method": method,
+    }
+
+
+class AttachmentStager:
+    """Stages the attachments of the modules one process transforms."""
+
+    def __init__(self, source_root, staging_dir, threads=None):
+        self.source_root = source_root
+        self.staging_dir = staging_dir
+        self.executor = ThreadPoolExecutor(max_workers=threads or staging_threads)
+        # (source file_path, size, mtime_ns) -> future of stage_file, shared by all modules; keyed
+        # by the file's stat so a long-lived (watch mode) process restages files replaced on disk
+        self.futures = {}
+        self.pending = []
+        self.begin_module()
+
+    def begin_module(self):
+        self.pending = []
+        self.staged = {}
+        self.missing = {}
+        self.references = 0
+
+    def stage(self, entries):
+        """Queue attachment entries; they are completed by the next flush()."""
+        for entry in entries:
+            file_path = entry["file_path"]
+            path = source_path(self.source_root, file_path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                # Not cached: the file may still appear; stage_file reports why it is missing
+                self.pending.append((entry, file_path, self.executor.submit(stage_file, path, self.staging_dir)))
+                continue
+            key = (file_path, st.st_size, st.st_mtime_ns)
+            future = self.futures.get(key)
+            if future is None:
+                future = self.futures[key] = self.executor.submit(stage_file, path, self.staging_dir)
+            self.pending.append((entry, file_path, future))
+
+    def flush(self):
+        """Wait for the queued files and point their entries at the staged blobs."""
+        for entry, file_path, future in self.pending:
+            self.references += 1
+            try:
+                staged = future.result()
+            except OSError as e:
+                self.missing[file_path] = str(e)
+                continue
+            self.staged[file_path] = staged
+            entry["file_path"] = staged["file_path"]
+            entry["content_hash"] = staged["content_hash"]
+            entry["size"] = staged["size"]
+            entry["mime_type"] = staged["mime_type"]
+        self.pending = []
+
+    def module_report(self):
+        return {"references": self.references, "staged": self.staged, "missing": self.missing}
+
+    def close(self):
+        """Wait for the queued files and stop the thread pool."""
+        self.executor.shutdown(wait=True)
+
+
+_stagers = {}
+
+
+def get_stager(source_root, staging_dir):
+    """The process's AttachmentStager for a source / staging folder pair."""
+    key = (os.path.abspath(source_root), os.path.abspath(staging_dir))
+    stager = _stagers.get(key)
+    if stager is None:
+        stager = _stagers[key] = AttachmentStager(*key)
+    return stager
+
+
+def close_stagers():
+    """Close the process's AttachmentStagers at the end of a run (pool workers close theirs on exit)."""
+    while _stagers:
+        _stagers.popitem()[1].close()
+
+
+def merge_reports(reports):
+    """Run manifest from per-module reports: unique blobs with their sources, missing files, totals."""
+    blobs, missing = {}, {}
+    references = 0
+    methods = {}
+    for report in reports:
+        references += report["references"]
+        missing.update(report["missing"])
+        for file_path, staged in report["staged"].items():
+            blob = blobs.setdefault(staged["content_hash"], {
+                "file_path": staged["file_path"],
+                "size": staged["size"],
+                "mime_type": staged["mime_type"],
+                "sources": [],
+            })
+            if file_path in blob["sources"]:
+                continue
+            blob["sources"].append(file_path)
+            if staged["method"] != "existing":
+                methods[staged["method"]] = methods.get(staged["method"], 0) + 1
+    for blob in blobs.values():
+        blob["sources"].sort()
+    return {
+        "references": references,
+        "unique_files": sum(len(blob["sources"]) for blob in blobs.values()),
+        "unique_blobs": len(blobs),
+        "bytes_in_sources": sum(blob["size"] * len(blob["sources"]) for blob in blobs.values()),
+        "bytes_stored": sum(blob["size"] for blob in blobs.values()),
+        "stored_by": methods,
+        "missing": dict(sorted(missing.items())),
+        "blobs": dict(sorted(blobs.items())),
+    }
@@ -0,0 +1,58 @@
+"""Per-process content caches for the pure text -> text stages."""
+import hashlib
+from collections import OrderedDict
+
+from .diagram import diagram_image_to_description, render_diagram_svg
+from .html_cleaner import clean_primary_html
+
+
+class ContentCache:
+    """Bounded LRU cache for pure text -> text functions, keyed by a content hash.
+
+    Only the 16-byte digest of the input is kept, not the input itself. One
+    instance lives per process, so it is shared by every module that process
+    transforms in a run. Without max_entries the bound is the module's
+    cache_max_entries, read on every insert, so setting it takes effect at once.
+    """
+
+    def __init__(self, func, max_entries=None):
+        self.func = func
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, text, *args):
+        key = (hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest(), args)
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            value = self.func(text, *args)
+            self.entries[key] = value
+            max_entries = cache_max_entries if self.max_entries is None else self.max_entries
+            while len(self.entries) > max_entries:
+                self.entries.popitem(last=False)
+            return value
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        self.entries.clear()
+
+
+# Maximum number of cleaned HTML / rendered diagram / SVG results kept per cache (read on every insert)
+cache_max_entries = 4096
+
+html_cache = ContentCache(clean_primary_html)
+diagram_cache = ContentCache(diagram_image_to_description)
+# Rendered SVG of diagrams written as attachments (see diagram_files.py)
+svg_cache = ContentCache(render_diagram_svg)
+
+
+def cache_stats():
+    return {"html": html_cache.stats(), "diagram": diagram_cache.stats(), "svg": svg_cache.stats()}
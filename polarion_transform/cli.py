@@ -0,0 +1,231 @@
+"""Command line entry point: python -m polarion_transform / polarion-transform."""
+import argparse
+
+from .adapters import INPUT_FORMATS
+from .api import transform_delta, transform_directory, watch_directory
+from .output import COMPRESSIONS, OUTPUT_FORMATS, SERIALIZERS
+from .pipeline import DEFAULT_STAGES, STAGES, load_pipeline
+
+
+def print_module_breakdown(result):
+    """Per-type / per-status breakdown in the layout of the exporter's migration log."""
+    report = result["metrics"]
+    print(f"📊 Module \"{result['module_title']}\": {result['artifacts_count']} artifact(s)")
+    print("   • By Type:")
+    for name, count in report["by_type"].items():
+        print(f"     - {name}: {count}")
+    print("   • By Status:")
+    for name, count in report["by_status"].items():
+        print(f"     - {name}: {count}")
+    print("   • Stages: " + " | ".join(f"{name} {seconds:.3f}s" for name, seconds in report["stages"].items()))
+
+
+def print_result(result):
+    if "error" in result:
+        print(f"❌ {result['error']}")
+    elif result.get("unchanged"):
+        print(f"⏭️  Unchanged: {result['module_title']}   | Work items: {result['artifacts_count']}")
+    else:
+        shards = f"   | Shards: {result['shards']}" if "shards" in result else ""
+        latency = f"   | Latency: {result['latency_sec']} sec" if "latency_sec" in result else ""
+        print(f"✅ Processed: {result['module_title']}   | Work items: {result['artifacts_count']}   | Time: {result['elapsed_time']} sec{shards}{latency}")
+        if result.get("validation", {}).get("violations"):
+            print(f"⚠️  {result['validation']['violations']} schema violation(s) in {result['module_title']}")
+        if "metrics" in result:
+            print_module_breakdown(result)
+
+
+def print_delta_result(result):
+    if "error" in result:
+        print(f"❌ {result['error']}")
+    elif result["delta_file"] is None:
+        print(f"⏭️  Unchanged: {result['module_title']}")
+    else:
+        changes = result["changes"]
+        print(f"🔁 Delta: {result['module_title']}   | +{len(changes['added'])} added | {len(changes['changed'])} changed"
+              f" | {len(changes['moved'])} moved | -{len(changes['deleted'])} deleted   | Time: {result['elapsed_time']} sec")
+
+
+def build_parser(default_input=None, default_output=None, default_stages=DEFAULT_STAGES):
+    parser = argparse.ArgumentParser(description="Transform DOORS Next module JSON into Polarion import JSON.")
+    parser.add_argument("--input", "-i", default=default_input, required=default_input is None,
+                        help="folder of exported module files (DNG JSON; see --input-format)" +
+                             (f" (default: {default_input})" if default_input else ""))
+    parser.add_argument("--output", "-o", default=default_output, required=default_output is None,
+                        help="folder the Polarion import JSON files are written to" +
+                             (f" (default: {default_output})" if default_output else ""))
+    parser.add_argument("--input-format", choices=INPUT_FORMATS, default="dng",
+                        help="module files to read: dng (*.json), reqif (*.reqif, *.reqifz), csv (*.csv) or auto "
+                             "(all of them, each by its extension) (default: dng)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes, one module per task (0 = one per CPU, default: 1)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="json",
+                        help="output format: indented json, minified json, or ndjson with the module fields on "
+                             "the first line and one top-level artifact per line (default: json)")
+    parser.add_argument("--compress", choices=COMPRESSIONS, default="none",
+                        help="compress the output files (.gz / .zst added to the name; zstd needs the zstandard "
+                             "package or Python 3.14+, default: none)")
+    parser.add_argument("--compress-level", type=int, metavar="N",
+                        help="compression level (default: gzip 6, zstd 3)")
+    parser.add_argument("--serializer", choices=SERIALIZERS, default="auto",
+                        help="JSON encoder: orjson if installed, else the json module (default: auto)")
+    pipeline = parser.add_mutually_exclusive_group()
+    pipeline.add_argument("--stages", default=",".join(default_stages), metavar="LIST",
+                          help=f"comma-separated pipeline stages to run, from {', '.join(STAGES)} "
+                               f"(default: {','.join(default_stages)})")
+    pipeline.add_argument("--pipeline", metavar="PATH",
+                          help="pipeline config (.json or .yaml) with the \"stages\" to run")
+    parser.add_argument("--schema", metavar="PATH",
+                        help="Polarion import schema the validate stage checks against (.json or .yaml, "
+                             "default: the packaged schema.json)")
+    parser.add_argument("--mappings", metavar="PATH",
+                        help="key / value mapping config (.json or .yaml, default: the packaged mappings.json)")
+    parser.add_argument("--resolve-links", action="store_true",
+                        help="index all modules first, add each link's target module / space / type "
+                             "and report dangling links")
+    parser.add_argument("--stage-attachments", metavar="DIR",
+                        help="store every attachment file once per content hash in DIR and point the "
+                             "attachment entries at it (with hash, size and MIME type)")
+    parser.add_argument("--attachments-root", metavar="DIR",
+                        help="folder the attachment file paths are relative to (default: the input folder)")
+    parser.add_argument("--compact-model", action="store_true",
+                        help="hold artifacts as compact records (interned values, no empty fields) while a "
+                             "module is transformed, to cut memory on very large modules")
+    parser.add_argument("--diagram-attachments", action="store_true",
+                        help="write rendered diagrams as SVG files into <output>/wrapped_resources (once per "
+                             "content) and attach them, instead of inlining them as data: URIs")
+    parser.add_argument("--inline-diagram-max", type=int, metavar="BYTES",
+                        help="with --diagram-attachments, diagrams up to this SVG size stay inline (default: 2048)")
+    parser.add_argument("--shard-items", type=int, metavar="N",
+                        help="split each module's artifacts into shards of at most N work items for a parallel "
+                             "import; the module's output file becomes the header listing its shards")
+    parser.add_argument("--shard-bytes", type=int, metavar="N",
+                        help="likewise, shards of at most N bytes (before compression)")
+    parser.add_argument("--stream", action="store_true",
+                        help="read and write each module incrementally, one top-level artifact at a time")
+    parser.add_argument("--force", action="store_true",
+                        help="retransform every module even if the manifest shows it unchanged")
+    parser.add_argument("--compact-diagrams", action="store_true",
+                        help="embed diagrams as compact SVG (rounded coordinates, grouped styles, shortest encoding)")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and transform each module as soon as the exporter has finished "
+                             "writing it; queue depth and latencies go to <output>.watch.json (Ctrl+C stops)")
+    parser.add_argument("--poll-sec", type=float, default=1.0, metavar="SEC",
+                        help="with --watch, how often the input folder is scanned (default: 1)")
+    parser.add_argument("--settle-sec", type=float, default=2.0, metavar="SEC",
+                        help="with --watch, how long a file must keep its size to count as complete; 0 if the "
+                             "exporter renames finished files into place (default: 2)")
+    parser.add_argument("--idle-exit", type=float, metavar="SEC",
+                        help="with --watch, stop after SEC seconds without new or pending modules")
+    parser.add_argument("--delta", action="store_true",
+                        help="write only the artifacts added, changed, moved or deleted since the last --delta run "
+                             "(per <output>.snapshot.json) to <output>/<module>.delta.json; with --force every "
+                             "artifact is written")
+    parser.add_argument("--metrics-report", metavar="PATH",
+                        help="collect per-stage timings and counts and write them to PATH (.json or .csv)")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="dump a cProfile of every module to DIR/<module file>.prof")
+    return parser
+
+
+def main(argv=None, default_input=None, default_output=None, default_stages=DEFAULT_STAGES):
+    parser = build_parser(default_input, default_output, default_stages)
+    args = parser.parse_args(argv)
+    if args.watch and (args.resolve_links or args.metrics_report or args.profile):
+        parser.error("--watch cannot be combined with --resolve-links, --metrics-report or --profile")
+    if args.delta and (args.watch or args.resolve_links or args.stage_attachments or args.diagram_attachments
+                       or args.shard_items or args.shard_bytes or args.metrics_report or args.profile):
+        parser.error("--delta cannot be combined with --watch, --resolve-links, --stage-attachments, "
+                     "--diagram-attachments, --shard-items, --shard-bytes, --metrics-report or --profile")
+    options = {
+        "workers": args.workers,
+        "force": args.force,
+        "stream": args.stream,
+        "output_format": args.format,
+        "compact_diagrams": args.compact_diagrams,
+        "mappings": args.mappings,
+        "stage_attachments": args.stage_attachments,
+        "attachments_root": args.attachments_root,
+        "compression": args.compress,
+        "compression_level": args.compress_level,
+        "serializer": args.serializer,
+        "compact_model": args.compact_model,
+        "schema": args.schema,
+        "shard_items": args.shard_items,
+        "shard_bytes": args.shard_bytes,
+        "diagram_attachments": args.diagram_attachments,
+        "inline_diagram_max": args.inline_diagram_max,
+        "input_format": args.input_format,
+        "on_result": print_result,
+    }
+    try:
+        options["stages"] = load_pipeline(args.pipeline) if args.pipeline else args.stages
+        if args.delta:
+            summary = transform_delta(args.input, args.output, workers=args.workers, full=args.force,
+                                      compact_diagrams=args.compact_diagrams, mappings=args.mappings,
+                                      stages=options["stages"], serializer=args.serializer,
+                                      on_result=print_delta_result, input_format=args.input_format)
+        elif args.watch:
+            print(f"👀 Watching {args.input} (Ctrl+C to stop)")
+            summary = watch_directory(args.input, args.output, poll_sec=args.poll_sec, settle_sec=args.settle_sec,
+                                      idle_sec=args.idle_exit, **options)
+        else:
+            summary = transform_directory(args.input, args.output, metrics_report=args.metrics_report,
+                                          profile_dir=args.profile, resolve_links=args.resolve_links, **options)
+    except (ValueError, ImportError) as e:
+        # Bad options or config (unknown stage, mapping conflict, missing optional package)
+        print(f"❌ {e}")
+        return 2
+
+    # ✅ Final summary
+    if args.delta:
+        since = f"since {summary['since']}" if summary["since"] else "first run"
+        print(f"\n Delta ({since}{', full' if summary['full'] else ''}): {summary['added']} added"
+              f" | {summary['changed']} changed | {summary['moved']} moved | {summary['deleted']} deleted"
+              f" in {summary['modules_changed']} module(s) | {summary['wall_sec']} sec wall | {summary['failed']} failed"
+              f" | {summary['workers']} worker(s)")
+        if not summary["applied"]:
+            print(f"⚠️  Nothing replaced: {summary['manifest']} and the snapshot are still those of the last run")
+            return 1
+        print(f" Affected links: {summary['affected_links']} ({summary['manifest']})")
+        return 0
+    if args.watch:
+        print(f"\n Summary: {summary['files']} files | {summary['work_items']} artifacts | {summary['wall_sec']} sec"
+              f" watched | {summary['failed']} failed | {summary['unchanged']} unchanged"
+              f" | {summary['workers']} worker(s)")
+        latency = summary["latency_sec"]
+        if latency:
+            print(f" Latency: p50 {latency['p50']} sec | p95 {latency['p95']} sec | max {latency['max']} sec"
+                  f" ({summary['status']})")
+    else:
+        print(f"\n Summary: {summary['files']} files | {summary['work_items']} artifacts | {summary['module_sec']} sec total"
+              f" | {summary['wall_sec']} sec wall | {summary['failed']} failed | {summary['unchanged']} unchanged"
+              f" | {summary['reused']} artifacts reused | {summary['workers']} worker(s)")
+        if summary["work_items"]:
+            print(f" Work items: max depth {summary['max_depth']} | by type: "
+                  + ", ".join(f"{name} {count}" for name, count in summary["by_type"].items()))
+        print(" Cache: " + " | ".join(
+            f"{name} {counts['hits']} hits / {counts['misses']} misses" for name, counts in summary["cache"].items()
+        ))
+    if "diagrams" in summary:
+        diagrams = summary["diagrams"]
+        print(f" Diagrams: {diagrams['attached']} attached as {diagrams['files']} SVG files"
+              f" ({diagrams['bytes_written'] / 1e6:.2f} MB) | {diagrams['inline']} inline"
+              f" | {diagrams['bytes_saved'] / 1e6:.2f} MB less description text")
+    if "shards" in summary:
+        print(f" Shards: {summary['shards']} shard files")
+    if "links" in summary:
+        links = summary["links"]
+        print(f" Links: {links['resolved']} resolved | {links['dangling']} dangling ({links['report']})")
+    if "validation" in summary:
+        validation = summary["validation"]
+        print(f" Validation: {validation['violations']} schema violations in {validation['modules']} module(s)"
+              f" ({validation['report']})")
+    if "attachments" in summary:
+        staged = summary["attachments"]
+        print(f" Attachments: {staged['references']} references | {staged['unique_files']} files"
+              f" | {staged['unique_blobs']} unique blobs | {staged['bytes_stored'] / 1e6:.2f} of"
+              f" {staged['bytes_in_sources'] / 1e6:.2f} MB stored | {staged['missing']} missing ({staged['manifest']})")
+    if args.metrics_report:
+        print(f" Metrics report: {args.metrics_report}")
+    return 1 if summary["failed"] else 0
@@ -0,0 +1,131 @@
+"""Compact in-memory records for very large modules (--compact-model).
+
+An exported artifact is a dict of about 40 keys, most of them empty strings,
+and transform_artifact builds a second dict of the same size. CompactRecord
+keeps the same data as:
+
+    shape   the key tuple, shared by every record with the same keys in the
+            same order (one per artifact / link layout per process)
+    empty   bitmask of the keys whose value is ""; those values are not stored
+    values  tuple of the remaining values; strings up to intern_max_length
+            (users, statuses, types, ...) are interned
+
+Records are read-only mappings, so the transform reads them like dicts.
+They are expanded back to dicts only when serialized (output.json_default),
+which gives the same bytes as the dicts would.
+"""
+import json
+import sys
+from collections.abc import Mapping
+
+# Strings up to this many characters are interned
+intern_max_length = 64
+
+_intern = sys.intern
+
+
+class Shape:
+    """Key layout shared by records: key tuple and key -> position."""
+
+    __slots__ = ("fields", "index")
+
+    def __init__(self, fields):
+        self.fields = tuple(_intern(key) for key in fields)
+        self.index = {key: i for i, key in enumerate(self.fields)}
+
+
+_shapes = {}
+
+
+def get_shape(fields):
+    """Shared Shape for a key tuple, or None if it has duplicate keys."""
+    shape = _shapes.get(fields)
+    if shape is None:
+        shape = _shapes[fields] = Shape(fields)
+    return shape if len(shape.index) == len(fields) else None
+
+
+class CompactRecord(Mapping):
+    """Read-only mapping of a shape to values, with empty strings left out."""
+
+    __slots__ = ("_shape", "_empty", "_values")
+
+    def __init__(self, shape, values):
+        empty = 0
+        kept = []
+        for i, value in enumerate(values):
+            if value.__class__ is str:
+                if not value:
+                    empty |= 1 << i
+                    continue
+                if len(value) <= intern_max_length:
+                    value = _intern(value)
+            kept.append(value)
+        self._shape = shape
+        self._empty = empty
+        self._values = tuple(kept)
+
+    def _value(self, i):
+        bit = 1 << i
+        if self._empty & bit:
+            return ""
+        # bin().count rather than int.bit_count(), which needs Python 3.10
+        return self._values[i - bin(self._empty & (bit - 1)).count("1")]
+
+    def __getitem__(self, key):
+        return self._value(self._shape.index[key])
+
+    def get(self, key, default=None):
+        i = self._shape.index.get(key)
+        return default if i is None else self._value(i)
+
+    def __contains__(self, key):
+        return key in self._shape.index
+
+    def __iter__(self):
+        return iter(self._shape.fields)
+
+    def __len__(self):
+        return len(self._shape.fields)
+
+    def _all_values(self):
+        values = iter(self._values)
+        empty = self._empty
+        for i in range(len(self._shape.fields)):
+            yield "" if empty >> i & 1 else next(values)
+
+    def items(self):
+        return zip(self._shape.fields, self._all_values())
+
+    def to_dict(self):
+        """Shallow dict of the record; nested records stay compact."""
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"CompactRecord({self.to_dict()!r})"
+
+
+def compact_pairs(pairs):
+    """json object_pairs_hook that builds CompactRecords instead of dicts."""
+    shape = get_shape(tuple(key for key, _ in pairs))
+    if shape is None:
+        # Duplicate keys: let dict pick the values, as json.load would
+        record = dict(pairs)
+        return CompactRecord(get_shape(tuple(record)), record.values())
+    return CompactRecord(shape, [value for _, value in pairs])
+
+
+def load_compact(fp):
+    """json.load with every JSON object read as a CompactRecord."""
+    return json.load(fp, object_pairs_hook=compact_pairs)
+
+
+def compact(value):
+    """Compact copy of a JSON value: dicts become CompactRecords, short strings are interned."""
+    if value.__class__ is dict:
+        return CompactRecord(get_shape(tuple(value)), [compact(v) for v in value.values()])
+    if value.__class__ is list:
+        return [compact(v) for v in value]
+    if value.__class__ is str and len(value) <= intern_max_length:
+        return _intern(value)
+    return value
@@ -0,0 +1,232 @@
+"""Delta migration: only the artifacts added, changed, moved or deleted since the last run.
+
+After the full migration, catch-up syncs only need what changed. A delta
+run compares every module with the snapshot of the previous run
+(<delta folder>.snapshot.json), which keeps per artifact identifier:
+
+    [modified_on, content hash, parent, previous sibling, links]
+
+where the content hash covers the artifact's own exported fields (not its
+children) and links are its (target identifier, link_role) pairs. An
+artifact is
+
+    added     when its identifier is not in the snapshot
+    changed   when its modified_on or content hash differs
+    moved     when only its parent or its previous sibling differs (not
+              counting siblings that were themselves added or deleted)
+    deleted   when its identifier is gone from the module
+
+Only added and changed artifacts are transformed. Each module with changes
+gets <module>.delta.json in the delta folder:
+
+    {"module": {<transformed module fields>}, "module_changed": bool,
+     "counts": {"added": n, "changed": n, "moved": n, "deleted": n, "unchanged": n},
+     "artifacts": [{"change": "added" | "changed", "parent": id, "previous": id,
+                    "artifact": {<transformed artifact, without children>}},
+                   {"change": "moved", "legacyID": id, "parent": id, "previous": id}, ...],
+     "deleted": [{"legacyID": id, "parent": id, "modified_on": ...}, ...]}
+
+parent and previous (the preceding sibling, None for the first) place each
+record in the document. Links from artifacts that did not change to ones
+that were added or deleted are listed in the run's delta.manifest.json, as
+those links appear or dangle in Polarion although their source is not in
+any delta.
+"""
+import json
+import os
+import time
+
+from . import transform
+from .adapters import parse_module
+from .link_index import module_artifacts
+from .manifest import artifact_hash, content_hash
+from .output import get_serializer
+
+SNAPSHOT_VERSION = 1
+
+# Run manifest written into the delta folder
+DELTA_MANIFEST_NAME = "delta.manifest.json"
+
+# Module fields that are covered per artifact
+_STRUCTURE_FIELDS = ("artifacts", "structure", "artifact_uris_in_module_order")
+
+
+def snapshot_path(delta_dir):
+    """The snapshot sits next to the delta folder, like the manifest next to the output folder."""
+    return os.path.normpath(delta_dir) + ".snapshot.json"
+
+
+def load_snapshot(path):
+    """The snapshot of the last run, or an empty one if there is none (or it is unreadable)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        snapshot = None
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        return {"version": SNAPSHOT_VERSION, "run_key": None, "taken": None, "modules": {}}
+    return snapshot
+
+
+def save_snapshot(path, run_key, modules, taken):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": SNAPSHOT_VERSION, "run_key": run_key, "taken": taken, "modules": modules}, f,
+                  ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def delta_filename(filename):
+    return os.path.splitext(filename)[0] + ".delta.json"
+
+
+def _links(artifact):
+    links = artifact.get("linked_artifacts")
+    if not isinstance(links, list):
+        return []
+    return sorted({(str(link.get("identifier")), str(link.get("link_role") or ""))
+                   for link in links if isinstance(link, dict) and link.get("identifier") not in (None, "")})
+
+
+def module_delta(data, previous=None, full=False):
+    """(delta document or None if nothing changed, changes, module snapshot) of a parsed module.
+
+    previous is the module's snapshot from the last run (None: every
+    artifact is added); full emits every artifact, e.g. after the mapping
+    config changed. changes lists the identifiers per kind of change.
+    """
+    previous = previous or {"module": None, "artifacts": {}}
+    previous_artifacts = previous["artifacts"]
+    fields = {key: value for key, value in data.items() if key not in _STRUCTURE_FIELDS}
+    module_entry = [data.get("modified_on"), artifact_hash(fields)]
+    module_changed = full or module_entry != previous["module"]
+
+    entries = module_artifacts(data)
+    present = {str(artifact["identifier"]) for artifact, _ in entries}
+    changes = {"added": [], "changed": [], "moved": [],
+               "deleted": [identifier for identifier in previous_artifacts if identifier not in present]}
+    gone = set(changes["deleted"])
+
+    snapshot, records, unchanged = {}, [], 0
+    last_child = {}  # parent -> identifier of its last child so far
+    for artifact, parent in entries:
+        identifier = str(artifact["identifier"])
+        sibling = last_child.get(parent)
+        last_child[parent] = identifier
+        own_fields = {key: value for key, value in artifact.items() if key != "children"}
+        entry = [artifact.get("modified_on"), artifact_hash(own_fields), parent, sibling, _links(artifact)]
+        snapshot[identifier] = entry
+        before = previous_artifacts.get(identifier)
+        if before is None:
+            change = "added"
+        elif full or before[:2] != entry[:2]:
+            change = "changed"
+        elif before[2] != parent or (before[3] != sibling and before[3] not in gone
+                                     and (sibling is None or sibling in previous_artifacts)):
+            change = "moved"
+        else:
+            unchanged += 1
+            continue
+        changes[change].append(identifier)
+        if change == "moved":
+            records.append({"change": "moved", "legacyID": identifier, "parent": parent, "previous": sibling})
+        else:
+            records.append({"change": change, "parent": parent, "previous": sibling,
+                            "artifact": transform.transform_artifact_fields(own_fields)})
+
+    module_snapshot = {"module": module_entry, "artifacts": snapshot}
+    if not records and not changes["deleted"] and not module_changed:
+        return None, changes, module_snapshot
+    header = {}
+    for key, value in fields.items():
+        for new_key, new_value in transform.transform_module_field(key, value):
+            header[new_key] = new_value
+    document = {
+        "module": header,
+        "module_changed": module_changed,
+        "counts": {**{kind: len(ids) for kind, ids in changes.items()}, "unchanged": unchanged},
+        "artifacts": records,
+        "deleted": _deleted_records(changes["deleted"], previous_artifacts),
+    }
+    return document, changes, module_snapshot
+
+
+def removed_module_delta(previous):
+    """Delta document of a module whose file is gone from the export: all its artifacts are deleted."""
+    deleted = list(previous["artifacts"])
+    return {
+        "module": None,
+        "module_changed": True,
+        "counts": {"added": 0, "changed": 0, "moved": 0, "deleted": len(deleted), "unchanged": 0},
+        "artifacts": [],
+        "deleted": _deleted_records(deleted, previous["artifacts"]),
+    }
+
+
+def _deleted_records(identifiers, previous_artifacts):
+    return [{"legacyID": identifier, "parent": previous_artifacts[identifier][2],
+             "modified_on": previous_artifacts[identifier][0]} for identifier in identifiers]
+
+
+def write_delta(path, document, serializer="auto"):
+    with open(path, "wb") as f:
+        f.write(get_serializer(serializer).dumps(document, 2))
+
+
+def delta_file(input_path, delta_path, previous=None, full=False, mappings=None, stages=None, compact_svg=None,
+               serializer="auto"):
+    """Write the delta of one module file to delta_path (if anything changed) and return its result.
+
+    Runs in the parent or in a pool worker, so it never raises; the result
+    carries the module's changes and its new snapshot for the parent to save.
+    """
+    filename = os.path.basename(input_path)
+    start_time = time.time()
+    try:
+        with open(input_path, "rb") as f:
+            raw = f.read()
+        data = parse_module(raw, filename, skip_dropped=False)
+    except Exception as e:
+        return {"filename": filename, "error": f"Error reading {filename}: {e}"}
+    try:
+        with transform.configured(compact_svg, mappings, stages):
+            document, changes, snapshot = module_delta(data, previous, full)
+    except Exception as e:
+        return {"filename": filename, "error": f"Error comparing {filename}: {e}"}
+    if document is not None:
+        try:
+            write_delta(delta_path, document, serializer)
+        except Exception as e:
+            return {"filename": filename, "error": f"Error writing the delta of {filename}: {e}"}
+    return {
+        "filename": filename,
+        "module_title": data.get("module_title", "Unknown Title"),
+        "input_hash": content_hash(raw),
+        "changes": changes,
+        "delta_file": os.path.basename(delta_path) if document is not None else None,
+        "elapsed_time": round(time.time() - start_time, 2),
+        "snapshot": snapshot,
+    }
+
+
+def affected_links(modules, added, deleted, emitted):
+    """Links of artifacts that are in no delta to artifacts that were added or deleted in this run.
+
+    modules is the new snapshot (file name -> module snapshot); added,
+    deleted and emitted (added or changed, so already in a delta) are sets
+    of identifiers. Returns link dicts sorted by module and source.
+    """
+    targets = added | deleted
+    links = []
+    if not targets:
+        return links
+    for filename, module in sorted(modules.items()):
+        for identifier, entry in module["artifacts"].items():
+            if identifier in emitted:
+                continue
+            for target, role in entry[4]:
+                if target in targets:
+                    links.append({"module": filename, "source": identifier, "target": target, "link_role": role,
+                                  "target_change": "added" if target in added else "deleted"})
+    links.sort(key=lambda link: (link["module"], link["source"], link["target"]))
+    return links
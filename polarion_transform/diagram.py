@@ -0,0 +1,278 @@
+"""Rendering of DNG diagram_image canvas exports as embedded SVG."""
+import base64
+import html
+import re
+import urllib.parse
+import xml.etree.ElementTree as ET
+
+# diagram_image holds the mxGraph canvas export (<output> with save/restore,
+# translate/scale/rotate, style setters, shapes and begin/move/line/.../close
+# paths, each painted by a following fill/stroke/fillstroke). It is rendered
+# in one pass over the elements in document order with a save/restore stack
+# of canvas states, like mxSvgCanvas2D does.
+class _CanvasState:
+    __slots__ = ("dx", "dy", "scale", "transform", "fill", "stroke", "stroke_width", "dashed",
+                 "dash_pattern", "fill_alpha", "stroke_alpha", "font_color", "font_size", "font_family")
+
+    def __init__(self):
+        self.dx = self.dy = 0.0
+        self.scale = 1.0
+        self.transform = ""
+        self.fill = None
+        self.stroke = "#000000"
+        self.stroke_width = 1.0
+        self.dashed = False
+        self.dash_pattern = "3 3"
+        self.fill_alpha = self.stroke_alpha = 1.0
+        self.font_color = "#000000"
+        self.font_size = 11.0
+        self.font_family = "Arial,Helvetica"
+
+    def copy(self):
+        clone = _CanvasState.__new__(_CanvasState)
+        for name in _CanvasState.__slots__:
+            setattr(clone, name, getattr(self, name))
+        return clone
+
+
+_TEXT_TAG_RE = re.compile(r"<[^>]*>")
+_TEXT_ANCHORS = {"left": "start", "center": "middle", "right": "end"}
+
+
+def _format_number(value, precision):
+    text = f"{value:.{precision}f}".rstrip("0").rstrip(".")
+    return "0" if text in ("-0", "") else text
+
+
+def _to_float(text, default=0.0):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return default
+
+
+def _float(attrib, name, default=0.0):
+    return _to_float(attrib.get(name), default)
+
+
+def _svg_attrs(pairs):
+    return "".join(f" {k}='{html.escape(v, quote=True)}'" for k, v in pairs)
+
+
+def render_diagram_svg(diagram_image_xml: str, compact: bool = False) -> str:
+    """Render diagram_image XML as a standalone SVG document ("" if nothing is drawn).
+
+    Coordinates are written as str(float), like the original renderer did;
+    compact rounds them to one decimal and moves the paint attributes
+    shared by consecutive shapes onto a <g> group.
+    """
+    if not diagram_image_xml:
+        return ""
+    try:
+        root = ET.fromstring(diagram_image_xml)
+    except ET.ParseError:
+        return ""
+
+    def num(value):
+        # Coordinates keep str(float), as the original renderer wrote them; only compact rounds them
+        return _format_number(value, 1) if compact else str(float(value))
+
+    def paint_num(value):
+        # Stroke widths and opacities, which the original wrote without a trailing ".0" (stroke-width='2')
+        return _format_number(value, 1 if compact else 3)
+
+    width, height = "400", "300"
+    state, stack = _CanvasState(), []
+    shapes = []  # (svg element, geometry attributes, paint attributes, transform)
+    path, path_simple = [], True  # segments of the current path; simple = one run of move/line only
+    pending = None  # (svg element, geometry) of the last rect/ellipse/roundrect or path, until painted
+
+    def point(x, y):
+        return (x + state.dx) * state.scale, (y + state.dy) * state.scale
+
+    for el in root.iter():
+        name = el.tag.rpartition("}")[2].lower()
+        a = el.attrib
+        if name in ("move", "line"):
+            if path and (name == "move" or path[-1][0] == "Z"):
+                path_simple = False
+            path.append(("M" if name == "move" else "L", point(_float(a, "x"), _float(a, "y"))))
+        elif name == "save":
+            stack.append(state.copy())
+        elif name == "restore":
+            if stack:
+                state = stack.pop()
+        elif name == "translate":
+            state.dx += _float(a, "dx")
+            state.dy += _float(a, "dy")
+        elif name == "scale":
+            factor = _float(a, "scale", 1.0)
+            state.scale *= factor
+            state.stroke_width *= factor
+        elif name == "rotate":
+            theta = _float(a, "theta")
+            flip_h, flip_v = a.get("flipH") == "1", a.get("flipV") == "1"
+            cx, cy = point(_float(a, "cx"), _float(a, "cy"))
+            if flip_h and flip_v:
+                theta += 180
+            elif flip_h or flip_v:
+                tx, ty = (cx if flip_h else 0), (cy if flip_v else 0)
+                state.transform += (f"translate({num(tx)},{num(ty)})scale({-1 if flip_h else 1},{-1 if flip_v else 1})"
+                                    f"translate({num(-tx)},{num(-ty)})")
+                theta = -theta
+            if theta:
+                state.transform += f"rotate({num(theta)},{num(cx)},{num(cy)})"
+        elif name == "fillcolor":
+            color = a.get("color")
+            state.fill = None if color in (None, "none") else color
+        elif name == "strokecolor":
+            color = a.get("color")
+            state.stroke = None if color in (None, "none") else color
+        elif name == "strokewidth":
+            state.stroke_width = _float(a, "width", 1.0) * state.scale
+        elif name == "dashed":
+            state.dashed = a.get("dashed") == "1"
+        elif name == "dashpattern":
+            state.dash_pattern = a.get("pattern", state.dash_pattern)
+        elif name == "alpha":
+            state.fill_alpha = state.stroke_alpha = _float(a, "alpha", 1.0)
+        elif name == "fillalpha":
+            state.fill_alpha = _float(a, "alpha", 1.0)
+        elif name == "strokealpha":
+            state.stroke_alpha = _float(a, "alpha", 1.0)
+        elif name == "fontcolor":
+            state.font_color = a.get("color", state.font_color)
+        elif name == "fontsize":
+            state.font_size = _float(a, "size", state.font_size)
+        elif name == "fontfamily":
+            state.font_family = a.get("family", state.font_family)
+        elif name in ("rect", "roundrect"):
+            x, y = point(_float(a, "x"), _float(a, "y"))
+            w, h = _float(a, "w") * state.scale, _float(a, "h") * state.scale
+            geometry = [("x", num(x)), ("y", num(y)), ("width", num(w)), ("height", num(h))]
+            if name == "roundrect":
+                geometry += [("rx", num(_float(a, "dx") * state.scale)), ("ry", num(_float(a, "dy") * state.scale))]
+            pending = ("rect", geometry)
+        elif name == "ellipse":
+            x, y = point(_float(a, "x"), _float(a, "y"))
+            w, h = _float(a, "w") * state.scale, _float(a, "h") * state.scale
+            pending = ("ellipse", [("cx", num(x + w / 2)), ("cy", num(y + h / 2)),
+                                   ("rx", num(w / 2)), ("ry", num(h / 2))])
+        elif name == "begin":
+            path, path_simple, pending = [], True, None
+        elif name == "quad":
+            path_simple = False
+            path.append(("Q", point(_float(a, "x1"), _float(a, "y1")) + point(_float(a, "x2"), _float(a, "y2"))))
+        elif name == "curve":
+            path_simple = False
+            path.append(("C", point(_float(a, "x1"), _float(a, "y1")) + point(_float(a, "x2"), _float(a, "y2"))
+                         + point(_float(a, "x3"), _float(a, "y3"))))
+        elif name == "arc":
+            path_simple = False
+            x, y = point(_float(a, "x"), _float(a, "y"))
+            path.append(("A", (_float(a, "rx") * state.scale, _float(a, "ry") * state.scale, _float(a, "x-axis-rotation"),
+                               _float(a, "large-arc-flag"), _float(a, "sweep-flag"), x, y)))
+        elif name == "close":
+            path.append(("Z", ()))
+        elif name in ("fill", "stroke", "fillstroke"):
+            if path:
+                closed = path[-1][0] == "Z"
+                if path_simple and path[0][0] == "M":
+                    points = " ".join(f"{num(x)},{num(y)}" for op, (x, y) in path[:-1 if closed else None])
+                    pending = ("polygon" if closed else "polyline", [("points", points)])
+                else:
+                    d = "".join(op + " ".join(num(v) for v in values) for op, values in path)
+                    pending = ("path", [("d", d)])
+                path = []
+            fill = (state.fill or "none") if name != "stroke" else "none"
+            stroke = (state.stroke or "none") if name != "fill" else "none"
+            if pending is None or fill == stroke == "none":
+                pending = None
+                continue
+            paint = [("fill", fill), ("stroke", stroke), ("stroke-width", paint_num(state.stroke_width))]
+            if name != "fill" and state.dashed:
+                dashes = " ".join(paint_num(_to_float(v) * state.stroke_width) for v in state.dash_pattern.split())
+                paint.append(("stroke-dasharray", dashes))
+            if state.fill_alpha != 1.0 and name != "stroke":
+                paint.append(("fill-opacity", paint_num(state.fill_alpha)))
+            if state.stroke_alpha != 1.0 and name != "fill":
+                paint.append(("stroke-opacity", paint_num(state.stroke_alpha)))
+            shapes.append((pending[0], pending[1], tuple(paint), state.transform))
+            pending = None
+        elif name == "text":
+            text = " ".join(html.unescape(_TEXT_TAG_RE.sub(" ", a.get("str", ""))).split())
+            if not text:
+                continue
+            x, y = point(_float(a, "x"), _float(a, "y"))
+            size = state.font_size * state.scale
+            valign = a.get("valign", "middle")
+            if valign == "top":
+                y += size
+            elif valign != "bottom":
+                y += size / 2
+            geometry = [("x", num(x)), ("y", num(y)), ("text-anchor", _TEXT_ANCHORS.get(a.get("align"), "middle")),
+                        ("font-size", num(size)), ("font-family", state.font_family)]
+            if a.get("rotation") not in (None, "", "0"):
+                geometry.append(("transform", f"rotate({num(_float(a, 'rotation'))},{num(x)},{num(y)})"))
+            shapes.append(("text", geometry, (("fill", state.font_color),), state.transform, text))
+        elif name == "image":
+            x, y = point(_float(a, "x"), _float(a, "y"))
+            geometry = [("x", num(x)), ("y", num(y)), ("width", num(_float(a, "w") * state.scale)),
+                        ("height", num(_float(a, "h") * state.scale)), ("href", a.get("src", ""))]
+            shapes.append(("image", geometry, (), state.transform))
+        elif name == "width" and "size" in a:
+            width = a["size"]
+        elif name == "height" and "size" in a:
+            height = a["size"]
+
+    if not shapes:
+        return ""
+
+    def element(shape, with_paint):
+        tag, geometry, paint, transform = shape[:4]
+        attrs = list(geometry) + (list(paint) if with_paint else [])
+        if transform:
+            attrs.append(("transform", transform))
+        if tag == "text":
+            return f"<text{_svg_attrs(attrs)}>{html.escape(shape[4], quote=False)}</text>"
+        return f"<{tag}{_svg_attrs(attrs)}/>"
+
+    svg_parts = [f"<svg xmlns='http://www.w3.org/2000/svg' width='{width}' height='{height}'>"]
+    if compact:
+        # Consecutive shapes with identical paint share one <g>
+        i = 0
+        while i < len(shapes):
+            j = i + 1
+            while j < len(shapes) and shapes[j][2] == shapes[i][2]:
+                j += 1
+            if j - i > 1 and shapes[i][2]:
+                svg_parts.append(f"<g{_svg_attrs(shapes[i][2])}>" + "".join(element(s, False) for s in shapes[i:j]) + "</g>")
+            else:
+                svg_parts.extend(element(s, True) for s in shapes[i:j])
+            i = j
+    else:
+        svg_parts.extend(element(s, True) for s in shapes)
+    svg_parts.append("</svg>")
+    return "".join(svg_parts)
+
+
+def svg_data_uri(svg: str, compact: bool = False) -> str:
+    """data: URI for an SVG; compact picks the shorter of URL-quoted and base64."""
+    quoted = "data:image/svg+xml;utf8," + urllib.parse.quote(svg)
+    if not compact:
+        return quoted
+    encoded = "data:image/svg+xml;base64," + base64.b64encode(svg.encode("utf-8")).decode("ascii")
+    return encoded if len(encoded) < len(quoted) else quoted
+
+
+def diagram_img_html(src: str, svg_width_pct: str = "70%") -> str:
+    """The description HTML showing a diagram from src (a data: URI or an attachment reference)."""
+    return f"<div><img alt='diagram' src=\"{src}\" style='width:{svg_width_pct};' /></div>"
+
+
+def diagram_image_to_description(diagram_image_xml: str, svg_width_pct: str = "70%", compact: bool = False) -> str:
+    """Convert diagram_image XML into inline SVG <img> HTML."""
+    svg = render_diagram_svg(diagram_image_xml, compact)
+    if not svg:
+        return ""
+    return diagram_img_html(svg_data_uri(svg, compact), svg_width_pct)
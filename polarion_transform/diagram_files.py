@@ -0,0 +1,99 @@
+"""Rendered diagrams written as SVG attachment files instead of inline data: URIs.
+
+An inline diagram is URL-quoted into the description, roughly tripling its
+size in every output file and in Polarion's rich text. With diagram files
+each rendered SVG larger than inline_max bytes is written once, named by
+its content hash, to
+
+    <output folder>/wrapped_resources/diagram-<hash>.svg
+
+next to the exported attachments. The artifact gets an attachment entry for
+it (with content_hash, size and mime_type, like a staged attachment) and
+its description an <img> referencing the attachment (attachment_src).
+Diagrams up to inline_max bytes stay inline data: URIs.
+"""
+import hashlib
+import os
+
+from .cache import svg_cache
+from .diagram import diagram_img_html, svg_data_uri
+
+# Folder of the module output folder the SVG files go to, as in the exported file_path values
+RESOURCES_FOLDER = "wrapped_resources"
+
+# SVGs up to this many bytes stay inline by default
+default_inline_max = 2048
+
+# <img> src of an externalized diagram; Polarion resolves "attachment:" against the work item's attachments
+attachment_src = "attachment:{file_name}"
+
+
+class DiagramFiles:
+    """Renders the diagrams of the modules one process writes into one output folder."""
+
+    def __init__(self, output_dir, inline_max=None):
+        self.resources_dir = os.path.join(output_dir, RESOURCES_FOLDER)
+        self.inline_max = default_inline_max if inline_max is None else inline_max
+        self.written = set()  # file names known to exist, shared by all modules
+        self.begin_module()
+
+    def begin_module(self):
+        self.inline = 0
+        self.files = {}  # file name -> size of the diagrams attached in this module
+        self.attached = 0
+        self.bytes_saved = 0
+
+    def render(self, diagram_image_xml, svg_width_pct="70%", compact=False):
+        """(description HTML, attachment entry or None) for a diagram_image."""
+        svg = svg_cache(diagram_image_xml, compact)
+        if not svg:
+            return "", None
+        data = svg.encode("utf-8")
+        inline_html = diagram_img_html(svg_data_uri(svg, compact), svg_width_pct)
+        if len(data) <= self.inline_max:
+            self.inline += 1
+            return inline_html, None
+        content_hash = hashlib.blake2b(data, digest_size=16).hexdigest()
+        name = f"diagram-{content_hash}"
+        file_name = name + ".svg"
+        if file_name not in self.written:
+            self._write(file_name, data)
+        html = diagram_img_html(attachment_src.format(file_name=file_name), svg_width_pct)
+        self.attached += 1
+        self.files[file_name] = len(data)
+        self.bytes_saved += len(inline_html) - len(html)
+        return html, {
+            "file_path": f"{RESOURCES_FOLDER}\\{file_name}",
+            "file_name_in_polarion": name,
+            "title": name,
+            "content_hash": content_hash,
+            "size": len(data),
+            "mime_type": "image/svg+xml",
+        }
+
+    def _write(self, file_name, data):
+        path = os.path.join(self.resources_dir, file_name)
+        if not os.path.exists(path):
+            # Other processes may write the same diagram; the content is the same, so the last replace wins
+            os.makedirs(self.resources_dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        self.written.add(file_name)
+
+    def module_report(self):
+        return {"inline": self.inline, "attached": self.attached, "files": dict(sorted(self.files.items())),
+                "bytes_saved": self.bytes_saved}
+
+
+_diagram_files = {}
+
+
+def get_diagram_files(output_dir, inline_max=None):
+    """The process's DiagramFiles for an output folder and inline limit."""
+    key = (os.path.abspath(output_dir), inline_max)
+    diagram_files = _diagram_files.get(key)
+    if diagram_files is None:
+        diagram_files = _diagram_files[key] = DiagramFiles(*key)
+    return diagram_files
@@ -0,0 +1,145 @@
+"""Cleanup of DNG primary text XHTML into Polarion rich text."""
+import re
+
+# Patterns are compiled once at import. Every pass either starts with a
+# literal (so the regex engine can skip ahead instead of trying a match at
+# each character) or is a plain str operation, and the passes run in the same
+# order as the original chain of re.sub calls, so the output is unchanged.
+_PRIMARYTEXT_WRAPPER_RE = re.compile(r"</?ns0:primarytext[^>]*>")
+# "html:" prefixes that str.replace alone would not handle like the original
+# <html:name / </html:name> rules; only these need the slower regex.
+_IRREGULAR_HTML_PREFIX_RE = re.compile(r"</?html:(?![a-zA-Z0-9])|</html:[a-zA-Z0-9]+(?![a-zA-Z0-9>])")
+_HTML_PREFIX_RE = re.compile(r"<(/(?=html:[a-zA-Z0-9]+>))?html:(?=[a-zA-Z0-9])")
+_DIR_ATTR_RE = re.compile(r'dir="[^"]*"')
+_ID_ATTR_RE = re.compile(r'id="[^"]*"')
+_IMG_RE = re.compile(r"<img[^>]*>")
+_MULTI_SPACE_RE = re.compile(r"\s\s+")
+_EMPTY_P_RE = re.compile(r"<p>\s*(?:&nbsp;)?\s*</p>", re.IGNORECASE)
+_EMPTY_DIV_RE = re.compile(r"<div>\s*(?:&nbsp;)?\s*</div>", re.IGNORECASE)
+_DUPLICATE_INLINE_RE = re.compile(r"<(/?)(i|u|b|sub|sup)><\1\2>")
+_TABLE_RE = re.compile(r"<table([^>]*)>")
+_TD_RE = re.compile(r"<td([^>]*)>")
+_STYLE_WIDTH_RE = re.compile(r'width\s*:\s*[^;"]+;?', re.IGNORECASE)
+
+_TABLE_STYLE = "width: 70%; border-collapse: collapse; border: 1px solid #696969;"
+_TD_STYLE = "border: 1px solid #696969; padding: 4px;"
+
+
+def _remove_attribute(pattern, text):
+    """Same as re.sub(r'\\s*' + pattern, "", text) without a leading \\s* in the regex."""
+    pieces = pattern.split(text)
+    if len(pieces) == 1:
+        return text
+    last = pieces.pop()
+    return "".join([piece.rstrip() for piece in pieces]) + last
+
+
+def _styled_tag(tag, attrs, style):
+    attrs = _STYLE_WIDTH_RE.sub("", attrs)
+    if "style=" in attrs:
+        return f"<{tag}{attrs[:-1]}; {style}\">"
+    return f"<{tag}{attrs} style=\"{style}\">"
+
+
+def _add_table_styles(match):
+    return _styled_tag("table", match.group(1), _TABLE_STYLE)
+
+
+def _add_td_styles(match):
+    return _styled_tag("td", match.group(1), _TD_STYLE)
+
+
+def clean_primary_html(html_text: str) -> str:
+    if not html_text:
+        return ""
+
+    # Remove <ns0:primarytext ...> wrapper
+    cleaned = _PRIMARYTEXT_WRAPPER_RE.sub("", html_text)
+
+    # Replace "html:" prefixes
+    if _IRREGULAR_HTML_PREFIX_RE.search(cleaned):
+        cleaned = _HTML_PREFIX_RE.sub(r"<\1", cleaned)
+    else:
+        cleaned = cleaned.replace("<html:", "<").replace("</html:", "</")
+
+    # Remove dir and id attributes
+    if 'dir="' in cleaned:
+        cleaned = _remove_attribute(_DIR_ATTR_RE, cleaned)
+    if 'id="' in cleaned:
+        cleaned = _remove_attribute(_ID_ATTR_RE, cleaned)
+
+    # Remove <img> tags
+    cleaned = _IMG_RE.sub("", cleaned)
+
+    # Normalize spaces & remove newlines
+    cleaned = _MULTI_SPACE_RE.sub(" ", cleaned.replace("\n", " "))
+
+    # Remove empty <p> or <div>
+    cleaned = _EMPTY_P_RE.sub("", cleaned)
+    cleaned = _EMPTY_DIV_RE.sub("", cleaned)
+
+    # Fix duplicated inline tags
+    cleaned = _DUPLICATE_INLINE_RE.sub(r"<\1\2>", cleaned)
+
+    # Normalize <table> and <td> styles
+    cleaned = _TABLE_RE.sub(_add_table_styles, cleaned)
+    cleaned = _TD_RE.sub(_add_td_styles, cleaned)
+
+    # Ensure outer wrapper
+    if not cleaned.startswith("<div>"):
+        cleaned = f"<div>{cleaned}</div>"
+
+    return cleaned.strip()
+
+
+# Patterns of clean_source_html (the cleanup tx.py used to run as a separate pass)
+_SOURCE_HTML_PREFIX_RE = re.compile(r"</?html:")
+_SOURCE_DIR_ATTR_RE = re.compile(r'\s*dir="[^"]*"')
+_SOURCE_ID_ATTR_RE = re.compile(r'\s*id="[^"]*"')
+_NEWLINES_RE = re.compile(r"\n+")
+_SOURCE_MULTI_SPACE_RE = re.compile(r"\s{2,}")
+_P_CHAIN_RE = re.compile(r"(</p>\s*<p>\s*)+")
+_DIV_CHAIN_RE = re.compile(r"(</div>\s*<div>\s*)+")
+_DUPLICATE_OPEN_INLINE_RE = re.compile(r"<(i|u|b|sub|sup)><\1>")
+_DUPLICATE_CLOSE_INLINE_RE = re.compile(r"</(i|u|b|sub|sup)></\1>")
+_STRAY_CLOSING_RE = re.compile(r"</(i|u|b|sub|sup|del)>\s*</")
+
+
+def clean_source_html(html_text: str) -> str:
+    """tx.py's cleanup of primary_text_html, kept in the DNG layout (no table styles or <div> wrapper)."""
+    if not html_text:
+        return ""
+
+    # Remove <ns0:primarytext ...> wrapper
+    cleaned = _PRIMARYTEXT_WRAPPER_RE.sub("", html_text)
+
+    # Remove "html:" prefixes
+    cleaned = _SOURCE_HTML_PREFIX_RE.sub("<", cleaned)
+
+    # Remove dir and id attributes
+    cleaned = _SOURCE_DIR_ATTR_RE.sub("", cleaned)
+    cleaned = _SOURCE_ID_ATTR_RE.sub("", cleaned)
+
+    # Remove <img> tags
+    cleaned = _IMG_RE.sub("", cleaned)
+
+    # Remove newlines and collapse spaces
+    cleaned = _NEWLINES_RE.sub("", cleaned)
+    cleaned = _SOURCE_MULTI_SPACE_RE.sub(" ", cleaned)
+
+    # Remove empty <p> and <div> (with or without &nbsp;)
+    cleaned = _EMPTY_P_RE.sub("", cleaned)
+    cleaned = _EMPTY_DIV_RE.sub("", cleaned)
+
+    # Collapse duplicate <p> or <div> chains
+    cleaned = _P_CHAIN_RE.sub("</p><p>", cleaned)
+    cleaned = _DIV_CHAIN_RE.sub("</div><div>", cleaned)
+
+    # Fix duplicated inline tags (<i><i>, <u><u>, etc.)
+    cleaned = _DUPLICATE_OPEN_INLINE_RE.sub(r"<\1>", cleaned)
+    cleaned = _DUPLICATE_CLOSE_INLINE_RE.sub(r"</\1>", cleaned)
+
+    # Remove stray closing tags at the end
+    cleaned = _STRAY_CLOSING_RE.sub("</", cleaned)
+
+    return cleaned.strip()
@@ -0,0 +1,255 @@
+"""Cross-module artifact index used to resolve linked_artifacts.
+
+A pre-pass over every input module records identifier -> module title,
+space_id, mapped artifact_type and parent identifier (from the module
+structure or children). The index is written to one binary file that each
+worker memory-maps read-only, so all processes share the same pages:
+
+    header   magic, version, record count, string count
+    hashes   record count x u64, sorted (8-byte blake2b of the identifier)
+    records  record count x 5 u32 string ids: identifier, module, space_id,
+             artifact_type, parent (NO_STRING if none)
+    offsets  (string count + 1) x u32 into the string blob
+    strings  utf-8 blob
+
+Integers are in native byte order; the file is meant for the machine that
+built it. An identifier that occurs in several modules keeps one record per
+occurrence, in input file order, and resolves to the first.
+"""
+import bisect
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import Mapping
+
+from .adapters import read_module
+from .mappings import get_field_mapping
+
+MAGIC = b"PTLX"
+VERSION = 1
+_HEADER = struct.Struct("=4sIII")
+_RECORD_FIELDS = 5
+NO_STRING = 0xFFFFFFFF
+
+
+def identifier_hash(identifier):
+    return int.from_bytes(hashlib.blake2b(str(identifier).encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def link_index_path(output_dir):
+    """Like the manifest, the index sits next to the output folder."""
+    return os.path.normpath(output_dir) + ".index"
+
+
+def module_index_records(input_path, mappings=None):
+    """(identifier, module, space_id, artifact_type, parent) for every artifact of one module file.
+
+    Unreadable modules give no records; their transform reports the error.
+    """
+    try:
+        data = read_module(input_path, skip_dropped=False)
+    except (OSError, ValueError):
+        return []
+    if not isinstance(data, dict):
+        return []
+    field_mapping = get_field_mapping(mappings)
+    _, translate_type = field_mapping.artifact_rules.get("artifact_type", (None, None))
+    module = data.get("module_title") or ""
+    space_id = field_mapping.space_id(data.get("module_type"))
+    records = []
+    for artifact, parent in module_artifacts(data):
+        artifact_type = artifact.get("artifact_type") or ""
+        if translate_type is not None:
+            artifact_type = translate_type(artifact_type)
+        records.append((str(artifact["identifier"]), module, space_id, artifact_type, parent))
+    return records
+
+
+def module_artifacts(data):
+    """(artifact, parent identifier or None) for every artifact of a parsed module with an identifier, in order."""
+    # The export keeps artifacts flat and their hierarchy in "structure" (by artifact_uri)
+    uri_identifiers = {}
+    artifacts = []
+    pending = [(artifact, None) for artifact in reversed(data.get("artifacts") or [])]
+    while pending:
+        artifact, parent = pending.pop()
+        if not isinstance(artifact, Mapping) or artifact.get("identifier") in (None, ""):
+            continue
+        artifacts.append((artifact, parent))
+        if artifact.get("artifact_uri"):
+            uri_identifiers[artifact["artifact_uri"]] = str(artifact["identifier"])
+        if isinstance(artifact.get("children"), list):
+            pending.extend((child, str(artifact["identifier"])) for child in reversed(artifact["children"]))
+    structure_parents = {}
+    stack = [(data["structure"], None)] if isinstance(data.get("structure"), dict) else []
+    while stack:
+        node, parent_uri = stack.pop()
+        uri = node.get("artifact_uri")
+        if uri and parent_uri:
+            structure_parents[uri] = parent_uri
+        for child in node.get("children") or []:
+            if isinstance(child, dict):
+                stack.append((child, uri or None))
+    return [(artifact, parent if parent is not None
+             else uri_identifiers.get(structure_parents.get(artifact.get("artifact_uri"))))
+            for artifact, parent in artifacts]
+
+
+def write_link_index(path, records):
+    """Write records to path (atomically) and return the content hash of the file."""
+    strings = {}
+
+    def string_id(value):
+        if value is None:
+            return NO_STRING
+        sid = strings.get(value)
+        if sid is None:
+            sid = strings[value] = len(strings)
+        return sid
+
+    keyed = sorted(
+        ((identifier_hash(record[0]), record[0], order), record) for order, record in enumerate(records)
+    )
+    hashes = array("Q", (key[0] for key, _ in keyed))
+    fields = array("I")
+    for _, record in keyed:
+        fields.extend(string_id(value) for value in record)
+    blob = bytearray()
+    offsets = array("I", [0])
+    for value in strings:
+        blob += value.encode("utf-8")
+        offsets.append(len(blob))
+
+    close_link_index(path)
+    tmp_path = path + ".tmp"
+    digest = hashlib.blake2b(digest_size=16)
+    with open(tmp_path, "wb") as f:
+        for part in (_HEADER.pack(MAGIC, VERSION, len(keyed), len(strings)), hashes.tobytes(),
+                     fields.tobytes(), offsets.tobytes(), bytes(blob)):
+            f.write(part)
+            digest.update(part)
+    os.replace(tmp_path, path)
+    return digest.hexdigest()
+
+
+def build_link_index(input_paths, path, workers=1, mappings=None):
+    """Index every artifact of input_paths into path; returns the index content hash."""
+    input_paths = sorted(input_paths)
+    if workers > 1 and len(input_paths) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            per_module = list(executor.map(module_index_records, input_paths, [mappings] * len(input_paths)))
+    else:
+        per_module = [module_index_records(input_path, mappings) for input_path in input_paths]
+    return write_link_index(path, [record for records in per_module for record in records])
+
+
+class ArtifactIndex:
+    """Read-only, memory-mapped view of an index file written by write_link_index."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, string_count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a link index (version {VERSION})")
+        view = memoryview(self._mmap)
+        start = _HEADER.size
+        self._hashes = view[start:start + 8 * count].cast("Q")
+        start += 8 * count
+        self._fields = view[start:start + 4 * _RECORD_FIELDS * count].cast("I")
+        start += 4 * _RECORD_FIELDS * count
+        self._offsets = view[start:start + 4 * (string_count + 1)].cast("I")
+        self._strings = start + 4 * (string_count + 1)
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def _string(self, sid):
+        if sid == NO_STRING:
+            return None
+        start = self._strings + self._offsets[sid]
+        return self._mmap[start:self._strings + self._offsets[sid + 1]].decode("utf-8")
+
+    def _records(self, identifier):
+        identifier = str(identifier)
+        key = identifier_hash(identifier)
+        position = bisect.bisect_left(self._hashes, key)
+        while position < self.count and self._hashes[position] == key:
+            base = position * _RECORD_FIELDS
+            if self._string(self._fields[base]) == identifier:
+                yield base
+            position += 1
+
+    def lookup(self, identifier):
+        """Target of a link to identifier: {"module", "space_id", "artifact_type", "parent"}, or None."""
+        for base in self._records(identifier):
+            return self._target(base)
+        return None
+
+    def lookup_all(self, identifier):
+        """Every occurrence of identifier, in input file order."""
+        return [self._target(base) for base in self._records(identifier)]
+
+    def _target(self, base):
+        fields = self._fields
+        return {
+            "module": self._string(fields[base + 1]),
+            "space_id": self._string(fields[base + 2]),
+            "artifact_type": self._string(fields[base + 3]),
+            "parent": self._string(fields[base + 4]),
+        }
+
+    def close(self):
+        self._hashes.release()
+        self._fields.release()
+        self._offsets.release()
+        self._mmap.close()
+
+
+_opened = {}
+
+
+def open_link_index(path):
+    """The ArtifactIndex at path, opened once per process and reopened when the file changes."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    index, version = _opened.get(path, (None, None))
+    if index is None or version != (stat.st_mtime_ns, stat.st_size):
+        if index is not None:
+            index.close()
+        index = ArtifactIndex(path)
+        _opened[path] = (index, (stat.st_mtime_ns, stat.st_size))
+    return index
+
+
+def close_link_index(path):
+    index, _ = _opened.pop(os.path.abspath(path), (None, None))
+    if index is not None:
+        index.close()
+
+
+class LinkResolver:
+    """Resolves the links of one module against an index and collects the dangling ones."""
+
+    def __init__(self, index):
+        self.index = index
+        self.resolved = 0
+        self.dangling = []
+
+    def resolve(self, source, target, link_role):
+        resolved = self.index.lookup(target)
+        if resolved is None:
+            self.dangling.append({"source": source, "target": target, "link_role": link_role})
+        else:
+            self.resolved += 1
+        return resolved
+
+    def report(self):
+        return {"resolved": self.resolved, "dangling": self.dangling}
@@ -0,0 +1,101 @@
+"""Per-run manifest used to skip unchanged modules and reuse unchanged artifacts."""
+import glob
+import hashlib
+import json
+import os
+
+from . import transform
+from .output import json_default, read_output_artifacts
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def file_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def artifact_hash(artifact):
+    """Hash of a raw artifact subtree; key order counts since it is kept in the output."""
+    return content_hash(json.dumps(artifact, ensure_ascii=False, default=_source_default).encode("utf-8"))
+
+
+def _source_default(value):
+    """Lazily decoded records (adapters.LazyRecord) are hashed by their source values, undecoded."""
+    source_dict = getattr(value, "source_dict", None)
+    return json_default(value) if source_dict is None else source_dict()
+
+
+def mapping_hash(field_mapping=None):
+    """Hash of the mapping config and of the package source, so code changes also force a rerun."""
+    config = (field_mapping or transform.field_mapping).config
+    digest = hashlib.blake2b(json.dumps(config, sort_keys=True).encode("utf-8"), digest_size=16)
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "*.py"))):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def manifest_path(output_dir):
+    """The manifest sits next to the output folder so importers never pick it up as a module."""
+    return os.path.normpath(output_dir) + ".manifest.json"
+
+
+def load_manifest(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {"mapping_hash": None, "modules": {}}
+    manifest.setdefault("modules", {})
+    return manifest
+
+
+def save_manifest(path, manifest):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class ArtifactReuse:
+    """Drop-in for transform_artifact on top-level artifacts.
+
+    Records the hash of every raw artifact for the manifest and returns the
+    previous transformed subtree instead of transforming again when the hash
+    is found in previous.
+    """
+
+    def __init__(self, previous=None):
+        self.previous = previous or {}
+        self.hashes = []
+        self.reused = 0
+
+    def __call__(self, artifact):
+        digest = artifact_hash(artifact)
+        self.hashes.append(digest)
+        transformed = self.previous.get(digest)
+        if transformed is not None:
+            self.reused += 1
+            if transform.artifact_stats is not None:
+                transform.artifact_stats.add_tree(transformed)
+            if transform.validator is not None:
+                transform.validator.check_tree(transformed)
+            return transformed
+        return transform.transform_artifact(artifact)
+
+
+def load_previous_artifacts(output_path, artifact_hashes):
+    """Map raw artifact hash -> transformed artifact from the previous output file."""
+    try:
+        previous = read_output_artifacts(output_path)
+    except (ImportError, OSError, ValueError, AttributeError, EOFError):
+        return {}
+    if not isinstance(previous, list) or len(previous) != len(artifact_hashes):
+        return {}
+    return dict(zip(artifact_hashes, previous))
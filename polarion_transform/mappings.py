@@ -0,0 +1,129 @@
+"""DNG -> Polarion key and value mappings.
+
+The tables live in a config file (mappings.json next to this module by
+default, or a project's own .json / .yaml file with the same layout):
+
+    module / artifact / link sections, each with
+      "drop":        source keys left out of the output
+      "rename":      source key -> output key
+      "values":      source key -> {source value: output value}; unlisted values pass through
+      "list_values": source key -> {source value: [output values]}; anything
+                     that is not a list becomes [value] ([] when empty)
+    module also has "space_id" (module_type -> space_id) and "space_id_default".
+
+FieldMapping compiles a config into one dispatch table per section, source
+key -> (output key, value translator), so mapping a record takes a single
+dict lookup per field.
+"""
+import json
+import os
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mappings.json")
+
+# Artifact fields transform_artifact combines into "description" itself
+DESCRIPTION_FIELDS = ("primary_text_html", "primary_text_html_local", "description", "diagram_image")
+
+# Dispatch entry of a dropped key
+DROP = (None, None)
+
+
+def load_config(path=None):
+    """Read a mapping config; .yaml / .yml files need PyYAML."""
+    path = path or DEFAULT_CONFIG
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError(f"PyYAML is required to read {path}; install it or use a .json config") from None
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def _value_translator(table):
+    get = table.get
+    return lambda value: get(value, value)
+
+
+def _list_translator(table):
+    def translate(value):
+        mapped = table.get(value)
+        return mapped if isinstance(mapped, list) else ([value] if value else [])
+    return translate
+
+
+def compile_rules(section, drop=()):
+    """Dispatch table for one config section: source key -> (output key or None, translator or None)."""
+    rename = section.get("rename", {})
+    rules = {key: DROP for key in (*drop, *section.get("drop", ()))}
+    for key in (*rename, *section.get("values", {}), *section.get("list_values", {})):
+        translator = None
+        if key in section.get("values", {}):
+            translator = _value_translator(section["values"][key])
+        elif key in section.get("list_values", {}):
+            translator = _list_translator(section["list_values"][key])
+        rules[key] = (rename.get(key, key), translator)
+    return rules
+
+
+class FieldMapping:
+    """A mapping config compiled into per-source-key dispatch tables."""
+
+    def __init__(self, config):
+        self.config = config
+        artifact = config["artifact"]
+        overlap = set(DESCRIPTION_FIELDS) & {*artifact.get("rename", {}), *artifact.get("values", {}),
+                                             *artifact.get("list_values", {})}
+        if overlap:
+            raise ValueError(f"Artifact fields {sorted(overlap)} make up the description and cannot be mapped")
+        self.module_rules = compile_rules(config["module"])
+        self.artifact_rules = compile_rules(artifact, DESCRIPTION_FIELDS)
+        self.link_rules = compile_rules(config["link"])
+        self.space_ids = config["module"].get("space_id", {})
+        self.space_id_default = config["module"].get("space_id_default", "_default")
+
+    @classmethod
+    def load(cls, path=None):
+        return cls(load_config(path))
+
+    @staticmethod
+    def apply(rules, record):
+        """Mapped copy of a flat record; keys without a rule are copied unchanged.
+
+        Records with kept_items (adapters.LazyRecord) are asked for the kept
+        keys only, so the values of dropped keys are never decoded.
+        """
+        mapped = {}
+        get_rule = rules.get
+        kept_items = getattr(record, "kept_items", None)
+        for key, value in (record.items() if kept_items is None else kept_items(rules)):
+            rule = get_rule(key)
+            if rule is None:
+                mapped[key] = value
+                continue
+            new_key, translate = rule
+            if new_key is not None:
+                mapped[new_key] = value if translate is None else translate(value)
+        return mapped
+
+    def map_artifact(self, artifact):
+        """Mapped fields of an artifact, without the description fields (children are left as they are)."""
+        return self.apply(self.artifact_rules, artifact)
+
+    def map_link(self, link):
+        return self.apply(self.link_rules, link)
+
+    def space_id(self, module_type):
+        return self.space_ids.get(module_type, self.space_id_default)
+
+
+_loaded = {}
+
+
+def get_field_mapping(path=None):
+    """Compiled mapping for a config path (None = the default config), compiled once per process."""
+    key = os.path.abspath(path) if path else DEFAULT_CONFIG
+    mapping = _loaded.get(key)
+    if mapping is None:
+        mapping = _loaded[key] = FieldMapping.load(key)
+    return mapping
@@ -0,0 +1,107 @@
+"""Opt-in per-stage metrics collected while a module is transformed."""
+import heapq
+import sys
+import time
+from collections import Counter, defaultdict
+
+
+class Metrics:
+    """Opt-in stage timers and counters for one module (see --metrics-report)."""
+
+    def __init__(self, slowest=10):
+        self.stages = defaultdict(float)
+        self.calls = Counter()
+        self.by_type = Counter()
+        self.by_status = Counter()
+        self.by_type_status = defaultdict(Counter)
+        self.artifact_time = 0.0
+        self.slowest_n = slowest
+        self.slowest = []  # min-heap of (seconds, identifier)
+
+    def add_time(self, stage, seconds):
+        self.stages[stage] += seconds
+        self.calls[stage] += 1
+
+    def record_artifact(self, artifact, seconds):
+        """Count one source artifact; seconds is its own time, children excluded."""
+        artifact_type = artifact.get("artifact_type") or "(No Type)"
+        status = artifact.get("artifact_status") or "(No Status)"
+        self.by_type[artifact_type] += 1
+        self.by_status[status] += 1
+        self.by_type_status[artifact_type][status] += 1
+        self.artifact_time += seconds
+        entry = (seconds, str(artifact.get("identifier", "")))
+        if len(self.slowest) < self.slowest_n:
+            heapq.heappush(self.slowest, entry)
+        elif entry > self.slowest[0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def report(self):
+        stages = {name: round(seconds, 6) for name, seconds in self.stages.items()}
+        # Time spent in transform_artifact outside the separately timed stages
+        inner = sum(self.stages[name] for name in ARTIFACT_STAGES)
+        stages["map_fields"] = round(max(self.artifact_time - inner, 0.0), 6)
+        return {
+            "stages": stages,
+            "stage_calls": dict(self.calls),
+            "by_type": dict(self.by_type.most_common()),
+            "by_status": dict(self.by_status.most_common()),
+            "by_type_status": {t: dict(c.most_common()) for t, c in self.by_type_status.items()},
+            "slowest_artifacts": [
+                {"identifier": identifier, "seconds": round(seconds, 6)}
+                for seconds, identifier in sorted(self.slowest, reverse=True)
+            ],
+        }
+
+
+# Stages timed inside transform_artifact; the rest of its time is "map_fields"
+ARTIFACT_STAGES = ("clean_source_html", "clean_html", "render_diagram", "links", "attachments", "validate")
+
+# Metrics of the module being transformed in this process, None when disabled
+current = None
+
+
+def timed(stage, func, *args):
+    """func(*args), adding its duration to the current module's metrics when enabled."""
+    if current is None:
+        return func(*args)
+    start = time.perf_counter()
+    result = func(*args)
+    current.add_time(stage, time.perf_counter() - start)
+    return result
+
+
+def peak_rss_mb():
+    """High-water mark of this process's resident memory in MB, or None if unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return _windows_peak_rss_mb()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def _windows_peak_rss_mb():
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        kernel32, psapi = ctypes.windll.kernel32, ctypes.windll.psapi
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters), wintypes.DWORD]
+        if not psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return None
+        return round(counters.PeakWorkingSetSize / (1 << 20), 1)
+    except (ImportError, AttributeError, OSError):
+        return None
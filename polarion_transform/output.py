@@ -0,0 +1,293 @@
+"""Output formats, compression and serializer backends for transformed modules.
+
+    json      indented like json.dump(module, indent=2, ensure_ascii=False)
+    minified  the same document without any whitespace
+    ndjson    line 1 is {"module": {<module fields>}}, then one top-level
+              artifact (children included) per line
+
+Any format can be gzip or zstd compressed. Values are serialized by the
+fastest installed backend (orjson) unless another is chosen; for exported
+data it writes the same bytes as the json module, except that non-finite
+floats become null and exponents drop the "+" (1e16 instead of 1e+16).
+"""
+import gzip
+import json
+import os
+
+OUTPUT_FORMATS = ("json", "minified", "ndjson")
+COMPRESSIONS = ("none", "gzip", "zstd")
+SERIALIZERS = ("auto", "json", "orjson")
+
+_EXTENSIONS = {"json": ".json", "minified": ".json", "ndjson": ".ndjson"}
+_COMPRESSED_EXTENSIONS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+# ======================
+# SERIALIZERS
+# ======================
+def json_default(value):
+    """default hook of every serializer: objects with to_dict() (compact.CompactRecord) serialize as that dict."""
+    to_dict = getattr(value, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return to_dict()
+
+
+class JsonSerializer:
+    """Standard library backend."""
+
+    name = "json"
+
+    def dumps(self, value, indent=None):
+        if indent is None:
+            return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=json_default).encode("utf-8")
+        return json.dumps(value, indent=indent, ensure_ascii=False, default=json_default).encode("utf-8")
+
+
+class OrjsonSerializer:
+    """orjson backend; falls back to the json module for values orjson rejects (e.g. huge ints)."""
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._dumps = orjson.dumps
+        self._indent_2 = orjson.OPT_INDENT_2
+        self._fallback = JsonSerializer()
+
+    def dumps(self, value, indent=None):
+        if indent not in (None, 2):
+            return self._fallback.dumps(value, indent)
+        try:
+            return self._dumps(value, default=json_default, option=self._indent_2 if indent else 0)
+        except TypeError:
+            return self._fallback.dumps(value, indent)
+
+
+_serializers = {}
+
+
+def get_serializer(name="auto"):
+    """Serializer backend by name; "auto" picks orjson when it is installed, else json."""
+    name = name or "auto"
+    serializer = _serializers.get(name)
+    if serializer is not None:
+        return serializer
+    if name == "json":
+        serializer = JsonSerializer()
+    elif name == "orjson":
+        try:
+            serializer = OrjsonSerializer()
+        except ImportError:
+            raise ImportError("The orjson serializer needs the orjson package") from None
+    elif name == "auto":
+        try:
+            serializer = OrjsonSerializer()
+        except ImportError:
+            serializer = JsonSerializer()
+    else:
+        raise ValueError(f"Unknown serializer {name!r}; expected one of {SERIALIZERS}")
+    _serializers[name] = serializer
+    return serializer
+
+
+# ======================
+# FILES
+# ======================
+def check_output_options(output_format="json", compression="none", serializer="auto"):
+    """Raise ValueError / ImportError for unknown or unavailable options; returns the serializer backend."""
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {output_format!r}; expected one of {OUTPUT_FORMATS}")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression {compression!r}; expected one of {COMPRESSIONS}")
+    if compression == "zstd":
+        _zstd_module()
+    return get_serializer(serializer)
+
+
+def output_filename(filename, output_format="json", compression="none"):
+    """Output file name for an input module file name."""
+    return os.path.splitext(filename)[0] + _EXTENSIONS[output_format] + _COMPRESSED_EXTENSIONS[compression]
+
+
+def _zstd_module():
+    try:
+        from compression import zstd  # Python 3.14+
+        return zstd, True
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compression needs the zstandard package (or Python 3.14+)") from None
+    return zstandard, False
+
+
+def open_output(path, compression="none", level=None):
+    """Binary file object that compresses what is written to path."""
+    if compression == "none":
+        return open(path, "wb")
+    if compression == "gzip":
+        # mtime=0 keeps the bytes (and the manifest's output hash) stable across reruns
+        return gzip.GzipFile(path, "wb", compresslevel=6 if level is None else level, mtime=0)
+    if compression == "zstd":
+        zstd, stdlib = _zstd_module()
+        if stdlib:
+            return zstd.open(path, "wb", level=level)
+        return zstd.ZstdCompressor(level=3 if level is None else level).stream_writer(open(path, "wb"), closefd=True)
+    raise ValueError(f"Unknown compression {compression!r}; expected one of {COMPRESSIONS}")
+
+
+def open_compressed(path):
+    """Binary reader for an output file, decompressing by extension."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        zstd, stdlib = _zstd_module()
+        if stdlib:
+            return zstd.open(path, "rb")
+        return zstd.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return open(path, "rb")
+
+
+def read_output_artifacts(path):
+    """Top-level artifacts of an output file in any format; a shard header (see sharding.py) reads its shards."""
+    with open_compressed(path) as f:
+        if ".ndjson" not in os.path.basename(path):
+            fields = json.load(f)
+            artifacts = fields.get("artifacts")
+        else:
+            fields, artifacts = {}, []
+            for line in f:
+                record = json.loads(line)
+                if len(record) == 1 and "module" in record:
+                    fields.update(record["module"])
+                else:
+                    artifacts.append(record)
+    if isinstance(fields.get("shards"), list) and artifacts in (None, []):
+        folder = os.path.dirname(path)
+        artifacts = []
+        for shard in fields["shards"]:
+            artifacts.extend(read_output_artifacts(os.path.join(folder, shard["file"])))
+    return artifacts
+
+
+# ======================
+# WRITERS
+# ======================
+class JsonModuleWriter:
+    """Writes a module field by field and artifact by artifact as one JSON document.
+
+    The bytes are identical to dumping the whole module at once with the
+    same indent (None for minified).
+    """
+
+    def __init__(self, outfile, serializer, indent=2):
+        self.outfile = outfile
+        self.dumps = serializer.dumps
+        self.indent = indent
+        if indent is None:
+            self.field_start, self.item_start, self.end, self.key_separator = b"", b"", b"", b":"
+        else:
+            self.field_start = b"\n" + b" " * indent
+            self.item_start = b"\n" + b" " * (2 * indent)
+            self.end, self.key_separator = b"\n", b": "
+        self.separator = self.field_start
+        self.item_separator = None
+        outfile.write(b"{")
+
+    def _nested(self, value, nesting):
+        dumped = self.dumps(value, self.indent)
+        if self.indent is None:
+            return dumped
+        return dumped.replace(b"\n", b"\n" + b" " * (self.indent * nesting))
+
+    def field(self, key, value):
+        self.outfile.write(self.separator + self._nested(key, 1) + self.key_separator + self._nested(value, 1))
+        self.separator = b"," + self.field_start
+
+    def begin_artifacts(self):
+        self.outfile.write(self.separator + b'"artifacts"' + self.key_separator + b"[")
+        self.item_separator = self.item_start
+
+    def encode_artifact(self, artifact):
+        """The bytes artifact() writes for an artifact, separator aside."""
+        return self._nested(artifact, 2)
+
+    def artifact(self, artifact, encoded=None):
+        self.outfile.write(self.item_separator + (encoded or self.encode_artifact(artifact)))
+        self.item_separator = b"," + self.item_start
+
+    def end_artifacts(self):
+        self.outfile.write(b"]" if self.item_separator == self.item_start else self.field_start + b"]")
+        self.separator = b"," + self.field_start
+
+    def close(self):
+        self.outfile.write(b"}" if self.separator == self.field_start else self.end + b"}")
+
+
+class NdjsonModuleWriter:
+    """Writes {"module": {fields}} and then one artifact per line.
+
+    Fields that come after the artifacts (only possible when streaming) get a
+    second {"module": {...}} record at the end; readers merge all of them.
+    """
+
+    def __init__(self, outfile, serializer):
+        self.outfile = outfile
+        self.dumps = serializer.dumps
+        self.fields = {}
+        self.header_written = False
+
+    def _write_fields(self):
+        self.outfile.write(self.dumps({"module": self.fields}) + b"\n")
+        self.fields = {}
+        self.header_written = True
+
+    def field(self, key, value):
+        self.fields[key] = value
+
+    def begin_artifacts(self):
+        if not self.header_written:
+            self._write_fields()
+
+    def encode_artifact(self, artifact):
+        """The bytes artifact() writes for an artifact."""
+        return self.dumps(artifact) + b"\n"
+
+    def artifact(self, artifact, encoded=None):
+        self.outfile.write(encoded or self.encode_artifact(artifact))
+
+    def end_artifacts(self):
+        pass
+
+    def close(self):
+        if self.fields or not self.header_written:
+            self._write_fields()
+
+
+def module_writer(outfile, output_format="json", serializer=None):
+    """Writer for output_format; serializer is a backend or a backend name (default: auto)."""
+    if serializer is None or isinstance(serializer, str):
+        serializer = get_serializer(serializer)
+    if output_format == "json":
+        return JsonModuleWriter(outfile, serializer, 2)
+    if output_format == "minified":
+        return JsonModuleWriter(outfile, serializer, None)
+    if output_format == "ndjson":
+        return NdjsonModuleWriter(outfile, serializer)
+    raise ValueError(f"Unknown output format {output_format!r}; expected one of {OUTPUT_FORMATS}")
+
+
+def write_module(data, writer):
+    """Write a transformed module through a module writer."""
+    for key, value in data.items():
+        if key == "artifacts" and isinstance(value, list):
+            writer.begin_artifacts()
+            for artifact in value:
+                writer.artifact(artifact)
+            writer.end_artifacts()
+        else:
+            writer.field(key, value)
+    writer.close()
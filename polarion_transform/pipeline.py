@@ -0,0 +1,62 @@
+"""Named transform stages and the pipeline config that picks them.
+
+In pipeline order:
+
+    parse              read the module file (once)
+    clean_source_html  tx.py's cleanup of primary_text_html(_local), in place
+                       in the DNG layout, children included
+    map_fields         DNG -> Polarion keys and values, space_id, links; when
+                       disabled artifacts keep the DNG layout
+    clean_html         clean the primary text merged into "description"
+                       (uncleaned when disabled)
+    render_diagrams    render diagram_image into "description" (left as
+                       diagram_image when disabled)
+    stage_attachments  store attachment files per content hash (needs a
+                       staging folder)
+    validate           check the output against the Polarion import schema
+                       (see validation.py)
+    serialize          write the output file (once)
+
+parse and serialize always run. clean_html, render_diagrams and validate
+only apply with map_fields. Every enabled per-artifact stage runs in the
+single tree walk of transform.transform_artifact, so a module is parsed,
+traversed and written once whatever the selection.
+
+A pipeline config is a .json / .yaml file with the stage list:
+
+    {"stages": ["parse", "clean_source_html", "serialize"]}
+"""
+from .mappings import load_config
+
+STAGES = ("parse", "clean_source_html", "map_fields", "clean_html", "render_diagrams", "stage_attachments",
+          "validate", "serialize")
+
+# The Polarion transform
+DEFAULT_STAGES = ("parse", "map_fields", "clean_html", "render_diagrams", "stage_attachments", "validate",
+                  "serialize")
+
+# tx.py: the DNG export with its primary text cleaned
+CLEAN_SOURCE_STAGES = ("parse", "clean_source_html", "serialize")
+
+_REQUIRED = ("parse", "serialize")
+
+
+def resolve_stages(stages=None):
+    """Validated stage names in pipeline order (None = DEFAULT_STAGES); parse and serialize are always added."""
+    if stages is None:
+        return DEFAULT_STAGES
+    if isinstance(stages, str):
+        stages = [name.strip() for name in stages.split(",") if name.strip()]
+    unknown = sorted(set(stages) - set(STAGES))
+    if unknown:
+        raise ValueError(f"Unknown pipeline stages {unknown}; expected some of {STAGES}")
+    selected = set(stages) | set(_REQUIRED)
+    return tuple(name for name in STAGES if name in selected)
+
+
+def load_pipeline(path):
+    """Stage names from a pipeline config file."""
+    config = load_config(path)
+    if not isinstance(config, dict) or not isinstance(config.get("stages"), list):
+        raise ValueError(f"{path} has no \"stages\" list")
+    return resolve_stages(config["stages"])
@@ -0,0 +1,755 @@
+"""Async bulk import of the transformed modules into Polarion over its REST API.
+
+    polarion-import POLARION_JSON --url https://polarion.example.com/polarion/rest/v1 --project PROJ
+
+The import runs in three phases over one pool of keep-alive HTTP
+connections, with at most `concurrency` requests in flight:
+
+    work items    created batch_size at a time per POST .../workitems
+    attachments   uploaded concurrently, once per work item and content
+                  (content_hash when staged, else the resolved file)
+    links         created once every work item exists, one POST per source
+                  work item with all its links: "parent" links for the
+                  module hierarchy and the artifacts' linked_artifacts
+
+Requests failing with a connection error, 408, 429 or 5xx are retried
+with exponential backoff and jitter (or after the server's Retry-After).
+Creates are not idempotent, so they are only resent as they are when they
+provably never reached the server (no connection, 408, 429). After other
+failures the work items of the batch are looked up by legacyID (the
+links or attachments of the work item) and only the missing ones are sent
+again.
+
+Every completed request is appended to a checkpoint journal next to the
+output folder (<output>.import.jsonl): legacyID -> work item id, uploaded
+attachments and created links. A rerun replays the journal and only sends
+what is missing, so an interrupted import resumes where it stopped. Creates
+that failed for good after they may have reached the server are journaled
+as uncertain, and looked up before a rerun sends them; only requests in
+flight when the process was killed may be sent twice.
+
+The HTTP client is a minimal HTTP/1.1 one over asyncio streams, not a
+general-purpose client: redirects (3xx) are not followed but fail the
+request, so --url must be the final REST endpoint; no Accept-Encoding is
+sent and compressed (Content-Encoding) bodies are not decoded; chunked and
+Content-Length bodies are read. A keep-alive connection the server closed
+while idle is detected on reuse (it fails before any byte of the response)
+and the request is sent again on a new connection, as it never reached the
+server.
+
+benchmarks/mock_polarion.py is a local stand-in server for the same endpoints.
+"""
+import argparse
+import asyncio
+import json
+import mimetypes
+import os
+import random
+import re
+import ssl
+import time
+import urllib.parse
+import uuid
+
+from .attachments import source_path
+from .output import read_output_artifacts
+
+# Artifact fields that are not sent as work item attributes (sent otherwise, or too large to be useful)
+skipped_fields = ("children", "attachments", "linked_artifacts", "comments", "description", "artifact_type",
+                  "artifact_uri", "diagram", "diagram_image", "wrapped_resource_saved_as",
+                  "embedded_wrapped_resources_saved")
+
+# Work item type of artifacts without an artifact_type
+default_type = "requirement"
+
+# Link role of a child work item to its parent
+parent_role = "parent"
+
+# Statuses worth retrying; others fail the request at once
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+
+# Retry statuses of requests the server refused before handling them, so even a create can be resent
+UNHANDLED_STATUSES = (408, 429)
+
+# Module output files (any format / compression), not their shards or delta files
+_MODULE_FILE = re.compile(r"^(?!.*\.shard-[0-9a-f]{8}(-\d+)?\.)(?!.*\.delta\.json$)(?!delta\.manifest\.json$)"
+                          r".+\.(json|ndjson)(\.gz|\.zst)?$")
+
+# Attribute values sent as they are, alone or in a list
+_SCALARS = (str, int, float, bool)
+
+
+class PolarionError(Exception):
+    """A request failed for good (a non-retryable status, or out of retries)."""
+
+
+class OutcomeUnknown(PolarionError):
+    """A create request failed after it may have reached the server."""
+
+
+class RequestNotSent(OSError):
+    """No connection to the server could be opened, so the request was never sent."""
+
+
+class _NoResponse(ConnectionError):
+    """The connection failed before any byte of the response arrived."""
+
+
+def checkpoint_path(output_dir):
+    """The checkpoint journal sits next to the output folder, like the manifest."""
+    return os.path.normpath(output_dir) + ".import.jsonl"
+
+
+# ======================
+# HTTP
+# ======================
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one server, at most size of them in use at a time.
+
+    Create it inside the event loop that uses it.
+    """
+
+    def __init__(self, base_url, size=8, timeout=60.0, headers=None):
+        url = urllib.parse.urlsplit(base_url)
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise ValueError(f"Expected an http(s) URL, not {base_url!r}")
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if url.scheme == "https" else None
+        self.prefix = url.path.rstrip("/")
+        self.host_header = url.netloc
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(size)
+        self.idle = []  # (reader, writer) of open connections not in use
+        self.opened = self.requests = self.bytes_sent = self.stale = 0
+
+    async def request(self, method, path, body=b"", headers=None):
+        """(status, lower-cased headers, body) of one request; raises OSError / asyncio errors on failure.
+
+        An idle connection that fails before any byte of the response was
+        closed by the server while idle: the request is sent again on the
+        next one (a new connection at the latest).
+        """
+        async with self.semaphore:
+            while True:
+                reused = bool(self.idle)
+                connection = self.idle.pop() if reused else await self._open()
+                try:
+                    status, response_headers, data = await asyncio.wait_for(
+                        self._exchange(connection, method, path, body, headers), self.timeout)
+                except _NoResponse:
+                    connection[1].close()
+                    if not reused:
+                        raise
+                    self.stale += 1
+                    continue
+                except BaseException:
+                    connection[1].close()
+                    raise
+                break
+            self.requests += 1
+            self.bytes_sent += len(body)
+            if response_headers.get("connection", "").lower() == "close":
+                connection[1].close()
+            else:
+                self.idle.append(connection)
+            return status, response_headers, data
+
+    async def _open(self):
+        try:
+            connection = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, ssl=self.ssl), self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise RequestNotSent(f"{type(e).__name__}: {e}") from e
+        self.opened += 1
+        return connection
+
+    async def _exchange(self, connection, method, path, body, headers):
+        reader, writer = connection
+        lines = [f"{method} {self.prefix}{path} HTTP/1.1", f"Host: {self.host_header}",
+                 f"Content-Length: {len(body)}"]
+        lines.extend(f"{key}: {value}" for key, value in {**self.headers, **(headers or {})}.items())
+        try:
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if e.partial:
+                raise
+            raise _NoResponse("connection closed before the response") from e
+        except ConnectionError as e:
+            raise _NoResponse(f"{type(e).__name__}: {e}") from e
+        head = head.decode("latin-1").split("\r\n")
+        status = int(head[0].split(" ", 2)[1])
+        response_headers = {}
+        for line in head[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                response_headers[key.strip().lower()] = value.strip()
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            data = bytearray()
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b""):  # trailers
+                        pass
+                    break
+                data += await reader.readexactly(size)
+                await reader.readexactly(2)
+            data = bytes(data)
+        elif "content-length" in response_headers:
+            data = await reader.readexactly(int(response_headers["content-length"]))
+        elif method == "HEAD" or status in (204, 304) or status < 200:
+            data = b""
+        else:
+            data = await reader.read()
+            response_headers["connection"] = "close"
+        return status, response_headers, data
+
+    async def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle = []
+
+
+class PolarionClient:
+    """JSON:API calls against one Polarion project, retried with backoff."""
+
+    def __init__(self, pool, project, retries=5, backoff_sec=0.5, backoff_max_sec=30.0):
+        self.pool = pool
+        self.project_id = project
+        self.project = urllib.parse.quote(project, safe="")
+        self.retries = retries
+        self.backoff_sec = backoff_sec
+        self.backoff_max_sec = backoff_max_sec
+        self.retried = 0
+
+    async def call(self, method, path, document=None, body=None, content_type="application/json"):
+        """Parsed JSON response (None if empty) of a request to /projects/<project><path>.
+
+        A POST creates something, so it is only retried when it provably
+        never reached the server; other failures raise OutcomeUnknown at
+        once for the caller to look up what was created (see _create).
+        """
+        if document is not None:
+            body = json.dumps(document, ensure_ascii=False).encode("utf-8")
+        headers = {"Accept": "application/json"}
+        if body:
+            headers["Content-Type"] = content_type
+        path = f"/projects/{self.project}{path}"
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            try:
+                status, response_headers, data = await self.pool.request(method, path, body or b"", headers)
+            except RequestNotSent as e:
+                error = str(e)
+            except (OSError, EOFError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                    asyncio.TimeoutError) as e:
+                error = f"{type(e).__name__}: {e}"
+                if method == "POST":
+                    raise OutcomeUnknown(f"{method} {path} failed with {error}") from e
+            else:
+                if status < 300:
+                    return json.loads(data) if data.strip() else None
+                error = f"HTTP {status}: {data[:300].decode('utf-8', 'replace')}"
+                if status not in RETRY_STATUSES:
+                    raise PolarionError(f"{method} {path} failed with {error}")
+                if method == "POST" and status not in UNHANDLED_STATUSES:
+                    raise OutcomeUnknown(f"{method} {path} failed with {error}")
+                retry_after = response_headers.get("retry-after")
+            if attempt == self.retries:
+                break
+            self.retried += 1
+            await asyncio.sleep(self._delay(attempt, retry_after))
+        raise PolarionError(f"{method} {path} failed after {self.retries + 1} attempts: {error}")
+
+    def _delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return min(self.backoff_max_sec, self.backoff_sec * 2 ** attempt) * (0.5 + random.random() / 2)
+
+    async def _create(self, send, find_missing, lookup_first=False):
+        """Run send(), a create request; after an OutcomeUnknown failure, await find_missing()
+        (which looks up what the failed request created and returns whether anything is left)
+        and send() the rest again, up to retries times. lookup_first looks up before the first send.
+        """
+        if lookup_first and not await find_missing():
+            return None
+        for attempt in range(self.retries + 1):
+            try:
+                return await send()
+            except OutcomeUnknown:
+                if attempt == self.retries:
+                    raise
+            self.retried += 1
+            await asyncio.sleep(self._delay(attempt))
+            if not await find_missing():
+                return None
+
+    async def create_work_items(self, resources, lookup_first=False):
+        """Short ids ("WI-12") of the created work items, in the order of resources."""
+        ids = [None] * len(resources)
+        legacy_ids = [str(resource["attributes"].get("legacyID")) for resource in resources]
+
+        async def send():
+            todo = [i for i, work_item in enumerate(ids) if work_item is None]
+            response = await self.call("POST", "/workitems", {"data": [resources[i] for i in todo]})
+            created = [item["id"].rsplit("/", 1)[-1] for item in (response or {}).get("data", ())]
+            if len(created) != len(todo):
+                raise PolarionError(f"Created {len(created)} of {len(todo)} work items")
+            for i, work_item in zip(todo, created):
+                ids[i] = work_item
+
+        async def find_missing():
+            found = await self.find_work_items([legacy_ids[i] for i, work_item in enumerate(ids) if work_item is None])
+            for i, legacy_id in enumerate(legacy_ids):
+                ids[i] = ids[i] or found.get(legacy_id)
+            return None in ids
+
+        await self._create(send, find_missing, lookup_first)
+        return ids
+
+    async def find_work_items(self, legacy_ids):
+        """legacyID -> short id of the project's work items with one of legacy_ids."""
+        terms = " OR ".join('"' + legacy_id.replace("\\", "\\\\").replace('"', '\\"') + '"'
+                            for legacy_id in legacy_ids)
+        query = urllib.parse.urlencode({"query": f"legacyID:({terms})", "fields[workitems]": "legacyID",
+                                        "page[size]": len(legacy_ids)})
+        response = await self.call("GET", f"/workitems?{query}")
+        found = {}
+        for item in (response or {}).get("data", ()):
+            legacy_id = str((item.get("attributes") or {}).get("legacyID"))
+            found.setdefault(legacy_id, item["id"].rsplit("/", 1)[-1])
+        return found
+
+    async def upload_attachment(self, work_item, file_name, title, mime_type, content, lookup_first=False):
+        boundary = uuid.uuid4().hex
+        resource = json.dumps({"data": [{"type": "workitem_attachments",
+                                         "attributes": {"fileName": file_name, "title": title}}]})
+        body = b"".join([
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"resource\"\r\n"
+            f"Content-Type: application/json\r\n\r\n{resource}\r\n".encode("utf-8"),
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"files\"; filename=\"{file_name}\"\r\n"
+            f"Content-Type: {mime_type}\r\n\r\n".encode("utf-8"),
+            content,
+            f"\r\n--{boundary}--\r\n".encode("ascii"),
+        ])
+
+        async def send():
+            return await self.call("POST", f"/workitems/{work_item}/attachments", body=body,
+                                   content_type=f"multipart/form-data; boundary={boundary}")
+
+        async def find_missing():
+            response = await self.call("GET", f"/workitems/{work_item}/attachments")
+            return not any((item.get("attributes") or {}).get("fileName") == file_name
+                           and item["attributes"].get("title") == title for item in (response or {}).get("data", ()))
+
+        return await self._create(send, find_missing, lookup_first)
+
+    async def create_links(self, work_item, links, lookup_first=False):
+        """links are (role, target short id) pairs from work_item."""
+        todo = list(links)
+
+        async def send():
+            resources = [{"type": "linkedworkitems", "attributes": {"role": role},
+                          "relationships": {"workItem": {"data": {"type": "workitems",
+                                                                  "id": f"{self.project_id}/{target}"}}}}
+                         for role, target in todo]
+            return await self.call("POST", f"/workitems/{work_item}/linkedworkitems", {"data": resources})
+
+        async def find_missing():
+            response = await self.call("GET", f"/workitems/{work_item}/linkedworkitems")
+            existing = {((item.get("attributes") or {}).get("role"),
+                         item["relationships"]["workItem"]["data"]["id"].rsplit("/", 1)[-1])
+                        for item in (response or {}).get("data", ())}
+            todo[:] = [link for link in todo if link not in existing]
+            return bool(todo)
+
+        return await self._create(send, find_missing, lookup_first)
+
+
+# ======================
+# IMPORT
+# ======================
+def module_files(output_dir):
+    """Module output files of a folder in name order (shards are read through their header)."""
+    return sorted(filename for filename in os.listdir(output_dir)
+                  if _MODULE_FILE.match(filename) and os.path.isfile(os.path.join(output_dir, filename)))
+
+
+def work_item_resource(artifact, dropped=None):
+    """JSON:API resource creating an artifact's work item.
+
+    Scalar fields become attributes, and so do lists of scalars (multi-value
+    enums like responsibleGroup). Other non-empty fields cannot be sent; they
+    are counted per field name in dropped, if given.
+    """
+    attributes = {}
+    for key, value in artifact.items():
+        if key in skipped_fields or value is None or value == "" or value == []:
+            continue
+        if isinstance(value, _SCALARS) or (isinstance(value, list)
+                                           and all(isinstance(item, _SCALARS) for item in value)):
+            attributes[key] = value
+        elif dropped is not None:
+            dropped[key] = dropped.get(key, 0) + 1
+    attributes["type"] = artifact.get("artifact_type") or default_type
+    attributes["title"] = artifact.get("title") or str(artifact.get("legacyID", ""))
+    if artifact.get("description"):
+        attributes["description"] = {"type": "text/html", "value": artifact["description"]}
+    return {"type": "workitems", "attributes": attributes}
+
+
+class Checkpoint:
+    """Append-only journal of the completed import requests (see the module docstring)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.work_items = {}  # legacyID -> work item short id
+        self.attachments = set()  # "<work item>|<content key>"
+        self.links = set()  # "<work item>|<role>|<target work item>"
+        self.uncertain = set()  # legacyIDs and attachment / link keys of creates that may have been sent
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:  # torn last line of a killed run
+                        continue
+                    if "legacyID" in record:
+                        self.work_items[record["legacyID"]] = record["id"]
+                    elif "attachment" in record:
+                        self.attachments.add(record["attachment"])
+                    elif "link" in record:
+                        self.links.add(record["link"])
+                    elif "uncertain" in record:
+                        self.uncertain.update(record["uncertain"])
+        self.resumed = {"work_items": len(self.work_items), "attachments": len(self.attachments),
+                        "links": len(self.links)}
+        self.file = open(path, "a", encoding="utf-8")
+
+    def record(self, records):
+        self.file.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+        self.file.flush()
+
+    async def create(self, keys, create):
+        """Await create(lookup_first), journaling keys as uncertain if it fails after it may have been sent."""
+        try:
+            return await create(not self.uncertain.isdisjoint(keys))
+        except OutcomeUnknown:
+            self.uncertain.update(keys)
+            self.record([{"uncertain": list(keys)}])
+            raise
+
+    def close(self):
+        self.file.close()
+
+
+class BulkImporter:
+    """Imports the modules of one output folder; see import_output."""
+
+    def __init__(self, client, checkpoint, batch_size=50, attachment_roots=(), concurrency=8, on_progress=None):
+        self.client = client
+        self.checkpoint = checkpoint
+        self.batch_size = batch_size
+        self.attachment_roots = attachment_roots
+        self.concurrency = concurrency
+        self.on_progress = on_progress or (lambda phase, done, total: None)
+        self.pending_attachments = {}  # legacyID -> [attachment entry]
+        self.pending_links = {}  # legacyID -> [(role, target legacyID)]
+        self.counts = {"modules": 0, "work_items": 0, "shared": 0, "batches": 0, "attachments": 0,
+                       "attachments_deduplicated": 0, "attachments_missing": 0, "attachment_bytes": 0,
+                       "links": 0, "links_unresolved": 0, "link_requests": 0}
+        self.dropped_fields = {}  # artifact field -> work items it could not be sent with
+        self.phase_sec = {}
+
+    async def _run_all(self, jobs, phase, total):
+        """Run the coroutine functions of an iterable, a few ahead of the pool's free connections.
+
+        After a failure no new jobs start, but the ones in flight are let
+        finish (and journaled), so a rerun does not send them again.
+        """
+        pending, done, error = set(), 0, None
+
+        async def collect(return_when):
+            nonlocal pending, done, error
+            finished, pending = await asyncio.wait(pending, return_when=return_when)
+            for task in finished:
+                if task.exception() is None:
+                    done += task.result()
+                elif error is None:
+                    error = task.exception()
+            self.on_progress(phase, done, total)
+
+        for job in jobs:
+            if len(pending) >= self.concurrency * 2:
+                await collect(asyncio.FIRST_COMPLETED)
+            if error is not None:
+                break
+            pending.add(asyncio.ensure_future(job()))
+        if pending:
+            await collect(asyncio.ALL_COMPLETED)
+        if error is not None:
+            raise error
+
+    # --- work items ---
+    def _work_item_batches(self, output_dir, filenames):
+        seen = set(self.checkpoint.work_items)
+        batch = []
+        for filename in filenames:
+            self.counts["modules"] += 1
+            stack = [(artifact, None) for artifact in reversed(read_output_artifacts(
+                os.path.join(output_dir, filename)) or [])]
+            while stack:
+                artifact, parent = stack.pop()
+                legacy_id = artifact.get("legacyID")
+                if legacy_id is None:
+                    continue
+                legacy_id = str(legacy_id)
+                children = artifact.get("children")
+                if isinstance(children, list):
+                    stack.extend((child, legacy_id) for child in reversed(children))
+                if legacy_id in self.pending_links:  # shared by several modules: one work item
+                    self.counts["shared"] += 1
+                    continue
+                links = [(parent_role, parent)] if parent is not None else []
+                for link in artifact.get("linked_artifacts") or ():
+                    if isinstance(link, dict) and link.get("legacyID") is not None \
+                            and link.get("direction") != "incoming":
+                        links.append((link.get("link_role") or "relates_to", str(link["legacyID"])))
+                self.pending_links[legacy_id] = links
+                if artifact.get("attachments"):
+                    self.pending_attachments[legacy_id] = artifact["attachments"]
+                if legacy_id in seen:
+                    continue
+                seen.add(legacy_id)
+                batch.append((legacy_id, work_item_resource(artifact, self.dropped_fields)))
+                if len(batch) >= self.batch_size:
+                    yield self._create_batch(batch)
+                    batch = []
+        if batch:
+            yield self._create_batch(batch)
+
+    def _create_batch(self, batch):
+        async def create():
+            ids = await self.checkpoint.create(
+                [legacy_id for legacy_id, _ in batch],
+                lambda lookup_first: self.client.create_work_items([resource for _, resource in batch], lookup_first))
+            records = [{"legacyID": legacy_id, "id": work_item} for (legacy_id, _), work_item in zip(batch, ids)]
+            self.checkpoint.work_items.update((record["legacyID"], record["id"]) for record in records)
+            self.checkpoint.record(records)
+            self.counts["work_items"] += len(batch)
+            self.counts["batches"] += 1
+            return len(batch)
+        return create
+
+    # --- attachments ---
+    def _resolve(self, file_path):
+        for root in self.attachment_roots:
+            path = file_path if os.path.isabs(file_path) else source_path(root, file_path)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def _attachment_jobs(self):
+        for legacy_id, entries in self.pending_attachments.items():
+            work_item = self.checkpoint.work_items.get(legacy_id)
+            if work_item is None:
+                continue
+            uploads = {}
+            for entry in entries:
+                file_path = entry.get("file_path") or ""
+                path = self._resolve(file_path)
+                if path is None:
+                    self.counts["attachments_missing"] += 1
+                    continue
+                key = f"{work_item}|{entry.get('content_hash') or os.path.abspath(path)}"
+                if key in uploads:
+                    self.counts["attachments_deduplicated"] += 1
+                    continue
+                if key in self.checkpoint.attachments:
+                    continue
+                uploads[key] = (path, entry)
+            for key, (path, entry) in uploads.items():
+                yield self._upload(key, work_item, path, entry)
+
+    def _upload(self, key, work_item, path, entry):
+        async def upload():
+            loop = asyncio.get_running_loop()
+            content = await loop.run_in_executor(None, _read_file, path)
+            file_name = os.path.basename(path)
+            if entry.get("file_name_in_polarion"):
+                # the exported name, with the blob's extension
+                file_name = entry["file_name_in_polarion"].replace("\\", "/").rsplit("/", 1)[-1] \
+                    + os.path.splitext(path)[1]
+            mime_type = entry.get("mime_type") or mimetypes.guess_type(path)[0] or "application/octet-stream"
+            await self.checkpoint.create([key], lambda lookup_first: self.client.upload_attachment(
+                work_item, file_name, entry.get("title") or file_name, mime_type, content, lookup_first))
+            self.checkpoint.attachments.add(key)
+            self.checkpoint.record([{"attachment": key}])
+            self.counts["attachments"] += 1
+            self.counts["attachment_bytes"] += len(content)
+            return 1
+        return upload
+
+    # --- links ---
+    def _link_jobs(self):
+        work_items = self.checkpoint.work_items
+        for legacy_id, links in self.pending_links.items():
+            work_item = work_items.get(legacy_id)
+            if work_item is None:
+                continue
+            todo = {}
+            for role, target in links:
+                target_item = work_items.get(target)
+                if target_item is None:
+                    self.counts["links_unresolved"] += 1
+                    continue
+                key = f"{work_item}|{role}|{target_item}"
+                if key not in self.checkpoint.links:
+                    todo[key] = (role, target_item)
+            if todo:
+                yield self._link(work_item, todo)
+
+    def _link(self, work_item, todo):
+        async def link():
+            await self.checkpoint.create(list(todo), lambda lookup_first: self.client.create_links(
+                work_item, list(todo.values()), lookup_first))
+            self.checkpoint.links.update(todo)
+            self.checkpoint.record([{"link": key} for key in todo])
+            self.counts["links"] += len(todo)
+            self.counts["link_requests"] += 1
+            return len(todo)
+        return link
+
+    async def run(self, output_dir):
+        filenames = module_files(output_dir)
+        for phase, jobs, total in (
+                ("work_items", lambda: self._work_item_batches(output_dir, filenames), None),
+                ("attachments", self._attachment_jobs,
+                 lambda: sum(len(entries) for entries in self.pending_attachments.values())),
+                ("links", self._link_jobs, lambda: sum(len(links) for links in self.pending_links.values()))):
+            start = time.perf_counter()
+            await self._run_all(jobs(), phase, total() if total else None)
+            self.phase_sec[phase] = round(time.perf_counter() - start, 3)
+
+
+def _read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+async def import_output(output_dir, base_url, project, token=None, checkpoint=None, concurrency=8, batch_size=50,
+                        attachment_roots=None, retries=5, backoff_sec=0.5, timeout=60.0, on_progress=None):
+    """Coroutine of import_directory, for callers with their own event loop."""
+    if concurrency < 1 or batch_size < 1:
+        raise ValueError("concurrency and batch_size must be at least 1")
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    pool = ConnectionPool(base_url, concurrency, timeout, headers)
+    client = PolarionClient(pool, project, retries, backoff_sec)
+    journal = Checkpoint(checkpoint or checkpoint_path(output_dir))
+    roots = [output_dir] + list(attachment_roots or ())
+    importer = BulkImporter(client, journal, batch_size, roots, concurrency, on_progress)
+    wall_start = time.time()
+    try:
+        await importer.run(output_dir)
+    finally:
+        journal.close()
+        await pool.close()
+    wall_sec = round(time.time() - wall_start, 2)
+    summary = {
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(wall_start)),
+        "wall_sec": wall_sec,
+        "concurrency": concurrency,
+        "batch_size": batch_size,
+        **importer.counts,
+        "dropped_fields": importer.dropped_fields,
+        "resumed": journal.resumed,
+        "requests": pool.requests,
+        "retries": client.retried,
+        "connections": pool.opened,
+        "stale_connections": pool.stale,
+        "bytes_sent": pool.bytes_sent,
+        "phase_sec": importer.phase_sec,
+        "work_items_per_sec": round(importer.counts["work_items"] / importer.phase_sec["work_items"], 1)
+        if importer.phase_sec.get("work_items") else None,
+        "checkpoint": journal.path,
+    }
+    return summary
+
+
+def import_directory(output_dir, base_url, project, token=None, checkpoint=None, concurrency=8, batch_size=50,
+                     attachment_roots=None, retries=5, backoff_sec=0.5, timeout=60.0, on_progress=None):
+    """Import every module of a transform output folder into a Polarion project and return the summary.
+
+    base_url is the REST API root (.../polarion/rest/v1) and token a
+    personal access token. Attachment file paths are looked up in
+    output_dir (rendered diagrams), then in attachment_roots (the staging
+    folder for staged attachments, else the export folder). checkpoint is
+    the journal to resume from and append to (default: <output_dir>.import.jsonl).
+    on_progress is called with (phase, items done, items in phase or None).
+    Raises PolarionError when a request fails for good; rerun to resume.
+    """
+    return asyncio.run(import_output(output_dir, base_url, project, token, checkpoint, concurrency, batch_size,
+                                     attachment_roots, retries, backoff_sec, timeout, on_progress))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import transformed modules into Polarion over its REST API.")
+    parser.add_argument("output", help="folder of transformed modules (the transform's --output)")
+    parser.add_argument("--url", required=True, help="Polarion REST API root, e.g. https://host/polarion/rest/v1")
+    parser.add_argument("--project", required=True, help="Polarion project id")
+    parser.add_argument("--token", default=os.environ.get("POLARION_TOKEN"),
+                        help="personal access token (default: $POLARION_TOKEN)")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="pooled connections / requests in flight (default: 8)")
+    parser.add_argument("--batch-size", type=int, default=50, help="work items per create request (default: 50)")
+    parser.add_argument("--attachments-root", action="append", default=[], metavar="DIR",
+                        help="folder attachment file paths are relative to (the staging or export folder); "
+                             "may be repeated")
+    parser.add_argument("--retries", type=int, default=5, help="retries per request (default: 5)")
+    parser.add_argument("--checkpoint", metavar="PATH", help="checkpoint journal (default: <output>.import.jsonl)")
+    args = parser.parse_args(argv)
+
+    last = {}
+
+    def on_progress(phase, done, total):
+        now = time.time()
+        if now - last.get(phase, 0) >= 1 or done == total:
+            last[phase] = now
+            print(f"⏳ {phase}: {done}" + (f" / {total}" if total else ""))
+
+    try:
+        summary = import_directory(args.output, args.url, args.project, args.token, args.checkpoint,
+                                   args.concurrency, args.batch_size, args.attachments_root, args.retries,
+                                   on_progress=on_progress)
+    except (ValueError, OSError) as e:
+        print(f"❌ {e}")
+        return 2
+    except PolarionError as e:
+        print(f"❌ {e}\n   Rerun to resume from {args.checkpoint or checkpoint_path(args.output)}")
+        return 1
+    resumed = summary["resumed"]
+    print(f"\n Summary: {summary['work_items']} work items in {summary['batches']} batches"
+          f" | {summary['attachments']} attachments | {summary['links']} links | {summary['wall_sec']} sec wall"
+          f" | {summary['work_items_per_sec']} work items/sec")
+    print(f" Requests: {summary['requests']} over {summary['connections']} connection(s) | {summary['retries']} retries"
+          f" | {summary['stale_connections']} closed while idle | {summary['bytes_sent'] / 1e6:.2f} MB sent")
+    print(f" Skipped: {summary['shared']} shared work items | {summary['attachments_deduplicated']} duplicate"
+          f" attachments | {summary['attachments_missing']} missing files | {summary['links_unresolved']}"
+          f" unresolved links")
+    if summary["dropped_fields"]:
+        print(" Fields not sent: " + ", ".join(f"{field} ({count} work items)"
+                                               for field, count in sorted(summary["dropped_fields"].items())))
+    if any(resumed.values()):
+        print(f" Resumed: {resumed['work_items']} work items | {resumed['attachments']} attachments"
+              f" | {resumed['links']} links from {summary['checkpoint']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
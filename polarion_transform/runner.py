@@ -0,0 +1,358 @@
+"""Per-module processing, the worker pool and run reports."""
+import csv
+import json
+import os
+import time
+from collections import Counter
+
+from . import metrics, transform
+from .adapters import iter_module, read_module
+from .attachments import get_stager
+from .cache import cache_stats
+from .compact import compact
+from .diagram_files import get_diagram_files
+from .link_index import LinkResolver, open_link_index
+from .manifest import ArtifactReuse, file_hash, load_previous_artifacts
+from .metrics import Metrics, peak_rss_mb, timed
+from .output import get_serializer, module_writer, open_output, write_module
+from .sharding import ShardedModuleWriter, shard_paths
+from .streaming import transform_fields_stream
+from .transform import new_artifact_stats, transform_json
+from .validation import Validator, get_schema
+
+# Number of slowest artifacts listed per module and per run in the metrics report
+slowest_artifacts = 10
+
+
+def process_file(input_path, output_path, reuse_hashes=None, stream=False, collect_metrics=False,
+                 profile_dir=None, compact_svg=None, output_format="json", mappings=None, link_index=None,
+                 stage_attachments=None, attachments_root=None, compression="none", compression_level=None,
+                 serializer="auto", compact_model=False, stages=None, schema=None, shard_items=None,
+                 shard_bytes=None, diagram_attachments=False, inline_diagram_max=None):
+    """Transform one module file and write its output.
+
+    Runs in the parent or in a pool worker, so it never raises: failures are
+    reported back in the returned dict together with the per-module counts.
+    input_path is read by the input adapter for its extension (DNG JSON,
+    ReqIF or CSV; see adapters.py).
+    reuse_hashes are the manifest's artifact hashes for the existing output
+    file (None or empty when it cannot be reused); matching top-level
+    artifacts are copied from it (non-streaming only). The hashes of the
+    artifacts written are always recorded in the manifest entry.
+    collect_metrics adds a per-stage "metrics" report to the result and
+    profile_dir dumps a cProfile of the module to <profile_dir>/<file>.prof.
+    compact_svg, if given, sets compact_diagrams while the module runs.
+    diagram_attachments writes rendered diagrams over inline_diagram_max
+    bytes as SVG files into wrapped_resources next to output_path (see
+    diagram_files.py); the result and manifest entry then get a "diagrams"
+    report.
+    output_format, compression and serializer are one of output.OUTPUT_FORMATS,
+    COMPRESSIONS and SERIALIZERS; compression_level overrides the codec's
+    default. mappings, if given, is the mapping config the module is transformed with.
+    shard_items / shard_bytes split the artifacts into shards of at most that
+    many work items / bytes (see sharding.py); output_path is then the
+    module's header and the result and manifest entry list the "shards".
+    compact_model keeps the parsed and transformed artifacts as compact
+    records (see compact.py) instead of dicts; it has no effect when streaming
+    or on ReqIF and CSV input, whose artifacts are lazily decoded records.
+    stages, if given, is the pipeline stage selection to run (see
+    pipeline.py); with the validate stage the output is checked
+    against schema (default: the packaged schema.json) and the result gets
+    a "validation" report (also kept in its manifest entry).
+    link_index is the path of an index from link_index.build_link_index;
+    links are then resolved against it and the result gets a "links" report
+    (likewise kept in the manifest entry).
+    stage_attachments is a staging folder for the attachment files, read
+    from attachments_root (default: the input file's folder); the result then
+    gets an "attachments" report, likewise kept in the manifest entry.
+    The transform module's settings are restored when it returns.
+    """
+    try:
+        with transform.configured(compact_svg, mappings, stages):
+            return _run_module(input_path, output_path, reuse_hashes, stream, collect_metrics, profile_dir,
+                               output_format, link_index, stage_attachments, attachments_root, compression,
+                               compression_level, serializer, compact_model, schema, shard_items, shard_bytes,
+                               diagram_attachments, inline_diagram_max)
+    except (OSError, ValueError) as e:
+        # _run_module never raises, so the mapping config or the stage selection could not be loaded
+        filename = os.path.basename(input_path)
+        return {"filename": filename, "error": f"Error loading the mappings or stages for {filename}: {e}"}
+
+
+def _run_module(input_path, output_path, reuse_hashes, stream, collect_metrics, profile_dir, output_format,
+                link_index, stage_attachments, attachments_root, compression, compression_level, serializer,
+                compact_model, schema, shard_items, shard_bytes, diagram_attachments, inline_diagram_max):
+    resolver = None
+    if link_index:
+        try:
+            resolver = LinkResolver(open_link_index(link_index))
+        except (OSError, ValueError) as e:
+            filename = os.path.basename(input_path)
+            return {"filename": filename, "error": f"Error opening link index for {filename}: {e}"}
+    validator = None
+    if {"map_fields", "validate"} <= transform.stages:
+        try:
+            validator = Validator(get_schema(schema, transform.field_mapping))
+        except (OSError, ValueError, KeyError) as e:
+            filename = os.path.basename(input_path)
+            return {"filename": filename, "error": f"Error loading the schema for {filename}: {e}"}
+    stager = None
+    if stage_attachments:
+        try:
+            stager = get_stager(attachments_root or os.path.dirname(os.path.abspath(input_path)),
+                                stage_attachments)
+            stager.begin_module()
+        except Exception as e:
+            filename = os.path.basename(input_path)
+            return {"filename": filename, "error": f"Error opening the attachment staging for {filename}: {e}"}
+    diagrams = None
+    if diagram_attachments and {"map_fields", "render_diagrams"} <= transform.stages:
+        try:
+            diagrams = get_diagram_files(os.path.dirname(os.path.abspath(output_path)), inline_diagram_max)
+            diagrams.begin_module()
+        except Exception as e:
+            filename = os.path.basename(input_path)
+            return {"filename": filename, "error": f"Error opening the diagram folder for {filename}: {e}"}
+    profiler = None
+    if profile_dir:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    metrics.current = Metrics(slowest_artifacts) if collect_metrics else None
+    try:
+        with transform.configured(link_resolver=resolver, attachment_stager=stager,
+                                  artifact_stats=new_artifact_stats(), validator=validator, diagram_files=diagrams):
+            result = _process_file(input_path, output_path, reuse_hashes, stream,
+                                   (output_format, compression, compression_level, get_serializer(serializer),
+                                    (shard_items, shard_bytes) if shard_items or shard_bytes else None),
+                                   compact_model)
+    finally:
+        module_metrics, metrics.current = metrics.current, None
+        if profiler is not None:
+            profiler.disable()
+    if profiler is not None:
+        try:
+            os.makedirs(profile_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(profile_dir, os.path.basename(input_path) + ".prof"))
+        except OSError as e:
+            filename = os.path.basename(input_path)
+            return {"filename": filename, "error": f"Error writing the profile of {filename}: {e}"}
+    if module_metrics is not None and "error" not in result:
+        report = module_metrics.report()
+        try:
+            report["bytes_read"] = os.path.getsize(input_path)
+            report["bytes_written"] = os.path.getsize(output_path) + sum(
+                os.path.getsize(os.path.join(os.path.dirname(output_path), shard["file"]))
+                for shard in result["manifest"].get("shards", ()))
+        except OSError as e:
+            filename = result["filename"]
+            return {"filename": filename, "error": f"Error measuring the output of {filename}: {e}"}
+        report["peak_rss_mb"] = peak_rss_mb()
+        result["metrics"] = report
+    if resolver is not None and "error" not in result:
+        result["links"] = result["manifest"]["links"] = resolver.report()
+    if stager is not None and "error" not in result:
+        result["attachments"] = result["manifest"]["attachments"] = stager.module_report()
+    if diagrams is not None and "error" not in result:
+        result["diagrams"] = result["manifest"]["diagrams"] = diagrams.module_report()
+    if validator is not None and "error" not in result:
+        result["validation"] = result["manifest"]["validation"] = validator.report()
+    return result
+
+
+def _flushing_transform(artifact_transform, stager):
+    """Streaming writes each top-level artifact right away, so its attachments are completed first."""
+    def transform_and_flush(artifact):
+        transformed = artifact_transform(artifact)
+        timed("stage_attachments", stager.flush)
+        return transformed
+    return transform_and_flush
+
+
+def _compacting_transform(artifact_transform):
+    """Top-level artifacts are kept compact once transformed (their attachments must be staged by then)."""
+    def transform_and_compact(artifact):
+        return compact(artifact_transform(artifact))
+    return transform_and_compact
+
+
+def _open_writer(output_path, output):
+    output_format, compression, level, serializer, shard_limits = output
+    if shard_limits:
+        writer = ShardedModuleWriter(output_path, output_format, compression, level, serializer, *shard_limits)
+        return writer, writer
+    outfile = open_output(output_path, compression, level)
+    return outfile, module_writer(outfile, output_format, serializer)
+
+
+def _remove_output(output_path, output):
+    """Delete a module's partly written output (and its shards) so it is never imported or reused."""
+    output_format, compression, _, _, shard_limits = output
+    paths = [output_path, *(shard_paths(output_path, output_format, compression) if shard_limits else ())]
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # already gone, or the write error is reported anyway
+
+
+def _process_file(input_path, output_path, reuse_hashes, stream, output, compact_model=False):
+    filename = os.path.basename(input_path)
+    start_time = time.time()
+    cache_before = cache_stats()
+    reuse = ArtifactReuse()
+    stager = transform.attachment_stager
+    try:
+        input_hash = file_hash(input_path)
+    except Exception as e:
+        return {"filename": filename, "error": f"Error reading {filename}: {e}"}
+    if stream:
+        artifact_transform = reuse if stager is None else _flushing_transform(reuse, stager)
+        try:
+            outfile, writer = _open_writer(output_path, output)
+            with outfile:
+                transformed = timed(
+                    "stream", transform_fields_stream, iter_module(input_path), writer, artifact_transform)
+        except Exception as e:
+            _remove_output(output_path, output)
+            return {"filename": filename, "error": f"Error streaming {filename}: {e}"}
+    else:
+        try:
+            data = timed("parse", read_module, input_path, compact_model)
+        except Exception as e:
+            return {"filename": filename, "error": f"Error reading {filename}: {e}"}
+        if reuse_hashes:
+            reuse.previous = load_previous_artifacts(output_path, reuse_hashes)
+        artifact_transform = reuse
+        if compact_model:
+            if stager is not None:
+                artifact_transform = _flushing_transform(artifact_transform, stager)
+            artifact_transform = _compacting_transform(artifact_transform)
+        try:
+            transformed = timed("transform", transform_json, data, artifact_transform)
+        except Exception as e:
+            return {"filename": filename, "error": f"Error transforming {filename}: {e}"}
+        if stager is not None:
+            try:
+                timed("stage_attachments", stager.flush)
+            except Exception as e:
+                return {"filename": filename, "error": f"Error staging the attachments of {filename}: {e}"}
+        try:
+            outfile, writer = _open_writer(output_path, output)
+            with outfile:
+                timed("serialize", write_module, transformed, writer)
+        except Exception as e:
+            _remove_output(output_path, output)
+            return {"filename": filename, "error": f"Error writing {filename}: {e}"}
+    try:
+        output_hash = file_hash(output_path)
+    except OSError as e:
+        return {"filename": filename, "error": f"Error reading back {filename}: {e}"}
+    stats = transform.artifact_stats.report()
+    artifacts_count = stats["artifacts"]
+    result = {
+        "filename": filename,
+        "module_title": transformed.get("module_title", "Unknown Title"),
+        "artifacts_count": artifacts_count,
+        "elapsed_time": round(time.time() - start_time, 2),
+        "cache": {
+            name: {k: v - cache_before[name][k] for k, v in counts.items()}
+            for name, counts in cache_stats().items()
+        },
+        "reused": reuse.reused,
+        "stats": stats,
+        "manifest": {
+            "input_hash": input_hash,
+            "output_hash": output_hash,
+            "module_title": transformed.get("module_title", "Unknown Title"),
+            "artifacts_count": artifacts_count,
+            "artifact_hashes": reuse.hashes,
+            "stats": stats,
+        },
+    }
+    if isinstance(writer, ShardedModuleWriter):
+        result["shards"] = len(writer.shards)
+        result["manifest"]["shards"] = [{"file": shard["file"], "hash": shard["hash"]} for shard in writer.shards]
+    return result
+
+
+def run_modules(jobs, workers=1, task=process_file, **options):
+    """Yield process_file results, sequentially or fanned out over a process pool.
+
+    jobs are (input_path, output_path, reuse_hashes) tuples; options are passed
+    on to process_file. task replaces process_file with another per-module
+    function that never raises (e.g. delta.delta_file), called with the job
+    tuple's items followed by options.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield task(*job, **options)
+        return
+    # Only the parent of a pool needs these; keeps worker and library imports light
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(task, *job, **options): job[0] for job in jobs}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                # Worker died (e.g. killed or out of memory) before returning a result
+                filename = os.path.basename(futures[future])
+                yield {"filename": filename, "error": f"Error processing {filename}: {e}"}
+
+
+def write_metrics_report(path, run, modules):
+    """Write the run report as JSON, or one row per module as CSV if path ends in .csv."""
+    if path.lower().endswith(".csv"):
+        stage_names = sorted({name for module in modules for name in module["metrics"]["stages"]})
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["filename", "module_title", "work_items", "elapsed_sec", "bytes_read",
+                             "bytes_written", "peak_rss_mb", *[f"{name}_sec" for name in stage_names],
+                             "slowest_artifact"])
+            for module in modules:
+                report = module["metrics"]
+                slowest = report["slowest_artifacts"][0]["identifier"] if report["slowest_artifacts"] else ""
+                writer.writerow([module["filename"], module["module_title"], module["artifacts_count"],
+                                 module["elapsed_time"], report["bytes_read"], report["bytes_written"],
+                                 report["peak_rss_mb"], *[report["stages"].get(name, 0) for name in stage_names],
+                                 slowest])
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "run": run,
+            "modules": [
+                {
+                    "filename": module["filename"],
+                    "module_title": module["module_title"],
+                    "work_items": module["artifacts_count"],
+                    "elapsed_sec": module["elapsed_time"],
+                    **module["metrics"],
+                }
+                for module in modules
+            ],
+        }, f, indent=2, ensure_ascii=False)
+
+
+def summarize_metrics(modules):
+    """Run-level totals over the per-module metrics reports."""
+    stages, by_type, by_status = Counter(), Counter(), Counter()
+    slowest = []
+    for module in modules:
+        report = module["metrics"]
+        stages.update(report["stages"])
+        by_type.update(report["by_type"])
+        by_status.update(report["by_status"])
+        slowest.extend({"module": module["filename"], **entry} for entry in report["slowest_artifacts"])
+    peaks = [m["metrics"]["peak_rss_mb"] for m in modules if m["metrics"]["peak_rss_mb"] is not None]
+    return {
+        "stages": {name: round(seconds, 6) for name, seconds in stages.items()},
+        "by_type": dict(by_type.most_common()),
+        "by_status": dict(by_status.most_common()),
+        "bytes_read": sum(m["metrics"]["bytes_read"] for m in modules),
+        "bytes_written": sum(m["metrics"]["bytes_written"] for m in modules),
+        "peak_rss_mb": max(peaks) if peaks else None,
+        "slowest_artifacts": sorted(slowest, key=lambda e: e["seconds"], reverse=True)[:slowest_artifacts],
+    }
@@ -0,0 +1,173 @@
+"""Sharded output: one module split into several files for a parallel import.
+
+With a shard limit (max work items and/or max bytes per shard) a module's
+top-level artifacts are written, whole subtrees at a time, to shard files
+next to the module's output file:
+
+    SPEC.json                  header: the module fields, with "shards" in
+                               place of "artifacts"
+    SPEC.shard-9f86d081.json   {"shard": {"module": "SPEC.json"},
+    SPEC.shard-2c26b46b.json    "artifacts": [...]}
+
+A shard is named after the legacyID of its first artifact, and its body
+holds nothing about its position. Shards have the module's output format and
+compression. The header lists them in document order with their index,
+offset (position of their first top-level artifact), artifact and work item
+counts, bytes and content hash, so an importer can load the shards in
+parallel and put the artifacts back in order; output.read_output_artifacts
+does exactly that. The header is written last, once every shard is complete.
+
+A shard is cut before an artifact that would take it over a limit, and
+also after an artifact whose legacyID hashes to a boundary once the shard
+is half full. Boundaries therefore depend on the artifacts themselves, not
+on their positions: a rerun of the same input writes the same shard files,
+so a failed shard import can be retried against them, and an edited, added
+or removed artifact usually only moves the boundaries of its own shard; the
+other shards keep their files byte for byte (only their index and offset in
+the header may shift).
+"""
+import glob
+import os
+import zlib
+
+from .manifest import file_hash
+from .output import module_writer, open_output, output_filename
+from .transform import count_artifacts
+
+# One legacyID in boundary_odds ends a half-full shard
+boundary_odds = 8
+
+
+def shard_filename(module_filename, key, output_format="json", compression="none"):
+    """File name of a module's shard; key is 8 hex digits (see shard_key)."""
+    extension = output_filename("", output_format, compression)
+    return f"{module_filename[:-len(extension)]}.shard-{key}{extension}"
+
+
+def shard_paths(output_path, output_format="json", compression="none"):
+    """Paths of the shard files in output_path's folder that belong to its module."""
+    pattern = shard_filename(glob.escape(os.path.basename(output_path)), "*", output_format, compression)
+    return glob.glob(os.path.join(os.path.dirname(output_path), pattern))
+
+
+def shard_key(artifact, encoded):
+    """Key of a shard starting with artifact: its legacyID's crc32, else that of its encoding."""
+    identifier = _identifier(artifact)
+    return f"{zlib.crc32(encoded if identifier is None else str(identifier).encode('utf-8')):08x}"
+
+
+def _identifier(artifact):
+    return artifact.get("legacyID", artifact.get("identifier"))
+
+
+def _is_boundary(artifact):
+    identifier = _identifier(artifact)
+    if identifier is None:
+        return False
+    return zlib.crc32(str(identifier).encode("utf-8")) % boundary_odds == 0
+
+
+class ShardedModuleWriter:
+    """Module writer (see output.module_writer) that writes the artifacts to shards and the rest to a header.
+
+    Also a context manager that closes an open shard if writing fails.
+    shards is the header's shard list once closed.
+    """
+
+    def __init__(self, output_path, output_format="json", compression="none", level=None, serializer=None,
+                 max_items=None, max_bytes=None):
+        if not max_items and not max_bytes:
+            raise ValueError("Sharding needs a work item or byte limit per shard")
+        self.output_path = output_path
+        self.output = (output_format, compression, level, serializer)
+        self.max_items = max_items or float("inf")
+        self.max_bytes = max_bytes or float("inf")
+        self.fields = []
+        self.shards = []
+        self.offset = 0
+        self.shard = None  # (outfile, writer, entry) of the open shard
+        # encodes artifacts exactly as every shard writer would
+        self.encoder = module_writer(_NullFile(), output_format, serializer)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.shard is not None:
+            self.shard[0].close()
+            self.shard = None
+
+    def field(self, key, value):
+        self.fields.append((key, value))
+
+    def begin_artifacts(self):
+        self.fields.append(("shards", None))
+
+    def artifact(self, artifact):
+        encoded = self.encoder.encode_artifact(artifact)
+        items = count_artifacts([artifact])
+        if self.shard is not None:
+            entry = self.shard[2]
+            if entry["work_items"] + items > self.max_items or entry["bytes"] + len(encoded) > self.max_bytes:
+                self._close_shard()
+        if self.shard is None:
+            self._open_shard(shard_key(artifact, encoded))
+        outfile, writer, entry = self.shard
+        writer.artifact(artifact, encoded)
+        entry["artifacts"] += 1
+        entry["work_items"] += items
+        entry["bytes"] += len(encoded)
+        self.offset += 1
+        if (entry["work_items"] * 2 >= self.max_items or entry["bytes"] * 2 >= self.max_bytes) \
+                and _is_boundary(artifact):
+            self._close_shard()
+
+    def end_artifacts(self):
+        if self.shard is not None:
+            self._close_shard()
+
+    def _open_shard(self, key):
+        output_format, compression, level, serializer = self.output
+        filename = shard_filename(os.path.basename(self.output_path), key, output_format, compression)
+        taken = {entry["file"] for entry in self.shards}
+        suffix = 1
+        while filename in taken:  # two shards starting with the same legacyID (or the same unnamed artifact)
+            suffix += 1
+            filename = shard_filename(os.path.basename(self.output_path), f"{key}-{suffix}", output_format,
+                                      compression)
+        outfile = open_output(os.path.join(os.path.dirname(self.output_path), filename), compression, level)
+        writer = module_writer(outfile, output_format, serializer)
+        writer.field("shard", {"module": os.path.basename(self.output_path)})
+        writer.begin_artifacts()
+        self.shard = (outfile, writer, {"file": filename, "index": len(self.shards) + 1, "offset": self.offset,
+                                        "artifacts": 0, "work_items": 0, "bytes": 0})
+
+    def _close_shard(self):
+        outfile, writer, entry = self.shard
+        self.shard = None
+        with outfile:
+            writer.end_artifacts()
+            writer.close()
+        entry["hash"] = file_hash(os.path.join(os.path.dirname(self.output_path), entry["file"]))
+        self.shards.append(entry)
+
+    def close(self):
+        output_format, compression, level, serializer = self.output
+        with open_output(self.output_path, compression, level) as outfile:
+            writer = module_writer(outfile, output_format, serializer)
+            for key, value in self.fields:
+                writer.field(key, self.shards if key == "shards" else value)
+            writer.close()
+        self._remove_stale_shards()
+
+    def _remove_stale_shards(self):
+        """Shards left from an earlier run with more shards would still be picked up by a folder import."""
+        current = {entry["file"] for entry in self.shards}
+        for path in shard_paths(self.output_path, *self.output[:2]):
+            if os.path.basename(path) not in current:
+                os.remove(path)
+
+
+class _NullFile:
+    def write(self, data):
+        pass
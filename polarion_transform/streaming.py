@@ -0,0 +1,139 @@
+"""Incremental module reader / writer used by streaming mode."""
+import json
+import types
+
+from .transform import transform_artifact, transform_module_field
+
+# Characters read from the input per refill in streaming mode
+stream_chunk_size = 1 << 16
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE = " \t\n\r"
+_JSON_NUMBER_CHARS = "0123456789.eE+-"
+
+
+class JsonStreamReader:
+    """Incremental reader for one JSON document, holding only the unparsed tail in memory."""
+
+    def __init__(self, infile, chunk_size=None):
+        self.infile = infile
+        self.chunk_size = chunk_size or stream_chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size):
+        chunk = self.infile.read(size)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+        return bool(chunk)
+
+    def peek(self):
+        """Skip whitespace and return the next character ("" at end of input)."""
+        while True:
+            buffer, pos = self.buffer, self.pos
+            while pos < len(buffer) and buffer[pos] in _JSON_WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._fill(self.chunk_size):
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} but found {found or 'end of input'!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        read_size = self.chunk_size
+        while True:
+            try:
+                value, end = _JSON_DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Value continues past the buffer; read ahead in growing steps so
+                # a large artifact is re-scanned O(log n) times, not O(n)
+                if not self._fill(read_size):
+                    raise
+                read_size *= 2
+                continue
+            if (not self.eof and (end == len(self.buffer) or self.buffer[end] in _JSON_NUMBER_CHARS)
+                    and self._fill(self.chunk_size)):
+                continue  # a number may continue in the next chunk
+            self.pos = end
+            return value
+
+    def iter_array(self):
+        """Yield the items of the JSON array at the current position one at a time."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def iter_module_json(infile, chunk_size=None):
+    """Yield (key, value) for each top-level field of a module file.
+
+    The value of an "artifacts" array is a generator over its items, which must
+    be consumed (or is skipped) before the next field is read.
+    """
+    reader = JsonStreamReader(infile, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key == "artifacts" and reader.peek() == "[":
+            items = reader.iter_array()
+            yield key, items
+            for _ in items:
+                pass
+        else:
+            yield key, reader.value()
+        if reader.peek() == ",":
+            reader.pos += 1
+            continue
+        reader.expect("}")
+        return
+
+
+def transform_json_stream(infile, writer, chunk_size=None, artifact_transform=transform_artifact):
+    """Streaming transform_json: read a module from infile and write it through a module writer.
+
+    Top-level artifacts are transformed and written one at a time, so peak
+    memory follows the largest artifact subtree rather than the module size.
+    writer is an output.module_writer; the output is identical to writing
+    transform_json(data) with it. Returns the transformed module fields
+    (without artifacts); the artifacts are counted in transform.artifact_stats.
+    """
+    return transform_fields_stream(iter_module_json(infile, chunk_size), writer, artifact_transform)
+
+
+def transform_fields_stream(fields, writer, artifact_transform=transform_artifact):
+    """transform_json_stream over (key, value) module fields, e.g. from adapters.iter_module."""
+    header = {}
+    for key, value in fields:
+        if isinstance(value, types.GeneratorType):
+            writer.begin_artifacts()
+            for artifact in value:
+                writer.artifact(artifact_transform(artifact))
+            writer.end_artifacts()
+            continue
+        for new_key, new_value in transform_module_field(key, value, artifact_transform):
+            header[new_key] = new_value
+            writer.field(new_key, new_value)
+    writer.close()
+    return header
@@ -0,0 +1,313 @@
+"""DNG module / artifact -> Polarion import JSON transform."""
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from . import metrics
+from .cache import diagram_cache, html_cache
+from .html_cleaner import clean_source_html
+from .mappings import get_field_mapping
+from .metrics import timed
+from .pipeline import DEFAULT_STAGES, resolve_stages
+
+# Source fields the clean_source_html stage cleans
+SOURCE_HTML_FIELDS = ("primary_text_html", "primary_text_html_local")
+
+# Emit diagrams as compact SVG (rounded coordinates, shared <g> styles, shortest data URI)
+compact_diagrams = False
+
+# Compiled key / value mappings used by the transform (see mappings.py and configured)
+field_mapping = get_field_mapping()
+
+# LinkResolver of the module being transformed, None when links are not resolved (see link_index.py)
+link_resolver = None
+
+# AttachmentStager of the module being transformed, None when attachments are not staged (see attachments.py)
+attachment_stager = None
+
+# DiagramFiles of the module being transformed, None when diagrams stay inline (see diagram_files.py)
+diagram_files = None
+
+# Pipeline stages this process runs (see pipeline.py and configured)
+stages = frozenset(DEFAULT_STAGES)
+
+# Validator of the module being transformed, None when the validate stage is off (see validation.py)
+validator = None
+
+# ArtifactStats of the module being transformed, None outside process_file (see new_artifact_stats)
+artifact_stats = None
+
+
+@contextmanager
+def configured(compact_svg=None, mappings=None, stages=None, **state):
+    """Set the module-level settings above for a with block and restore the previous values after it.
+
+    compact_svg, mappings (a mapping config path) and stages (a pipeline stage
+    selection) replace compact_diagrams, field_mapping and stages when given;
+    state sets the per-module ones (link_resolver, validator, ...) by name.
+    """
+    names = globals()
+    unknown = sorted(set(state) - set(_MODULE_STATE))
+    if unknown:
+        raise TypeError(f"configured() got unknown settings {unknown}")
+    if compact_svg is not None:
+        state["compact_diagrams"] = compact_svg
+    if mappings is not None:
+        state["field_mapping"] = get_field_mapping(mappings)
+    if stages is not None:
+        state["stages"] = frozenset(resolve_stages(stages))
+    previous = {name: names[name] for name in state}
+    names.update(state)
+    try:
+        yield
+    finally:
+        names.update(previous)
+
+
+# Settings configured() sets by name
+_MODULE_STATE = ("link_resolver", "attachment_stager", "diagram_files", "validator", "artifact_stats")
+
+
+def use_mappings(path=None):
+    """Switch this process to the mapping config at path (None = the packaged default) until switched again.
+
+    For scripts and benchmarks; the library API scopes its settings with configured.
+    """
+    global field_mapping
+    field_mapping = get_field_mapping(path)
+    return field_mapping
+
+
+def use_stages(names=None):
+    """Switch this process to a stage selection (None = pipeline.DEFAULT_STAGES) until switched again."""
+    global stages
+    stages = frozenset(resolve_stages(names))
+    return stages
+
+
+def clean_source_fields(artifact):
+    """Copy of artifact with tx.py's cleanup applied to its primary text (the clean_source_html stage)."""
+    keys = [key for key in SOURCE_HTML_FIELDS if key in artifact]
+    if not keys:
+        return artifact
+    # LazyRecords copy without decoding their other fields
+    artifact = artifact.copy() if hasattr(artifact, "copy") else dict(artifact.items())
+    for key in keys:
+        artifact[key] = timed("clean_source_html", clean_source_html, artifact[key])
+    return artifact
+
+
+def transform_linked_artifact(link, source=None):
+    new_link = field_mapping.map_link(link)
+    if link_resolver is not None:
+        target = link_resolver.resolve(source, link.get("identifier"), new_link.get("link_role"))
+        if target is not None:
+            new_link["target"] = target
+    return new_link
+
+
+def transform_linked_artifacts(links, source=None):
+    return [transform_linked_artifact(l, source) for l in links]
+
+
+def artifact_attachments(artifact):
+    attachments = []
+    if artifact.get("wrapped_resource_saved_as"):
+        rel = artifact["wrapped_resource_saved_as"].split("modules_Test_Project_Template\\")[-1]
+        name = os.path.splitext(os.path.basename(rel))[0]
+        attachments.append({"file_path": rel, "file_name_in_polarion": name, "title": name})
+    if artifact.get("embedded_wrapped_resources_saved"):
+        for full_path in artifact["embedded_wrapped_resources_saved"]:
+            rel = full_path.split("modules_Test_Project_Template\\")[-1]
+            name = os.path.splitext(os.path.basename(rel))[0]
+            attachments.append({"file_path": rel, "file_name_in_polarion": name, "title": name})
+    return attachments
+
+
+class ArtifactStats:
+    """Work item count, per-type / per-status counts and deepest level of a module's transformed artifacts."""
+
+    def __init__(self, type_key="artifact_type", status_key="status"):
+        self.type_key = type_key
+        self.status_key = status_key
+        self.count = 0
+        self.max_depth = 0
+        self.by_type = Counter()
+        self.by_status = Counter()
+
+    def add(self, artifact, depth):
+        """Count one transformed artifact at depth (1 = top level); its children are not included."""
+        self.count += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+        self.by_type[str(artifact.get(self.type_key) or "(No Type)")] += 1
+        self.by_status[str(artifact.get(self.status_key) or "(No Status)")] += 1
+
+    def add_tree(self, artifact, depth=1):
+        """Count a transformed subtree that did not go through transform_artifact (e.g. a reused one)."""
+        stack = [(artifact, depth)]
+        while stack:
+            node, level = stack.pop()
+            self.add(node, level)
+            if isinstance(node.get("children"), list):
+                stack.extend((child, level + 1) for child in node["children"])
+
+    def report(self):
+        return {
+            "artifacts": self.count,
+            "max_depth": self.max_depth,
+            "by_type": dict(self.by_type.most_common()),
+            "by_status": dict(self.by_status.most_common()),
+        }
+
+
+def new_artifact_stats():
+    """ArtifactStats counting the output keys the current mapping gives artifact_type and artifact_status."""
+    if "map_fields" not in stages:
+        return ArtifactStats("artifact_type", "artifact_status")
+    rules = field_mapping.artifact_rules
+    return ArtifactStats(rules.get("artifact_type", ("artifact_type",))[0],
+                         rules.get("artifact_status", ("artifact_status",))[0])
+
+
+def transform_artifact(artifact, depth=1):
+    """Transform an artifact and its children (depth is the artifact's level, 1 = top level).
+
+    The tree is walked with an explicit stack, in the same pre-order as a
+    recursive walk, so deep hierarchies cost no Python frames and cannot hit
+    the recursion limit. Every artifact is added to artifact_stats on the way.
+    """
+    stats = artifact_stats
+    root = None
+    stack = [(artifact, None, depth)]
+    while stack:
+        source, siblings, level = stack.pop()
+        new_artifact = transform_artifact_fields(source)
+        if siblings is None:
+            root = new_artifact
+        else:
+            siblings.append(new_artifact)
+        if stats is not None:
+            stats.add(new_artifact, level)
+        children = new_artifact.get("children")
+        if isinstance(children, list):
+            new_artifact["children"] = new_children = []
+            stack.extend((child, new_children, level + 1) for child in reversed(children))
+    return root
+
+
+def transform_artifact_fields(artifact):
+    """Run the enabled per-artifact stages on one artifact; its children are left as in the source."""
+    start = time.perf_counter()
+    if "clean_source_html" in stages:
+        artifact = clean_source_fields(artifact)
+    if "map_fields" not in stages:
+        new_artifact = dict(artifact.items())
+        if metrics.current is not None:
+            metrics.current.record_artifact(artifact, time.perf_counter() - start)
+        return new_artifact
+
+    # copy mapped keys; the description fields are left out and merged below
+    new_artifact = field_mapping.map_artifact(artifact)
+    primary_html = artifact.get("primary_text_html")
+    primary_html_local = artifact.get("primary_text_html_local")
+    diagram_image_xml = artifact.get("diagram_image")
+    orig_description = artifact.get("description", "") or ""
+
+    # Build description
+    desc_parts = []
+    diagram_attachment = None
+    if diagram_image_xml and "render_diagrams" not in stages:
+        new_artifact["diagram_image"] = diagram_image_xml
+    elif diagram_image_xml:
+        if diagram_files is None:
+            html = timed("render_diagram", diagram_cache, diagram_image_xml, "70%", compact_diagrams)
+        else:
+            html, diagram_attachment = timed("render_diagram", diagram_files.render, diagram_image_xml, "70%",
+                                             compact_diagrams)
+        if html:
+            desc_parts.append(html)
+    clean_html = "clean_html" in stages
+    if primary_html:
+        cleaned = timed("clean_html", html_cache, primary_html) if clean_html else primary_html
+        if cleaned and cleaned.strip() != "<div></div>":
+            desc_parts.append(cleaned)
+    if primary_html_local:
+        cleaned_local = timed("clean_html", html_cache, primary_html_local) if clean_html else primary_html_local
+        if cleaned_local and cleaned_local.strip() != "<div></div>":
+            desc_parts.append(cleaned_local)
+    if orig_description.strip():
+        desc_parts.append("Description:<hr width='100%' size='2'>" + orig_description)
+
+    # Deduplicate parts
+    seen, unique_parts = set(), []
+    for part in desc_parts:
+        if part not in seen:
+            unique_parts.append(part)
+            seen.add(part)
+    if unique_parts:
+        new_artifact["description"] = "".join(unique_parts)
+
+    # Linked artifacts
+    if "linked_artifacts" in new_artifact and isinstance(new_artifact["linked_artifacts"], list):
+        new_artifact["linked_artifacts"] = timed("links", transform_linked_artifacts, new_artifact["linked_artifacts"],
+                                                 artifact.get("identifier"))
+
+    # Attachments
+    attachments = timed("attachments", artifact_attachments, artifact)
+    if attachments:
+        if attachment_stager is not None and "stage_attachments" in stages:
+            attachment_stager.stage(attachments)
+        new_artifact.setdefault("attachments", []).extend(attachments)
+    if diagram_attachment is not None:
+        new_artifact.setdefault("attachments", []).append(diagram_attachment)
+
+    if validator is not None:
+        timed("validate", validator.check_artifact, new_artifact)
+
+    if metrics.current is not None:
+        metrics.current.record_artifact(artifact, time.perf_counter() - start)
+    return new_artifact
+
+
+def transform_module_field(key, value, artifact_transform=transform_artifact):
+    """Yield the (key, value) pairs a top-level module field becomes; nothing if it is dropped."""
+    for new_key, new_value in _module_field_pairs(key, value, artifact_transform):
+        if validator is not None:
+            validator.check_module_field(new_key, new_value)
+        yield new_key, new_value
+
+
+def _module_field_pairs(key, value, artifact_transform):
+    rule = field_mapping.module_rules.get(key) if "map_fields" in stages else None
+    if rule is not None:
+        new_key, translate = rule
+        if new_key is not None:
+            yield new_key, value if translate is None else translate(value)
+    elif key == "artifacts" and isinstance(value, list):
+        yield "artifacts", [artifact_transform(a) for a in value]
+    else:
+        yield key, value
+    if key == "module_type" and "map_fields" in stages:
+        # ✅ Add space_id, also when the mapping config has no rule for module_type (or drops it)
+        yield "space_id", field_mapping.space_id(value)
+
+
+def transform_json(data, artifact_transform=transform_artifact):
+    new_data = {}
+    for key, value in data.items():
+        for new_key, new_value in transform_module_field(key, value, artifact_transform):
+            new_data[new_key] = new_value
+    return new_data
+
+
+def count_artifacts(artifacts):
+    """Number of artifacts in a list of transformed subtrees, children included."""
+    count = 0
+    stack = [artifacts]
+    while stack:
+        items = stack.pop()
+        count += len(items)
+        stack.extend(artifact["children"] for artifact in items if isinstance(artifact.get("children"), list))
+    return count
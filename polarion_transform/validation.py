@@ -0,0 +1,231 @@
+"""Validation of the transform output against the Polarion import schema (the validate stage).
+
+The schema (schema.json next to this module by default, or a project's own
+.json / .yaml file) has module / artifact / link sections, each with
+
+    "required":  output keys every record must have
+    "fields":    output key -> rule, any of
+                   "type":        string | list | dict | int | bool
+                   "enum":        allowed values
+                   "enum_from":   source key of the section's "values" /
+                                  "list_values" mapping table, or name of a
+                                  table of its own (like the module
+                                  "space_id"); allowed values are the
+                                  table's output values and its "<name>_default"
+                                  (in a "list_values" table, the source values
+                                  not mapped to a list, which pass through)
+                   "allow_empty": "" (or an empty list) passes enum and min_length
+                   "min_length":  shortest allowed string / list
+                   "not":         forbidden values
+                   "items":       rule for each list item
+
+Each section compiles into one checker per field, so checking a record is a
+dict lookup and a few comparisons per field. Violations are counted per
+rule with a few examples, in a report per module.
+"""
+import os
+
+from .mappings import load_config
+
+DEFAULT_SCHEMA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.json")
+
+# Examples of violations kept per module
+max_examples = 20
+
+_TYPES = {"string": str, "list": list, "dict": dict, "int": int, "bool": bool}
+_MISSING = object()
+
+
+def _mapping_enum(mapping_section, source_key):
+    table = mapping_section.get("values", {}).get(source_key)
+    if table is None:
+        table = mapping_section.get("list_values", {}).get(source_key)
+        if table is not None:
+            # Like the list translator: a source value mapped to anything but a list is passed through
+            return {item for key, value in table.items()
+                    for item in (value if isinstance(value, list) else [key])}
+    default = None
+    if table is None and isinstance(mapping_section.get(source_key), dict):
+        table = mapping_section[source_key]
+        default = mapping_section.get(f"{source_key}_default")
+    if table is None:
+        raise ValueError(f"enum_from {source_key!r} has no values table in the mapping config")
+    allowed = set() if default is None else {default}
+    for value in table.values():
+        allowed.update(value if isinstance(value, list) else [value])
+    return allowed
+
+
+def _allowed(rule, mapping_section):
+    if "enum" in rule:
+        return set(rule["enum"])
+    if "enum_from" in rule:
+        return _mapping_enum(mapping_section, rule["enum_from"])
+    return None
+
+
+def compile_rule(rule, mapping_section):
+    """Checker for one field rule: value -> violation name, or None if the value is valid.
+
+    The common rules (a plain type, an enum) compile to a single isinstance
+    call or set lookup; others check their constraints in order.
+    """
+    allowed = _allowed(rule, mapping_section)
+    allow_empty = rule.get("allow_empty", False)
+    if set(rule) <= {"enum", "enum_from", "allow_empty"}:
+        allowed = frozenset(allowed | {""} if allow_empty else allowed)
+
+        def check_enum(value):
+            try:
+                if value in allowed:
+                    return None
+            except TypeError:  # unhashable
+                if allow_empty and value == []:
+                    return None
+            return "not in enum"
+        return check_enum
+
+    expected = _TYPES[rule["type"]] if "type" in rule else None
+    type_violation = f"not a {rule.get('type')}"
+    if set(rule) == {"type"} and expected is not int:
+        return lambda value: None if isinstance(value, expected) else type_violation
+
+    min_length = rule.get("min_length")
+    forbidden = set(rule.get("not", ()))
+    check_item = compile_rule(rule["items"], mapping_section) if "items" in rule else None
+
+    def check(value):
+        if allow_empty and (value == "" or value == []):
+            return None
+        if expected is not None and (not isinstance(value, expected) or (expected is int and value is True)):
+            return type_violation
+        if allowed is not None and (value.__hash__ is None or value not in allowed):
+            return "not in enum"
+        if min_length is not None and len(value) < min_length:
+            return "too short"
+        if forbidden and value.__hash__ is not None and value in forbidden:
+            return "forbidden value"
+        if check_item is not None:
+            for item in value:
+                violation = check_item(item)
+                if violation is not None:
+                    return f"item {violation}"
+        return None
+    return check
+
+
+class CompiledSchema:
+    """A schema compiled against a mapping config.
+
+    sections: section -> (required keys, field -> checker, fast checks). The
+    fast checks are (field, allowed values) for enum rules and (field, type)
+    for plain type rules; a record passing them needs no checker call, the
+    checker only runs to name a violation.
+    """
+
+    def __init__(self, schema, mapping_config):
+        self.sections = {}
+        for name in ("module", "artifact", "link"):
+            section = schema.get(name, {})
+            mapping_section = mapping_config.get(name, {})
+            checkers, fast = {}, []
+            for key, rule in section.get("fields", {}).items():
+                checkers[key] = compile_rule(rule, mapping_section)
+                if set(rule) <= {"enum", "enum_from", "allow_empty"}:
+                    allowed = _allowed(rule, mapping_section) | {_MISSING}
+                    fast.append((key, frozenset(allowed | {""} if rule.get("allow_empty") else allowed), None))
+                elif set(rule) == {"type"} and rule["type"] != "int":
+                    fast.append((key, None, _TYPES[rule["type"]]))
+                else:
+                    fast.append((key, None, None))
+            self.sections[name] = (tuple(section.get("required", ())), checkers, tuple(fast))
+
+
+_compiled = {}
+
+
+def get_schema(path, field_mapping):
+    """Compiled schema for a schema path (None = the packaged schema.json) and a FieldMapping, once per process."""
+    key = (os.path.abspath(path) if path else DEFAULT_SCHEMA, id(field_mapping))
+    schema = _compiled.get(key)
+    if schema is None:
+        schema = _compiled[key] = CompiledSchema(load_config(key[0]), field_mapping.config)
+    return schema
+
+
+class Validator:
+    """Checks the records of one module as they are transformed and collects the violations."""
+
+    def __init__(self, schema):
+        self.module_required, self.module_checkers, _ = schema.sections["module"]
+        self.artifact_required, self.artifact_checkers, self.artifact_fast = schema.sections["artifact"]
+        self.link_required, self.link_checkers, self.link_fast = schema.sections["link"]
+        self.module_keys = set()
+        self.violations = 0
+        self.by_rule = {}
+        self.examples = []
+
+    def _violation(self, section, key, violation, identifier, value):
+        rule = f"{section}.{key}: {violation}"
+        self.violations += 1
+        self.by_rule[rule] = self.by_rule.get(rule, 0) + 1
+        if len(self.examples) < max_examples:
+            value = value if isinstance(value, (str, int, float, bool)) or value is None else repr(value)[:80]
+            self.examples.append({"identifier": identifier, "rule": rule, "value": value})
+
+    def _check(self, section, required, checkers, fast, record, identifier):
+        for key in required:
+            if key not in record:
+                self._violation(section, key, "missing", identifier, None)
+        get = record.get
+        for key, allowed, expected in fast:
+            value = get(key, _MISSING)
+            if allowed is not None:
+                try:
+                    if value in allowed:
+                        continue
+                except TypeError:  # unhashable; the checker names it
+                    pass
+            elif value is _MISSING or (expected is not None and isinstance(value, expected)):
+                continue
+            violation = checkers[key](value)
+            if violation is not None:
+                self._violation(section, key, violation, identifier, value)
+
+    def check_artifact(self, artifact):
+        """Check one transformed artifact and its links (not its children)."""
+        identifier = artifact.get("legacyID", artifact.get("identifier"))
+        self._check("artifact", self.artifact_required, self.artifact_checkers, self.artifact_fast, artifact,
+                    identifier)
+        links = artifact.get("linked_artifacts")
+        if links and isinstance(links, list):
+            for link in links:
+                self._check("link", self.link_required, self.link_checkers, self.link_fast, link, identifier)
+
+    def check_tree(self, artifact):
+        """Check a transformed subtree that did not go through transform_artifact (e.g. a reused one)."""
+        stack = [artifact]
+        while stack:
+            node = stack.pop()
+            self.check_artifact(node)
+            if isinstance(node.get("children"), list):
+                stack.extend(reversed(node["children"]))
+
+    def check_module_field(self, key, value):
+        self.module_keys.add(key)
+        check = self.module_checkers.get(key)
+        if check is not None:
+            violation = check(value)
+            if violation is not None:
+                self._violation("module", key, violation, None, value)
+
+    def report(self):
+        """The module's violations; call once, after the whole module was transformed."""
+        for key in self.module_required:
+            if key not in self.module_keys:
+                self._violation("module", key, "missing", None, None)
+        return {
+            "violations": self.violations,
+            "by_rule": dict(sorted(self.by_rule.items(), key=lambda item: -item[1])),
+            "examples": self.examples,
+        }
@@ -0,0 +1,142 @@
+"""Watch mode: detect module files as the exporter drops them and report queue / latency metrics.
+
+The DNG exporter writes one module after another (attachments first, the
+module JSON last), so with watch mode the transform of each module runs
+while the next ones are still being exported. A module file counts as
+complete once it has kept its size and modification time for settle_sec;
+with settle_sec=0 it counts as complete as soon as it appears, for
+exporters that write to a temporary name and rename into place (only
+names with a module file extension are picked up, *.json by default). A
+completed file that changes again, or is removed and written again, is
+picked up again.
+
+api.watch_directory queues completed files to a pool of long-lived worker
+processes, so compiled patterns, mapping tables and caches stay warm
+between modules, and rewrites a status file on every poll:
+
+    queue_depth   modules queued or being transformed
+    waiting       ... of them not started yet (queue_depth beyond the workers)
+    settling      files seen but not complete yet
+    latency_sec   per-module time from complete on disk to output written
+                  (p50 / p95 / max over the run, and the last module's)
+"""
+import json
+import os
+import signal
+import time
+
+# Modules listed in the status file's "recent" list
+recent_modules = 20
+
+
+class InputWatcher:
+    """Finds the module files (names ending in one of extensions) of a folder that are complete (see settle_sec)."""
+
+    def __init__(self, input_dir, settle_sec=2.0, extensions=(".json",)):
+        self.input_dir = input_dir
+        self.settle_sec = settle_sec
+        self.extensions = tuple(extensions)
+        self.settling = {}  # filename -> ((size, mtime_ns), time first seen with it)
+        self.picked = {}  # filename -> (size, mtime_ns) when it was picked up
+
+    def poll(self, now=None):
+        """(filename, time complete) of the files that completed since the last poll, oldest first."""
+        now = time.time() if now is None else now
+        ready = []
+        try:
+            entries = list(os.scandir(self.input_dir))
+        except OSError:
+            return ready
+        present = set()
+        for entry in entries:
+            if not entry.name.endswith(self.extensions):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:  # renamed or removed since the scan
+                continue
+            present.add(entry.name)
+            signature = (st.st_size, st.st_mtime_ns)
+            if self.picked.get(entry.name) == signature:
+                continue
+            seen = self.settling.get(entry.name)
+            if seen is None or seen[0] != signature:
+                seen = self.settling[entry.name] = (signature, now)
+            if now - seen[1] >= self.settle_sec:
+                del self.settling[entry.name]
+                self.picked[entry.name] = signature
+                ready.append((entry.name, seen[1] + self.settle_sec))
+        # Forget removed files, so a long watch keeps no entry per module ever exported
+        for filename in set(self.settling) - present:
+            del self.settling[filename]
+        for filename in set(self.picked) - present:
+            del self.picked[filename]
+        ready.sort(key=lambda item: item[1])
+        return ready
+
+
+def ignore_interrupts():
+    """Pool worker initializer: Ctrl+C stops the watch in the parent, which lets running modules finish."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class WatchStatus:
+    """Counters and latencies of a watch run, written to a status file."""
+
+    def __init__(self, path, workers):
+        self.path = path
+        self.workers = workers
+        self.started = time.time()
+        self.processed = self.failed = self.unchanged = 0
+        self.latencies = []
+        self.recent = []
+
+    def record(self, result, latency):
+        """Count a finished module; latency is seconds from its file completing to its output being written."""
+        if result.get("unchanged"):
+            self.unchanged += 1
+            return
+        if "error" in result:
+            self.failed += 1
+        else:
+            self.processed += 1
+            self.latencies.append(latency)
+        self.recent.append({"filename": result["filename"], "latency_sec": round(latency, 3),
+                            "transform_sec": result.get("elapsed_time"), "error": result.get("error")})
+        del self.recent[:-recent_modules]
+
+    def report(self, queue_depth=0, settling=0):
+        latency = None
+        if self.latencies:
+            latency = {
+                "p50": round(_percentile(self.latencies, 0.5), 3),
+                "p95": round(_percentile(self.latencies, 0.95), 3),
+                "max": round(max(self.latencies), 3),
+                "last": round(self.latencies[-1], 3),
+            }
+        return {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "updated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "workers": self.workers,
+            "queue_depth": queue_depth,
+            "waiting": max(0, queue_depth - self.workers),
+            "settling": settling,
+            "processed": self.processed,
+            "failed": self.failed,
+            "unchanged": self.unchanged,
+            "latency_sec": latency,
+            "recent": self.recent,
+        }
+
+    def write(self, queue_depth=0, settling=0):
+        report = self.report(queue_depth, settling)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        return report
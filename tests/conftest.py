@@ -0,0 +1,48 @@
+"""Shared fixtures: the sample export (IBM_JSON) and its expected transform output (tests/golden).
+
+tests/golden is what the original Transformation_Script.py wrote for
+IBM_JSON; every output mode must reproduce it.
+"""
+import json
+import os
+import shutil
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IBM_JSON = os.path.join(ROOT, "IBM_JSON")
+GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+MODULES = sorted(filename for filename in os.listdir(GOLDEN) if filename.endswith(".json"))
+
+
+def load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def golden_artifacts(filename):
+    return load_json(os.path.join(GOLDEN, filename))["artifacts"]
+
+
+@pytest.fixture
+def export_dir(tmp_path):
+    """A writable copy of IBM_JSON."""
+    path = tmp_path / "IBM_JSON"
+    shutil.copytree(IBM_JSON, path)
+    return str(path)
+
+
+@pytest.fixture
+def assert_golden():
+    """Check that an output folder holds exactly the golden module files, byte for byte."""
+
+    def check(output_dir):
+        written = sorted(filename for filename in os.listdir(output_dir) if filename.endswith(".json"))
+        assert written == MODULES
+        for filename in MODULES:
+            with open(os.path.join(output_dir, filename), "rb") as f, \
+                    open(os.path.join(GOLDEN, filename), "rb") as g:
+                assert f.read() == g.read(), filename
+
+    return check
@@ -0,0 +1,31 @@
+"""Attachment staging stores independent copies and stops its threads at the end of a run."""
+import os
+
+from polarion_transform import attachments
+
+
+def test_blob_is_not_linked_to_its_source(tmp_path):
+    source = tmp_path / "export" / "diagram.png"
+    source.parent.mkdir()
+    source.write_bytes(b"first")
+    staged = attachments.stage_file(str(source), str(tmp_path / "staging"))
+    blob = os.path.join(tmp_path, "staging", *staged["file_path"].split("/"))
+    assert staged["method"] in ("reflink", "copy")
+    assert not os.path.samefile(blob, source)
+    with open(source, "wb") as f:  # edited in place, as an exporter rewriting the file would
+        f.write(b"second")
+    with open(blob, "rb") as f:
+        assert f.read() == b"first"
+
+
+def test_close_stagers_stops_the_thread_pools(tmp_path):
+    (tmp_path / "a.txt").write_bytes(b"a")
+    stager = attachments.get_stager(str(tmp_path), str(tmp_path / "staging"))
+    entries = [{"file_path": "a.txt"}]
+    stager.stage(entries)
+    stager.flush()
+    assert entries[0]["file_path"].startswith("blobs/")
+    attachments.close_stagers()
+    assert stager.executor._shutdown
+    assert attachments.get_stager(str(tmp_path), str(tmp_path / "staging")) is not stager
+    attachments.close_stagers()
@@ -0,0 +1,14 @@
+"""ContentCache follows cache_max_entries as it is set, without re-importing."""
+from polarion_transform import cache
+
+
+def test_cache_max_entries_is_read_on_insert(monkeypatch):
+    content_cache = cache.ContentCache(str.upper)
+    monkeypatch.setattr(cache, "cache_max_entries", 3)
+    for text in "abcde":
+        assert content_cache(text) == text.upper()
+    assert len(content_cache.entries) == 3
+    monkeypatch.setattr(cache, "cache_max_entries", 1)
+    content_cache("f")
+    assert len(content_cache.entries) == 1
+    assert content_cache("f") == "F" and content_cache.hits == 1
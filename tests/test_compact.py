@@ -0,0 +1,41 @@
+"""The compact record model (--compact-model)."""
+import copy
+import io
+import json
+import os
+
+from conftest import IBM_JSON
+from polarion_transform import transform
+from polarion_transform.compact import CompactRecord, compact, get_shape, load_compact
+from polarion_transform.output import JsonSerializer
+
+SAMPLE = "SampleSPECModuleforMainSystem.json"
+
+
+def test_compact_record_reads_like_its_dict():
+    record = {"a": "", "b": "x", "c": 3, "d": "", "e": ["y"]}
+    compacted = compact(record)
+    assert isinstance(compacted, CompactRecord)
+    assert dict(compacted.items()) == record
+    assert list(compacted) == list(record)
+    assert compacted["a"] == "" and compacted["b"] == "x" and compacted["e"] == ["y"]
+    assert compacted.get("missing", 1) == 1 and "d" in compacted and len(compacted) == len(record)
+
+
+def test_compact_record_with_many_empty_fields():
+    # Bit positions beyond a machine word; values are found by counting the empty fields before them
+    record = {f"field{i}": ("" if i % 3 else f"value{i}") for i in range(200)}
+    compacted = CompactRecord(get_shape(tuple(record)), list(record.values()))
+    assert all(compacted[key] == value for key, value in record.items())
+    assert compacted.to_dict() == record
+
+
+def test_compact_module_serializes_like_the_dicts():
+    with open(os.path.join(IBM_JSON, SAMPLE), "rb") as f:
+        raw = f.read()
+    data = json.loads(raw)
+    compacted = load_compact(io.BytesIO(raw))
+    serializer = JsonSerializer()
+    assert serializer.dumps(compacted, 4) == serializer.dumps(data, 4)
+    assert serializer.dumps(transform.transform_json(compact(data)), 4) == \
+        serializer.dumps(transform.transform_json(copy.deepcopy(data)), 4)
@@ -0,0 +1,89 @@
+"""Delta runs: the first emits everything, later ones only the added, changed and deleted artifacts."""
+import json
+import os
+
+from conftest import MODULES, load_json
+from polarion_transform import transform_delta
+from polarion_transform.delta import delta_filename
+
+SAMPLE = "SampleSPECModuleforMainSystem.json"
+
+
+def edit_module(export_dir, filename, edit):
+    path = os.path.join(export_dir, filename)
+    module = load_json(path)
+    edit(module)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(module, f)
+
+
+def test_first_run_adds_everything(tmp_path, export_dir):
+    summary = transform_delta(export_dir, str(tmp_path / "delta"))
+    assert summary["failed"] == 0
+    assert summary["modules_changed"] == len(MODULES)
+    assert summary["added"] > 0 and summary["changed"] == summary["deleted"] == 0
+
+
+def test_unchanged_export_has_no_delta(tmp_path, export_dir):
+    delta_dir = str(tmp_path / "delta")
+    transform_delta(export_dir, delta_dir)
+    summary = transform_delta(export_dir, delta_dir)
+    assert summary["modules_changed"] == 0
+    assert summary["added"] == summary["changed"] == summary["moved"] == summary["deleted"] == 0
+    assert not [name for name in os.listdir(delta_dir) if name.endswith(".delta.json")]
+
+
+def test_added_changed_and_deleted_artifacts(tmp_path, export_dir):
+    delta_dir = str(tmp_path / "delta")
+    transform_delta(export_dir, delta_dir)
+    original = load_json(os.path.join(export_dir, SAMPLE))["artifacts"]
+    changed_id, deleted_id = original[0]["identifier"], original[2]["identifier"]
+
+    def edit(module):
+        artifacts = module["artifacts"]
+        artifacts[0]["title"] += " (edited)"
+        artifacts.append(dict(artifacts[1], identifier="999999001", artifact_uri="urn:test:added"))
+        del artifacts[2]
+
+    edit_module(export_dir, SAMPLE, edit)
+    summary = transform_delta(export_dir, delta_dir)
+
+    assert summary["modules_changed"] == 1
+    assert (summary["added"], summary["changed"], summary["deleted"]) == (1, 1, 1)
+    document = load_json(os.path.join(delta_dir, delta_filename(SAMPLE)))
+    records = {record["change"]: record for record in document["artifacts"] if record["change"] != "moved"}
+    assert records["added"]["artifact"]["legacyID"] == "999999001"
+    assert records["changed"]["artifact"]["legacyID"] == changed_id
+    assert records["changed"]["artifact"]["title"].endswith(" (edited)")
+    assert [record["legacyID"] for record in document["deleted"]] == [deleted_id]
+
+
+def test_removed_module_deletes_its_artifacts(tmp_path, export_dir):
+    delta_dir = str(tmp_path / "delta")
+    transform_delta(export_dir, delta_dir)
+    count = len(load_json(os.path.join(export_dir, SAMPLE))["artifacts"])
+    os.remove(os.path.join(export_dir, SAMPLE))
+    summary = transform_delta(export_dir, delta_dir)
+    assert summary["deleted"] == count
+    document = load_json(os.path.join(delta_dir, delta_filename(SAMPLE)))
+    assert document["module"] is None and len(document["deleted"]) == count
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_failed_run_keeps_the_previous_deltas(tmp_path, export_dir):
+    delta_dir = str(tmp_path / "delta")
+    transform_delta(export_dir, delta_dir)
+    before = {name: read_bytes(os.path.join(delta_dir, name)) for name in os.listdir(delta_dir)}
+    snapshot = read_bytes(delta_dir + ".snapshot.json")
+    edit_module(export_dir, SAMPLE, lambda module: module["artifacts"][0].update(title="edited"))
+    with open(os.path.join(export_dir, MODULES[0]), "w", encoding="utf-8") as f:
+        f.write("{ not json")
+    summary = transform_delta(export_dir, delta_dir)
+    assert summary["failed"] == 1 and not summary["applied"]
+    assert {name: read_bytes(os.path.join(delta_dir, name)) for name in os.listdir(delta_dir)} == before
+    assert read_bytes(delta_dir + ".snapshot.json") == snapshot
+    assert not os.path.exists(delta_dir + ".tmp")
@@ -0,0 +1,16 @@
+"""render_diagram_svg number formatting: the default keeps the original's str(float), compact rounds."""
+from polarion_transform.diagram import render_diagram_svg
+
+DIAGRAM = ('<shape><strokewidth width="2"/><strokecolor color="#000000"/>'
+           '<rect x="10.25" y="20" w="30.125" h="4"/><stroke/></shape>')
+
+
+def test_default_writes_coordinates_as_str_float():
+    svg = render_diagram_svg(DIAGRAM)
+    assert "x='10.25'" in svg and "y='20.0'" in svg and "width='30.125'" in svg
+    assert "stroke-width='2'" in svg
+
+
+def test_compact_rounds_coordinates():
+    svg = render_diagram_svg(DIAGRAM, compact=True)
+    assert "x='10.2'" in svg and "y='20'" in svg and "width='30.1'" in svg
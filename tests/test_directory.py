@@ -0,0 +1,120 @@
+"""transform_directory on IBM_JSON against the golden output, in every mode that must not change the bytes."""
+import os
+
+import pytest
+
+from conftest import IBM_JSON, MODULES, golden_artifacts, load_json
+from polarion_transform import transform_directory
+from polarion_transform.output import read_output_artifacts
+
+
+def test_directory_matches_golden(tmp_path, assert_golden):
+    output_dir = str(tmp_path / "out")
+    summary = transform_directory(IBM_JSON, output_dir)
+    assert summary["files"] == len(MODULES)
+    assert summary["failed"] == 0
+    assert_golden(output_dir)
+
+
+def test_parallel_matches_golden(tmp_path, assert_golden):
+    output_dir = str(tmp_path / "out")
+    summary = transform_directory(IBM_JSON, output_dir, workers=2)
+    assert summary["failed"] == 0
+    assert_golden(output_dir)
+
+
+def test_stream_matches_non_stream(tmp_path, assert_golden):
+    output_dir = str(tmp_path / "out")
+    transform_directory(IBM_JSON, output_dir, stream=True)
+    assert_golden(output_dir)
+
+
+def test_rerun_skips_unchanged_modules(tmp_path):
+    output_dir = str(tmp_path / "out")
+    transform_directory(IBM_JSON, output_dir)
+    summary = transform_directory(IBM_JSON, output_dir)
+    assert summary["unchanged"] == len(MODULES)
+    assert summary["files"] == 0
+    forced = transform_directory(IBM_JSON, output_dir, force=True)
+    assert forced["files"] == len(MODULES)
+
+
+def test_first_run_records_hashes_a_changed_module_reuses(tmp_path, export_dir, assert_golden):
+    output_dir = str(tmp_path / "out")
+    transform_directory(export_dir, output_dir)
+    manifest = load_json(output_dir + ".manifest.json")
+    for filename in MODULES:
+        assert len(manifest["modules"][filename]["artifact_hashes"]) == len(golden_artifacts(filename)), filename
+    # Touching the module keeps its artifacts; every one of them is reused from the previous output
+    path = os.path.join(export_dir, "SampleREQSUB.json")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\n")
+    summary = transform_directory(export_dir, output_dir)
+    assert summary["files"] == 1
+    assert summary["reused"] == len(golden_artifacts("SampleREQSUB.json"))
+    assert_golden(output_dir)
+
+
+def test_changed_run_options_rerun_every_module(tmp_path):
+    output_dir = str(tmp_path / "out")
+    transform_directory(IBM_JSON, output_dir)
+    summary = transform_directory(IBM_JSON, output_dir, compact_diagrams=True)
+    assert summary["files"] == len(MODULES)
+    summary = transform_directory(IBM_JSON, output_dir)
+    assert summary["files"] == len(MODULES)
+
+
+def test_space_id_follows_module_type(tmp_path):
+    output_dir = str(tmp_path / "out")
+    transform_directory(IBM_JSON, output_dir)
+    mapping = load_json(os.path.join(os.path.dirname(IBM_JSON), "polarion_transform", "mappings.json"))["module"]
+    for filename in MODULES:
+        source = load_json(os.path.join(IBM_JSON, filename))
+        module = load_json(os.path.join(output_dir, filename))
+        expected = mapping["space_id"].get(source["module_type"], mapping["space_id_default"])
+        assert module["space_id"] == expected, filename
+
+
+@pytest.mark.parametrize("serializer", ["json", "orjson"])
+def test_serializers_match_golden(tmp_path, assert_golden, serializer):
+    if serializer == "orjson":
+        pytest.importorskip("orjson")
+    output_dir = str(tmp_path / "out")
+    transform_directory(IBM_JSON, output_dir, serializer=serializer)
+    assert_golden(output_dir)
+
+
+@pytest.mark.parametrize("output_format", ["minified", "ndjson"])
+def test_orjson_writes_the_bytes_json_does(tmp_path, output_format):
+    # The golden (indented) output is written by the json module whatever the serializer; these formats are not
+    pytest.importorskip("orjson")
+    written = {}
+    for serializer in ("json", "orjson"):
+        output_dir = str(tmp_path / serializer)
+        transform_directory(IBM_JSON, output_dir, output_format=output_format, serializer=serializer)
+        written[serializer] = {}
+        for filename in sorted(os.listdir(output_dir)):
+            with open(os.path.join(output_dir, filename), "rb") as f:
+                written[serializer][filename] = f.read()
+    assert len(written["json"]) == len(MODULES)
+    assert written["orjson"] == written["json"]
+
+
+@pytest.mark.parametrize("output_format,compression", [("minified", "none"), ("ndjson", "none"),
+                                                       ("json", "gzip"), ("ndjson", "gzip"), ("json", "zstd")])
+def test_formats_and_compression_round_trip(tmp_path, output_format, compression):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    output_dir = str(tmp_path / "out")
+    transform_directory(IBM_JSON, output_dir, output_format=output_format, compression=compression)
+    extension = {"minified": ".json", "json": ".json", "ndjson": ".ndjson"}[output_format]
+    extension += {"none": "", "gzip": ".gz", "zstd": ".zst"}[compression]
+    for filename in MODULES:
+        path = os.path.join(output_dir, filename[:-len(".json")] + extension)
+        assert read_output_artifacts(path) == golden_artifacts(filename), filename
+
+
+def test_compact_model_matches_golden(tmp_path, assert_golden):
+    output_dir = str(tmp_path / "out")
+    transform_directory(IBM_JSON, output_dir, compact_model=True)
+    assert_golden(output_dir)
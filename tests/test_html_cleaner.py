@@ -0,0 +1,83 @@
+"""clean_primary_html gives the same output as the original chain of re.sub calls."""
+import os
+import re
+
+import pytest
+
+from conftest import IBM_JSON, load_json
+from polarion_transform.html_cleaner import clean_primary_html
+
+
+def original_clean_primary_html(html_text):
+    """clean_primary_html as Transformation_Script.py had it before the patterns were compiled once."""
+    if not html_text:
+        return ""
+    cleaned = re.sub(r"</?ns0:primarytext[^>]*>", "", html_text)
+    cleaned = re.sub(r"<html:([a-zA-Z0-9]+)", r"<\1", cleaned)
+    cleaned = re.sub(r"</html:([a-zA-Z0-9]+)>", r"</\1>", cleaned)
+    cleaned = re.sub(r'\s*dir="[^"]*"', "", cleaned)
+    cleaned = re.sub(r'\s*id="[^"]*"', "", cleaned)
+    cleaned = re.sub(r"<img[^>]*>", "", cleaned)
+    cleaned = re.sub(r"\n+", " ", cleaned)
+    cleaned = re.sub(r"\s{2,}", " ", cleaned)
+    cleaned = re.sub(r"<p>\s*(?:&nbsp;)?\s*</p>", "", cleaned, flags=re.IGNORECASE)
+    cleaned = re.sub(r"<div>\s*(?:&nbsp;)?\s*</div>", "", cleaned, flags=re.IGNORECASE)
+    cleaned = re.sub(r"<(i|u|b|sub|sup)><\1>", r"<\1>", cleaned)
+    cleaned = re.sub(r"</(i|u|b|sub|sup)></\1>", r"</\1>", cleaned)
+
+    def styled(tag, style):
+        def add_styles(match):
+            attrs = re.sub(r'width\s*:\s*[^;"]+;?', "", match.group(1) or "", flags=re.IGNORECASE)
+            if "style=" in attrs:
+                return f"<{tag}{attrs[:-1]}; {style}\">"
+            return f"<{tag}{attrs} style=\"{style}\">"
+        return add_styles
+
+    cleaned = re.sub(r"<table([^>]*)>", styled("table", "width: 70%; border-collapse: collapse; border: 1px solid "
+                                                         "#696969;"), cleaned)
+    cleaned = re.sub(r"<td([^>]*)>", styled("td", "border: 1px solid #696969; padding: 4px;"), cleaned)
+    if not cleaned.startswith("<div>"):
+        cleaned = f"<div>{cleaned}</div>"
+    return cleaned.strip()
+
+
+def export_html():
+    texts = []
+    for filename in sorted(os.listdir(IBM_JSON)):
+        if not filename.endswith(".json"):
+            continue
+        module = load_json(os.path.join(IBM_JSON, filename))
+        texts.append(module.get("module_primary_text_html") or "")
+        stack = list(module.get("artifacts") or ())
+        while stack:
+            artifact = stack.pop()
+            stack.extend(artifact.get("children") or ())
+            texts.append(artifact.get("primary_text_html") or "")
+    return [text for text in texts if text]
+
+
+EDGE_CASES = [
+    "",
+    "plain text",
+    '<ns0:primarytext rdf:parseType="Literal"><html:div dir="ltr" id="_1"><html:p>Text</html:p></html:div>'
+    "</ns0:primarytext>",
+    "<html:>odd</html:> <html:p x>kept</html:p x> </html:>",
+    "<html:b><html:b>bold</html:b></html:b> <i><i>x</i></i> <sub><sub>2</sub></sub>",
+    "<p>  </p><P>&nbsp;</P><div>\n</div><div> &nbsp; </div><p>kept</p>",
+    '<img src="a.png"/>  <p dir="rtl"   id="x">a\n\n\nb   c</p>',
+    '<table width="100" style="width: 50%; color: red;"><tr><td style="WIDTH:3px">1</td><td>2</td></tr></table>',
+    '<table><td id="cell" dir="ltr">x</td></table>',
+    "<div>already wrapped</div>",
+]
+
+
+@pytest.mark.parametrize("html_text", EDGE_CASES)
+def test_edge_cases_match_original(html_text):
+    assert clean_primary_html(html_text) == original_clean_primary_html(html_text)
+
+
+def test_export_html_matches_original():
+    texts = export_html()
+    assert texts
+    for html_text in texts:
+        assert clean_primary_html(html_text) == original_clean_primary_html(html_text)
@@ -0,0 +1,92 @@
+"""Bulk import against the mock Polarion server: everything arrives once, also across failures and reruns."""
+import asyncio
+import os
+import sys
+
+import pytest
+
+from conftest import GOLDEN, ROOT
+from polarion_transform.polarion_import import ConnectionPool, PolarionError, import_output, work_item_resource
+
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from mock_polarion import MockPolarion  # noqa: E402
+
+
+def run_imports(checkpoint, retries, **mock_options):
+    """(summary or PolarionError of importing the golden output once per retry count, the mock's report)."""
+
+    async def main():
+        mock = MockPolarion(seed=3, **mock_options)
+        port = await mock.start()
+        results = []
+        try:
+            for attempt_retries in retries:
+                try:
+                    results.append(await import_output(GOLDEN, f"http://127.0.0.1:{port}/polarion/rest/v1", "DEMO",
+                                                       checkpoint=checkpoint, batch_size=7, retries=attempt_retries,
+                                                       backoff_sec=0.001))
+                except PolarionError as e:
+                    results.append(e)
+        finally:
+            await mock.close()
+        return results, mock.report()
+
+    return asyncio.run(main())
+
+
+def test_import_creates_every_work_item_once(tmp_path):
+    checkpoint = str(tmp_path / "import.jsonl")
+    (summary, rerun), report = run_imports(checkpoint, [5, 5])
+    assert report["work_items"] == summary["work_items"] > 0
+    assert report["duplicate_legacy_ids"] == 0
+    assert rerun["work_items"] == 0 and rerun["resumed"]["work_items"] == summary["work_items"]
+
+
+@pytest.mark.parametrize("fail_rate,lose_rate", [(0.1, 0.0), (0.0, 0.1), (0.05, 0.05)])
+def test_failures_and_reruns_create_no_duplicates(tmp_path, fail_rate, lose_rate):
+    checkpoint = str(tmp_path / "import.jsonl")
+    results, report = run_imports(checkpoint, [0, 0, 5], fail_rate=fail_rate, lose_rate=lose_rate)
+    assert not isinstance(results[-1], PolarionError)
+    assert report["duplicate_legacy_ids"] == 0 and report["duplicate_links"] == 0
+    imported = results[-1]["work_items"] + results[-1]["resumed"]["work_items"]
+    assert report["work_items"] == imported
+
+
+def test_list_fields_are_sent_and_others_reported():
+    dropped = {}
+    resource = work_item_resource({"legacyID": "1", "title": "T", "responsibleGroup": ["A", "B"], "rg": [],
+                                   "extra": {"nested": 1}, "empty": "", "none": None}, dropped)
+    assert resource["attributes"] == {"legacyID": "1", "title": "T", "responsibleGroup": ["A", "B"],
+                                      "type": "requirement"}
+    assert dropped == {"extra": 1}
+
+
+def test_post_on_a_connection_closed_while_idle_is_sent_again():
+    # A server that answers one request per connection and then drops it, like an expired keep-alive timeout
+    requests = []
+
+    async def handle(reader, writer):
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = next(line.split(b":")[1] for line in head.split(b"\r\n") if line.lower().startswith(b"content-length"))
+        requests.append(await reader.readexactly(int(length)))
+        writer.write(b"HTTP/1.1 201 Created\r\nContent-Length: 2\r\n\r\n{}")
+        await writer.drain()
+        writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        pool = ConnectionPool(f"http://127.0.0.1:{port}/polarion/rest/v1", size=1)
+        try:
+            statuses = [(await pool.request("POST", "/workitems", body))[0] for body in (b"first", b"second")]
+        finally:
+            await pool.close()
+            server.close()
+            await server.wait_closed()
+        return statuses, pool
+
+    statuses, pool = asyncio.run(main())
+    assert statuses == [201, 201]
+    assert requests == [b"first", b"second"]
+    assert pool.opened == 2 and pool.stale == 1
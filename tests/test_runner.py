@@ -0,0 +1,38 @@
+"""process_file reports failures in its result instead of raising, and leaves no partial output."""
+import os
+
+import pytest
+
+from conftest import IBM_JSON
+from polarion_transform import runner
+
+SAMPLE = os.path.join(IBM_JSON, "SampleREQSUB.json")
+
+
+def failing_write(transformed, writer):
+    writer.field("module_title", "half written")
+    raise OSError("disk full")
+
+
+@pytest.mark.parametrize("options", [{}, {"shard_items": 2}])
+def test_failed_write_removes_the_partial_output(tmp_path, monkeypatch, options):
+    output_path = str(tmp_path / "SampleREQSUB.json")
+    assert "error" not in runner.process_file(SAMPLE, output_path, **options)
+    monkeypatch.setattr(runner, "write_module", failing_write)
+    result = runner.process_file(SAMPLE, output_path, **options)
+    assert "disk full" in result["error"]
+    assert os.listdir(tmp_path) == []
+
+
+def test_attachment_staging_that_cannot_start_is_reported(tmp_path, monkeypatch):
+    def read_only_stager(root, staging_dir):
+        raise PermissionError(f"cannot create {staging_dir}")
+
+    monkeypatch.setattr(runner, "get_stager", read_only_stager)
+    result = runner.process_file(SAMPLE, str(tmp_path / "out.json"), stage_attachments=str(tmp_path / "staging"))
+    assert "attachment staging" in result["error"]
+
+
+def test_unknown_stages_are_reported():
+    result = runner.process_file(SAMPLE, os.devnull, stages="parse,no_such_stage")
+    assert "no_such_stage" in result["error"]
@@ -0,0 +1,57 @@
+"""Sharded output: the shards read back into the golden artifacts, and stay put when an artifact is inserted."""
+import hashlib
+import json
+import os
+
+from conftest import IBM_JSON, MODULES, golden_artifacts, load_json
+from polarion_transform import transform_directory
+from polarion_transform.output import read_output_artifacts
+
+SPEC = "SPEC SYS Test_Project Template.json"
+
+
+def shard_hashes(output_dir, module):
+    header = load_json(os.path.join(output_dir, module))
+    hashes = {}
+    for shard in header["shards"]:
+        with open(os.path.join(output_dir, shard["file"]), "rb") as f:
+            hashes[shard["file"]] = hashlib.sha256(f.read()).hexdigest()
+    return hashes
+
+
+def test_shards_reassemble(tmp_path):
+    output_dir = str(tmp_path / "out")
+    summary = transform_directory(IBM_JSON, output_dir, shard_items=20)
+    assert summary["shards"] > len(MODULES)
+    for filename in MODULES:
+        header = load_json(os.path.join(output_dir, filename))
+        assert "artifacts" not in header
+        assert [shard["index"] for shard in header["shards"]] == list(range(1, len(header["shards"]) + 1))
+        assert read_output_artifacts(os.path.join(output_dir, filename)) == golden_artifacts(filename), filename
+
+
+def test_shard_bodies_hold_no_position(tmp_path):
+    output_dir = str(tmp_path / "out")
+    transform_directory(IBM_JSON, output_dir, shard_items=20)
+    for shard in load_json(os.path.join(output_dir, SPEC))["shards"]:
+        assert load_json(os.path.join(output_dir, shard["file"]))["shard"] == {"module": SPEC}
+
+
+def test_inserted_artifact_keeps_other_shards(tmp_path, export_dir):
+    output_dir = str(tmp_path / "out")
+    transform_directory(export_dir, output_dir, shard_items=20)
+    before = shard_hashes(output_dir, SPEC)
+
+    path = os.path.join(export_dir, SPEC)
+    module = load_json(path)
+    inserted = dict(module["artifacts"][1], identifier="999999001", children=[])
+    module["artifacts"].insert(1, inserted)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(module, f)
+    transform_directory(export_dir, output_dir, shard_items=20)
+    after = shard_hashes(output_dir, SPEC)
+
+    kept = [name for name, digest in after.items() if before.get(name) == digest]
+    assert len(after) - len(kept) <= 2
+    assert sorted(os.path.basename(name) for name in os.listdir(output_dir) if ".shard-" in name
+                  and name.startswith("SPEC ")) == sorted(after)
@@ -0,0 +1,55 @@
+"""The iterative artifact tree transform."""
+import copy
+import os
+
+from conftest import IBM_JSON, load_json
+from polarion_transform import transform, transform_file, transform_module
+
+SAMPLE = "SampleSPECModuleforMainSystem.json"
+
+
+def sample_artifacts():
+    return load_json(os.path.join(IBM_JSON, SAMPLE))["artifacts"]
+
+
+def recursive_transform(artifact):
+    new_artifact = transform.transform_artifact_fields(artifact)
+    if isinstance(new_artifact.get("children"), list):
+        new_artifact["children"] = [recursive_transform(child) for child in new_artifact["children"]]
+    return new_artifact
+
+
+def test_tree_transform_matches_recursive_walk():
+    artifacts = sample_artifacts()
+    root = copy.deepcopy(artifacts[0])
+    root["children"] = [dict(artifact, children=[dict(artifacts[-1], children=[])]) for artifact in artifacts[1:4]]
+    assert transform.transform_artifact(copy.deepcopy(root)) == recursive_transform(copy.deepcopy(root))
+
+
+def test_deep_tree_does_not_hit_recursion_limit():
+    template = sample_artifacts()[0]
+    depth = 5000
+    root = node = dict(template, children=[])
+    for i in range(depth - 1):
+        child = dict(template, identifier=str(i), children=[])
+        node["children"].append(child)
+        node = child
+    transformed = transform.transform_artifact(root)
+    assert transform.count_artifacts([transformed]) == depth
+    levels = 0
+    while transformed is not None:
+        levels += 1
+        transformed = transformed["children"][0] if transformed["children"] else None
+    assert levels == depth
+
+
+def test_settings_are_restored_after_each_call(tmp_path):
+    field_mapping, stages = transform.field_mapping, transform.stages
+    module = load_json(os.path.join(IBM_JSON, SAMPLE))
+    untouched = transform_module(copy.deepcopy(module), stages="parse,serialize")
+    assert untouched["artifacts"][0] == module["artifacts"][0]
+    assert transform.field_mapping is field_mapping and transform.stages == stages
+    transform_file(os.path.join(IBM_JSON, SAMPLE), str(tmp_path / SAMPLE), compact_diagrams=True,
+                   stages="parse,map_fields,serialize")
+    assert transform.stages == stages and transform.compact_diagrams is False
+    assert transform.link_resolver is None and transform.validator is None and transform.artifact_stats is None
@@ -0,0 +1,14 @@
+"""The default mapping and schema agree: the sample export validates clean."""
+from conftest import IBM_JSON
+from polarion_transform import transform_directory
+from polarion_transform.validation import _mapping_enum
+
+
+def test_default_run_has_no_violations(tmp_path):
+    summary = transform_directory(IBM_JSON, str(tmp_path / "out"))
+    assert summary["validation"]["violations"] == 0
+
+
+def test_list_values_not_mapped_to_a_list_pass_through():
+    section = {"list_values": {"group": {"n/a": "na", "Both": ["a", "b"]}}}
+    assert _mapping_enum(section, "group") == {"n/a", "a", "b"}
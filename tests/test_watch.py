@@ -0,0 +1,16 @@
+"""InputWatcher picks up completed files once and forgets the ones that are removed."""
+from polarion_transform.watch import InputWatcher
+
+
+def test_removed_files_are_forgotten(tmp_path):
+    watcher = InputWatcher(str(tmp_path), settle_sec=0)
+    for i in range(3):
+        (tmp_path / f"module{i}.json").write_text("{}")
+    assert sorted(name for name, _ in watcher.poll()) == ["module0.json", "module1.json", "module2.json"]
+    assert watcher.poll() == []
+    (tmp_path / "module0.json").unlink()
+    (tmp_path / "module1.json").unlink()
+    assert watcher.poll() == []
+    assert set(watcher.picked) == {"module2.json"}
+    (tmp_path / "module1.json").write_text("{}")
+    assert [name for name, _ in watcher.poll()] == ["module1.json"]